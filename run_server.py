@@ -7,7 +7,10 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 if __name__ == '__main__':
     try:
-        from src.main import create_app, init_database
+        from src.main import (
+            create_app, init_database, rebuild_ganancias, check_total_repuestos,
+            import_csv
+        )
         from src.config.settings import settings
         
         # Verificar si se requiere inicialización
@@ -17,6 +20,34 @@ if __name__ == '__main__':
             print("Base de datos inicializada con datos de ejemplo")
             sys.exit(0)
         
+        # Reconstruir resúmenes mensuales de ganancias
+        if len(sys.argv) > 1 and sys.argv[1] == 'rebuild-ganancias':
+            print("Reconstruyendo resúmenes de ganancias...")
+            meses = rebuild_ganancias()
+            print(f"Resúmenes reconstruidos: {meses} meses")
+            sys.exit(0)
+        
+        # Verificar (y opcionalmente reparar) los totales de repuestos cacheados
+        if len(sys.argv) > 1 and sys.argv[1] in ('check-repuestos', 'rebuild-repuestos'):
+            reparar = sys.argv[1] == 'rebuild-repuestos'
+            print("Verificando totales de repuestos...")
+            inconsistentes = check_total_repuestos(reparar=reparar)
+            print(f"Servicios inconsistentes: {inconsistentes}")
+            if reparar:
+                print("Totales recalculados")
+            sys.exit(1 if inconsistentes and not reparar else 0)
+        
+        # Importar clientes o services desde un CSV (reanudable)
+        if len(sys.argv) > 1 and sys.argv[1] == 'import':
+            if len(sys.argv) < 4 or sys.argv[2] not in ('clientes', 'services'):
+                print("Uso: python run_server.py import <clientes|services> <archivo.csv> [filas_por_lote]")
+                sys.exit(2)
+            tamano_lote = int(sys.argv[4]) if len(sys.argv) > 4 else None
+            print(f"Importando {sys.argv[2]} desde {sys.argv[3]}...")
+            insertadas, errores = import_csv(sys.argv[2], sys.argv[3], tamano_lote)
+            print(f"Importación terminada: {insertadas} filas insertadas, {errores} con errores")
+            sys.exit(0)
+        
         print("Creando aplicación...")
         app = create_app()
         
@@ -0,0 +1,134 @@
+"""
+Compara count_by_estado (un GROUP BY) con la versión anterior de cinco COUNT.
+
+Uso:
+    python scripts/bench_count_by_estado.py [filas] [repeticiones]
+
+Sin DATABASE_URL usa una base SQLite temporal; para medir en Postgres o
+MySQL, apuntar DATABASE_URL a una base vacía de prueba (el script inserta
+las filas y no las borra). Nunca usa la base por defecto de src/instance.
+"""
+import os
+import sys
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# La configuración se lee al importar src: la base se elige antes
+if not os.getenv('DATABASE_URL'):
+    _DIRECTORIO = tempfile.mkdtemp(prefix='serviceadmin-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_DIRECTORIO, 'bench.db')}"
+os.environ.pop('DATABASE_READ_URL', None)
+
+from sqlalchemy import func, insert  # noqa: E402
+from src.main import create_app  # noqa: E402
+from src.config.database import db  # noqa: E402
+from src.models.cliente import Cliente  # noqa: E402
+from src.models.service import Service  # noqa: E402
+from src.repositories.service_repository import ServiceRepository  # noqa: E402
+
+TAMANO_LOTE = 10000
+
+
+def cinco_counts(session) -> dict:
+    """Versión anterior de count_by_estado: un COUNT por estado más el total"""
+    return {
+        'total': session.query(Service).count(),
+        'pendientes': session.query(Service).filter_by(revisado=False).count(),
+        'revisados': session.query(Service).filter(
+            Service.revisado == True, Service.reparado == False
+        ).count(),
+        'reparados': session.query(Service).filter(
+            Service.reparado == True, Service.entregado == False
+        ).count(),
+        'entregados': session.query(Service).filter_by(entregado=True).count()
+    }
+
+
+def poblar(session, filas: int) -> None:
+    """
+    Inserta services hasta llegar a la cantidad pedida, repartidos en los cuatro estados.
+    
+    Args:
+        session: Sesión de la base de prueba
+        filas: Cantidad total de services
+    """
+    existentes = session.query(func.count(Service.codService)).scalar()
+    if existentes >= filas:
+        return
+    
+    cliente = Cliente(nombre='Cliente benchmark')
+    session.add(cliente)
+    session.flush()
+    
+    flags = [(False, False, False), (True, False, False), (True, True, False), (True, True, True)]
+    hoy = date.today()
+    for inicio in range(existentes, filas, TAMANO_LOTE):
+        lote = []
+        for i in range(inicio, min(inicio + TAMANO_LOTE, filas)):
+            revisado, reparado, entregado = flags[i % 4]
+            lote.append({
+                'codCliente': cliente.codCliente,
+                'nomProducto': f'Producto {i}',
+                'fecha': hoy - timedelta(days=i % 730),
+                'revisado': revisado,
+                'reparado': reparado,
+                'entregado': entregado,
+                'estado': Service.calcular_estado(revisado, reparado, entregado),
+                'costoRepuesto': 0,
+                'total_repuestos': 0,
+                'version': 1
+            })
+        session.execute(insert(Service), lote)
+        session.commit()
+
+
+def medir(funcion, repeticiones: int) -> list:
+    """
+    Ejecuta la función varias veces y devuelve los tiempos en segundos.
+    
+    Args:
+        funcion: Función sin argumentos a medir
+        repeticiones: Cantidad de ejecuciones (después de una de calentamiento)
+    
+    Returns:
+        Lista de duraciones
+    """
+    funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def main() -> None:
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    
+    app = create_app()
+    with app.app_context():
+        print(f"Base: {db.engine.url.render_as_string(hide_password=True)}")
+        print(f"Poblando {filas} services...")
+        poblar(db.session, filas)
+        
+        repositorio = ServiceRepository()
+        anterior = cinco_counts(db.session)
+        actual = repositorio.count_by_estado()
+        if anterior != actual:
+            print(f"Los resultados difieren: {anterior} != {actual}")
+            sys.exit(1)
+        
+        for nombre, funcion in (('5 x COUNT', lambda: cinco_counts(db.session)),
+                                ('GROUP BY', repositorio.count_by_estado)):
+            tiempos = medir(funcion, repeticiones)
+            print(f"{nombre:>10}: mediana {statistics.median(tiempos):.3f} s, "
+                  f"mínimo {min(tiempos):.3f} s ({repeticiones} repeticiones)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Mide el costo por llamada de las consultas frecuentes de los repositorios.
+
+Compara cada método (sentencias select() armadas una vez a nivel de módulo)
+con la versión anterior, que construía un session.query() en cada llamada.
+
+Uso:
+    python scripts/bench_hot_queries.py [services] [llamadas]
+
+Sin DATABASE_URL usa una base SQLite temporal; para medir en Postgres o
+MySQL, apuntar DATABASE_URL a una base vacía de prueba (el script inserta
+las filas y no las borra). Nunca usa la base por defecto de src/instance.
+"""
+import os
+import sys
+import tempfile
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# La configuración se lee al importar src: la base se elige antes
+if not os.getenv('DATABASE_URL'):
+    _DIRECTORIO = tempfile.mkdtemp(prefix='serviceadmin-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_DIRECTORIO, 'bench.db')}"
+os.environ.pop('DATABASE_READ_URL', None)
+
+from sqlalchemy import func, insert, select  # noqa: E402
+from src.main import create_app  # noqa: E402
+from src.config.database import db  # noqa: E402
+from src.models.cliente import Cliente  # noqa: E402
+from src.models.presupuesto import Presupuesto  # noqa: E402
+from src.models.service import Service  # noqa: E402
+from src.repositories.cliente_repository import ClienteRepository  # noqa: E402
+from src.repositories.presupuesto_repository import PresupuestoRepository  # noqa: E402
+from src.repositories.service_repository import ServiceRepository  # noqa: E402
+
+SERVICES_POR_CLIENTE = 10
+REPETICIONES = 5
+
+
+def poblar(session, services: int) -> None:
+    """
+    Inserta clientes, services en los cuatro estados y presupuestos para la mitad.
+    
+    Args:
+        session: Sesión de la base de prueba
+        services: Cantidad total de services
+    """
+    if session.query(func.count(Service.codService)).scalar():
+        return
+    
+    clientes = max(1, services // SERVICES_POR_CLIENTE)
+    session.execute(insert(Cliente), [
+        {'nombre': f'Cliente {i}', 'email': f'cliente{i}@test.com', 'version': 1}
+        for i in range(clientes)
+    ])
+    codigos = list(session.scalars(select(Cliente.codCliente).order_by(Cliente.codCliente)))
+    
+    flags = [(False, False, False), (True, False, False), (True, True, False), (True, True, True)]
+    hoy = date.today()
+    filas = []
+    for i in range(services):
+        revisado, reparado, entregado = flags[i % 4]
+        filas.append({
+            'codCliente': codigos[i % clientes],
+            'nomProducto': f'Producto {i}',
+            'fecha': hoy - timedelta(days=i % 365),
+            'revisado': revisado,
+            'reparado': reparado,
+            'entregado': entregado,
+            'estado': Service.calcular_estado(revisado, reparado, entregado),
+            'costoRepuesto': 0,
+            'total_repuestos': 0,
+            'version': 1
+        })
+    session.execute(insert(Service), filas)
+    
+    services_creados = list(session.scalars(select(Service.codService).order_by(Service.codService)))
+    session.execute(insert(Presupuesto), [
+        {'codService': cod, 'manoDeObra': 1000, 'version': 1}
+        for cod in services_creados[::2]
+    ])
+    session.commit()
+
+
+def casos(session) -> list:
+    """
+    Arma los pares (versión anterior, versión actual) de cada consulta.
+    
+    Args:
+        session: Sesión de la base de prueba
+    
+    Returns:
+        Lista de tuplas (nombre, función anterior, función actual)
+    """
+    clientes = ClienteRepository()
+    presupuestos = PresupuestoRepository()
+    services = ServiceRepository()
+    cod_cliente = session.query(func.min(Cliente.codCliente)).scalar()
+    cod_service = session.query(func.min(Presupuesto.codService)).scalar()
+    email = session.get(Cliente, cod_cliente).email
+    
+    return [
+        ('find_by_email',
+         lambda: session.query(Cliente).filter_by(email=email).first(),
+         lambda: clientes.find_by_email(email)),
+        ('find_by_service',
+         lambda: session.query(Presupuesto).filter_by(codService=cod_service).first(),
+         lambda: presupuestos.find_by_service(cod_service)),
+        ('find_by_cliente',
+         lambda: services._query().filter_by(
+             codCliente=cod_cliente
+         ).order_by(Service.fecha.desc()).all(),
+         lambda: services.find_by_cliente(cod_cliente)),
+        ('find_by_estado',
+         lambda: services._query('board').filter(
+             Service.estado == services.normalizar_estado('reparado')
+         ).order_by(Service.fecha).all(),
+         lambda: services.find_by_estado('reparado', profile='board')),
+        ('find_no_entregados',
+         lambda: services._query().filter(
+             Service.estado.in_(('Pendiente', 'Revisado', 'Reparado'))
+         ).order_by(Service.fecha).all(),
+         lambda: services.find_no_entregados()),
+    ]
+
+
+def por_llamada(funcion, llamadas: int) -> float:
+    """
+    Mide el mejor tiempo por llamada en microsegundos.
+    
+    Args:
+        funcion: Función sin argumentos a medir
+        llamadas: Llamadas por repetición (después de una de calentamiento)
+    
+    Returns:
+        Microsegundos por llamada de la repetición más rápida
+    """
+    funcion()
+    tiempos = timeit.repeat(funcion, number=llamadas, repeat=REPETICIONES)
+    return min(tiempos) / llamadas * 1e6
+
+
+def main() -> None:
+    services = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    llamadas = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    
+    app = create_app()
+    with app.app_context():
+        print(f"Base: {db.engine.url.render_as_string(hide_password=True)}")
+        print(f"Poblando {services} services...")
+        poblar(db.session, services)
+        
+        print(f"{'consulta':<20}{'session.query':>16}{'select()':>12}")
+        for nombre, anterior, actual in casos(db.session):
+            if anterior() != actual():
+                print(f"{nombre}: los resultados difieren")
+                sys.exit(1)
+            antes = por_llamada(anterior, llamadas)
+            despues = por_llamada(actual, llamadas)
+            print(f"{nombre:<20}{antes:>13.0f} us{despues:>9.0f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Compara la serialización de respuestas de FastJSONProvider con la de Flask.
+
+Serializa una lista de Service.to_dict() con jsonify (provider.response)
+usando DefaultJSONProvider, FastJSONProvider con el encoder disponible
+(orjson o msgspec) y FastJSONProvider forzado al json estándar.
+
+Uso:
+    python scripts/bench_json_provider.py [payloads] [repeticiones]
+
+Los services se arman en memoria; la aplicación usa una base SQLite
+temporal si no hay DATABASE_URL.
+"""
+import json
+import os
+import sys
+import tempfile
+import timeit
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# La configuración se lee al importar src: la base se elige antes
+if not os.getenv('DATABASE_URL'):
+    _DIRECTORIO = tempfile.mkdtemp(prefix='serviceadmin-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_DIRECTORIO, 'bench.db')}"
+os.environ.pop('DATABASE_READ_URL', None)
+# Salida compacta, como en producción (en debug jsonify indenta)
+os.environ['DEBUG'] = 'False'
+
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from src.main import create_app  # noqa: E402
+from src.api.json_provider import FastJSONProvider, JSON_BACKEND  # noqa: E402
+from src.models.cliente import Cliente  # noqa: E402
+from src.models.service import Service  # noqa: E402
+
+
+def armar_payloads(cantidad: int) -> list:
+    """
+    Arma los diccionarios de services transitorios, con su cliente.
+    
+    Args:
+        cantidad: Cantidad de services
+    
+    Returns:
+        Lista de Service.to_dict()
+    """
+    hoy = date.today()
+    clientes = [Cliente(nombre=f'Cliente ñandú {i}') for i in range(100)]
+    payloads = []
+    for i in range(cantidad):
+        service = Service(codCliente=i % 100 + 1, nomProducto=f'Notebook {i}',
+                          modelo='X-1000', descrip='Equipo con cargador',
+                          descripFalla='No enciende', codService=i + 1)
+        service.cliente = clientes[i % 100]
+        service.fecha = hoy - timedelta(days=i % 365)
+        service.estado = 'Pendiente'
+        service.total_repuestos = i % 5000
+        service.costoRepuesto = 0
+        service.version = 1
+        payloads.append(service.to_dict())
+    return payloads
+
+
+def main() -> None:
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    
+    app = create_app()
+    proveedores = [
+        ('DefaultJSONProvider', DefaultJSONProvider(app)),
+        (f'FastJSONProvider ({JSON_BACKEND})', FastJSONProvider(app)),
+        ('FastJSONProvider (json)', FastJSONProvider(app, backend='json')),
+    ]
+    
+    with app.test_request_context():
+        payloads = armar_payloads(cantidad)
+        cuerpos = {}
+        print(f"{cantidad} payloads de Service.to_dict(), mejor de {repeticiones}")
+        for nombre, proveedor in proveedores:
+            cuerpos[nombre] = proveedor.response(payloads).get_data()
+            mejor = min(timeit.repeat(lambda: proveedor.response(payloads).get_data(),
+                                      number=1, repeat=repeticiones))
+            print(f"{nombre:<30}{mejor * 1000:>8.1f} ms  {len(cuerpos[nombre]) / 1e6:.1f} MB")
+    
+    # Los dos caminos de FastJSONProvider deben producir el mismo contenido
+    rapido, estandar = (json.loads(cuerpos[nombre]) for nombre, _ in proveedores[1:])
+    if rapido != estandar:
+        print("Los encoders de FastJSONProvider producen contenidos distintos")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
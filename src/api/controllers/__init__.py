@@ -3,3 +3,4 @@ from src.api.controllers.base_controller import handle_errors
 from src.api.controllers.cliente_controller import cliente_bp
 from src.api.controllers.service_controller import service_bp
 from src.api.controllers.presupuesto_controller import presupuesto_bp
+from src.api.controllers.import_controller import import_bp
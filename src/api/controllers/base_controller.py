@@ -1,10 +1,19 @@
 """Controlador base con decoradores y utilidades"""
 from functools import wraps
-from flask import jsonify
+from flask import jsonify, make_response, request
+from sqlalchemy.orm.exc import StaleDataError
+from src.repositories.base_repository import Proyeccion
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Tamaño de página por defecto y máximo para la paginación por cursor
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Cantidad máxima de elementos por pedido de creación masiva
+MAX_BULK_SIZE = 5000
+
 
 def handle_errors(f):
     """
@@ -22,6 +31,12 @@ def handle_errors(f):
                 'success': False,
                 'message': str(e)
             }), 400
+        except StaleDataError as e:
+            logger.warning(f"Concurrent update in {f.__name__}: {str(e)}")
+            return jsonify({
+                'success': False,
+                'message': 'El registro fue modificado por otra petición, reintente'
+            }), 409
         except Exception as e:
             logger.error(f"Error in {f.__name__}: {str(e)}", exc_info=True)
             return jsonify({
@@ -31,6 +46,40 @@ def handle_errors(f):
     return decorated_function
 
 
+def conditional_get(etag_fn, weak=False):
+    """
+    Decorador para responder GET condicionales con ETag.
+    
+    etag_fn recibe los mismos argumentos de la ruta y devuelve el ETag
+    actual (o None si el recurso no existe). Si coincide con
+    If-None-Match se responde 304 sin ejecutar el endpoint; si no, se
+    agrega el ETag a la respuesta 200.
+    
+    Args:
+        etag_fn: Función que calcula el ETag a partir de contadores de versión
+        weak: Si el ETag es débil (listados)
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag = etag_fn(**kwargs)
+            if etag is None:
+                return f(*args, **kwargs)
+            
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=weak)
+            # Permitir guardar la respuesta, pero revalidarla siempre
+            response.cache_control.no_cache = True
+            return response
+        return decorated_function
+    return decorator
+
+
 def success_response(data=None, message=None, status_code=200):
     """
     Genera una respuesta de éxito estandarizada.
@@ -66,3 +115,145 @@ def error_response(message, status_code=400):
         'success': False,
         'message': message
     }), status_code
+
+
+def get_pagination_args():
+    """
+    Lee los parámetros de paginación por cursor de la query string.
+    
+    Query params:
+        limit: Tamaño de página (por defecto 50, máximo 500)
+        after: Cursor devuelto como next_cursor por la página anterior
+    
+    Returns:
+        Tuple (limit, after), o None si la petición no pide paginación
+        
+    Raises:
+        ValueError: Si limit no es un entero positivo
+    """
+    limit = request.args.get('limit')
+    after = request.args.get('after')
+    if limit is None and after is None:
+        return None
+    
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError("El parámetro limit debe ser un número entero")
+        if limit < 1:
+            raise ValueError("El parámetro limit debe ser mayor a cero")
+    return min(limit, MAX_PAGE_SIZE), after or None
+
+
+def get_proyeccion(modelo):
+    """
+    Lee los parámetros de campos y relaciones de la query string.
+    
+    Query params:
+        fields: Campos a devolver, separados por coma (ej. codService,estado)
+        include: Relaciones a expandir, separadas por coma (ej. cliente)
+    
+    Args:
+        modelo: Clase del modelo del recurso
+    
+    Returns:
+        Proyeccion, o None si la petición no usa fields ni include
+    
+    Raises:
+        ValueError: Si algún campo o relación no existe
+    """
+    fields = request.args.get('fields')
+    include = request.args.get('include')
+    if fields is None and include is None:
+        return None
+    return Proyeccion.desde_parametros(modelo, fields, include)
+
+
+def serializar(entidad, proyeccion=None):
+    """
+    Convierte una entidad a diccionario según la proyección pedida.
+    
+    Args:
+        entidad: Entidad del modelo
+        proyeccion: Resultado de get_proyeccion() (None para la respuesta
+            completa)
+    
+    Returns:
+        Diccionario de la entidad
+    """
+    if proyeccion is None:
+        return entidad.to_dict()
+    return proyeccion.serializar(entidad)
+
+
+def paginated_response(items, next_cursor):
+    """
+    Genera la respuesta de un listado paginado por cursor.
+    
+    Args:
+        items: Datos serializados de la página
+        next_cursor: Cursor de la página siguiente (None si es la última)
+        
+    Returns:
+        Tuple de (response, status_code)
+    """
+    return jsonify({
+        'success': True,
+        'count': len(items),
+        'data': items,
+        'next_cursor': next_cursor
+    }), 200
+
+
+def get_bulk_items():
+    """
+    Obtiene la lista de elementos de un pedido de creación masiva.
+    
+    Returns:
+        Lista de elementos enviada como cuerpo JSON
+        
+    Raises:
+        ValueError: Si el cuerpo no es una lista o excede MAX_BULK_SIZE
+    """
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        raise ValueError('Se esperaba una lista JSON no vacía')
+    if len(items) > MAX_BULK_SIZE:
+        raise ValueError(f'El lote no puede superar {MAX_BULK_SIZE} elementos')
+    return items
+
+
+def bulk_response(total, errores, ids, id_key):
+    """
+    Genera la respuesta de una creación masiva con el resultado de cada elemento.
+    
+    Args:
+        total: Cantidad de elementos enviados
+        errores: Diccionario índice -> mensaje de error (vacío si se creó el lote)
+        ids: Claves de los elementos creados, en el orden del lote
+        id_key: Nombre de la clave en cada resultado (ej. 'codCliente')
+        
+    Returns:
+        Tuple de (response, status_code): 201 si se creó el lote, 400 si no
+    """
+    if errores:
+        resultados = [
+            {'index': i, 'success': False, 'message': errores[i]} if i in errores
+            else {'index': i, 'success': False}
+            for i in range(total)
+        ]
+        return jsonify({
+            'success': False,
+            'message': f'{len(errores)} de {total} elementos con errores; no se creó ninguno',
+            'data': resultados
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'message': f'{len(ids)} elementos creados exitosamente',
+        'count': len(ids),
+        'data': [{'index': i, 'success': True, id_key: cod} for i, cod in enumerate(ids)]
+    }), 201
@@ -1,40 +1,68 @@
 """Controlador REST para Clientes"""
 from flask import Blueprint, request, jsonify
 from src.services.cliente_service import ClienteService
-from src.api.controllers.base_controller import handle_errors, success_response, error_response
+from src.services.version_service import VersionService
+from src.api.controllers.base_controller import (
+    handle_errors, success_response, error_response,
+    get_pagination_args, paginated_response, DEFAULT_PAGE_SIZE,
+    get_bulk_items, bulk_response, conditional_get, get_proyeccion, serializar
+)
+from src.models.cliente import Cliente
 
 cliente_bp = Blueprint('clientes', __name__, url_prefix='/api/clientes')
 cliente_service = ClienteService()
+version_service = VersionService()
 
 
 @cliente_bp.route('', methods=['GET'])
 @handle_errors
+@conditional_get(lambda: version_service.etag_listado('clientes'), weak=True)
 def listar_clientes():
     """
     Lista todos los clientes.
     
     Query params:
-        nombre: Filtrar por nombre (búsqueda parcial)
+        q: Buscar por nombre, teléfono, email o dirección (cada palabra por
+            prefijo en SQLite o como subcadena en PostgreSQL, ordenado por
+            relevancia). La búsqueda siempre se pagina: sin limit devuelve
+            los primeros 50 resultados y next_cursor
+        nombre: Alias de q
+        limit: Tamaño de página (activa la paginación por cursor)
+        after: Cursor de la página anterior (next_cursor)
+        fields: Campos a devolver, separados por coma
+        include: Relaciones a expandir (services)
     
     Returns:
         200: Lista de clientes
+        400: Campo o relación desconocidos
     """
-    nombre_filtro = request.args.get('nombre')
+    nombre_filtro = request.args.get('q') or request.args.get('nombre')
     
-    if nombre_filtro:
-        clientes = cliente_service.buscar_por_nombre(nombre_filtro)
-    else:
-        clientes = cliente_service.obtener_todos()
+    # to_dict() incluye los conteos de services: se calculan en SQL.
+    # Con fields solo se calculan los conteos pedidos.
+    proyeccion = get_proyeccion(Cliente)
+    perfil = proyeccion or 'conteos'
+    
+    pagination = get_pagination_args()
+    if pagination or nombre_filtro:
+        limit, after = pagination or (DEFAULT_PAGE_SIZE, None)
+        clientes, next_cursor = cliente_service.obtener_pagina(
+            limit, after, nombre=nombre_filtro, perfil=perfil
+        )
+        return paginated_response([serializar(c, proyeccion) for c in clientes], next_cursor)
+    
+    clientes = cliente_service.obtener_todos(perfil=perfil)
     
     return jsonify({
         'success': True,
         'count': len(clientes),
-        'data': [c.to_dict() for c in clientes]
+        'data': [serializar(c, proyeccion) for c in clientes]
     }), 200
 
 
 @cliente_bp.route('/<int:cod_cliente>', methods=['GET'])
 @handle_errors
+@conditional_get(lambda cod_cliente: version_service.etag_cliente(cod_cliente))
 def obtener_cliente(cod_cliente: int):
     """
     Obtiene información detallada de un cliente.
@@ -42,16 +70,22 @@ def obtener_cliente(cod_cliente: int):
     Args:
         cod_cliente: Código del cliente
     
+    Query params:
+        fields: Campos a devolver, separados por coma
+        include: Relaciones a expandir (services)
+    
     Returns:
         200: Información del cliente
+        400: Campo o relación desconocidos
         404: Cliente no encontrado
     """
-    cliente = cliente_service.obtener_cliente(cod_cliente)
+    proyeccion = get_proyeccion(Cliente)
+    cliente = cliente_service.obtener_cliente(cod_cliente, perfil=proyeccion or 'conteos')
     
     if not cliente:
         return error_response(f'Cliente con código {cod_cliente} no encontrado', 404)
     
-    return success_response(cliente.to_dict())
+    return success_response(serializar(cliente, proyeccion))
 
 
 @cliente_bp.route('', methods=['POST'])
@@ -84,6 +118,24 @@ def crear_cliente():
     }), 201
 
 
+@cliente_bp.route('/bulk', methods=['POST'])
+@handle_errors
+def crear_clientes_bulk():
+    """
+    Crea varios clientes en una sola transacción.
+    
+    Body JSON:
+        Lista de clientes con los mismos campos que POST /api/clientes
+    
+    Returns:
+        201: Clientes creados (codCliente de cada elemento)
+        400: Errores de validación por elemento; no se crea ninguno
+    """
+    items = get_bulk_items()
+    errores, ids = cliente_service.crear_clientes(items)
+    return bulk_response(len(items), errores, ids, 'codCliente')
+
+
 @cliente_bp.route('/<int:cod_cliente>', methods=['PUT'])
 @handle_errors
 def actualizar_cliente(cod_cliente: int):
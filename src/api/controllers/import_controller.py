@@ -0,0 +1,80 @@
+"""Controlador REST para la importación de planillas CSV"""
+import csv
+import io
+import json
+import logging
+from flask import Blueprint, Response, request, stream_with_context
+from src.services.import_service import ImportService, TAMANO_LOTE
+from src.api.controllers.base_controller import handle_errors, error_response
+
+logger = logging.getLogger(__name__)
+
+import_bp = Blueprint('import', __name__, url_prefix='/api/import')
+import_service = ImportService()
+
+
+@import_bp.route('', methods=['POST'])
+@handle_errors
+def importar_csv():
+    """
+    Importa clientes o services desde un CSV, por lotes.
+    
+    Query params:
+        tipo: clientes o services (requerido)
+        desde_fila: Filas de datos a saltear para reanudar (filas_procesadas
+            del último lote confirmado)
+        lote: Filas por lote (por defecto 1000)
+    
+    Body:
+        CSV con encabezado, como cuerpo (text/csv) o en el campo 'archivo'
+        de un formulario multipart
+    
+    Returns:
+        200: Progreso en NDJSON, una línea por lote confirmado y una final
+            con completado=true; si la importación falla a mitad de camino,
+            la línea final tiene completado=false, error y filas_procesadas
+            (el punto de reanudación para desde_fila)
+        400: Parámetros inválidos
+    """
+    tipo = request.args.get('tipo')
+    if tipo not in ('clientes', 'services'):
+        return error_response('El parámetro tipo debe ser clientes o services')
+    
+    try:
+        desde_fila = int(request.args.get('desde_fila', 0))
+        tamano_lote = int(request.args.get('lote', TAMANO_LOTE))
+    except ValueError:
+        raise ValueError("Los parámetros desde_fila y lote deben ser números enteros")
+    if desde_fila < 0 or tamano_lote < 1:
+        raise ValueError("desde_fila no puede ser negativo y lote debe ser mayor a cero")
+    
+    if 'archivo' in request.files:
+        binario = request.files['archivo'].stream
+    else:
+        binario = request.stream
+    lineas = io.TextIOWrapper(binario, encoding='utf-8-sig', newline='')
+    
+    def progreso():
+        # Corre después de que handle_errors devolvió la respuesta: los
+        # errores se informan en la última línea del stream
+        insertadas = errores = 0
+        filas_procesadas = desde_fila
+        final = {'completado': True}
+        try:
+            for lote in import_service.importar(tipo, lineas, desde_fila, tamano_lote):
+                insertadas += lote['insertadas']
+                errores += len(lote['errores'])
+                filas_procesadas = lote['filas_procesadas']
+                yield json.dumps(lote, ensure_ascii=False) + '\n'
+        except (ValueError, csv.Error) as e:
+            logger.warning(f"Importación de {tipo} interrumpida en la fila {filas_procesadas}: {e}")
+            final = {'completado': False, 'error': f'Archivo inválido: {e}'}
+        except Exception as e:
+            logger.error(f"Importación de {tipo} interrumpida en la fila {filas_procesadas}: {e}",
+                         exc_info=True)
+            final = {'completado': False, 'error': 'Error interno del servidor'}
+        
+        final.update(filas_procesadas=filas_procesadas, insertadas=insertadas, errores=errores)
+        yield json.dumps(final, ensure_ascii=False) + '\n'
+    
+    return Response(stream_with_context(progreso()), mimetype='application/x-ndjson')
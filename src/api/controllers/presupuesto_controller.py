@@ -1,35 +1,57 @@
 """Controlador REST para Presupuestos"""
 from flask import Blueprint, request, jsonify
 from src.services.presupuesto_service import PresupuestoService
-from src.api.controllers.base_controller import handle_errors, success_response, error_response
+from src.services.version_service import VersionService
+from src.api.controllers.base_controller import (
+    handle_errors, success_response, error_response,
+    get_pagination_args, paginated_response, conditional_get,
+    get_proyeccion, serializar
+)
+from src.models.presupuesto import Presupuesto
 
 presupuesto_bp = Blueprint('presupuestos', __name__, url_prefix='/api/presupuestos')
 presupuesto_service = PresupuestoService()
+version_service = VersionService()
 
 
 @presupuesto_bp.route('', methods=['GET'])
 @handle_errors
+@conditional_get(lambda: version_service.etag_listado('presupuestos'), weak=True)
 def listar_presupuestos():
     """
     Lista todos los presupuestos.
     
     Query params:
         pendientes: true para mostrar solo pendientes de aceptación
+        limit: Tamaño de página (activa la paginación por cursor)
+        after: Cursor de la página anterior (next_cursor)
+        fields: Campos a devolver, separados por coma
+        include: Relaciones a expandir (service)
     
     Returns:
         200: Lista de presupuestos
+        400: Campo o relación desconocidos
     """
     solo_pendientes = request.args.get('pendientes', '').lower() == 'true'
+    proyeccion = get_proyeccion(Presupuesto)
+    
+    pagination = get_pagination_args()
+    if pagination:
+        limit, after = pagination
+        presupuestos, next_cursor = presupuesto_service.obtener_pagina(
+            limit, after, solo_pendientes=solo_pendientes, perfil=proyeccion
+        )
+        return paginated_response([serializar(p, proyeccion) for p in presupuestos], next_cursor)
     
     if solo_pendientes:
-        presupuestos = presupuesto_service.obtener_pendientes()
+        presupuestos = presupuesto_service.obtener_pendientes(perfil=proyeccion)
     else:
-        presupuestos = presupuesto_service.obtener_todos()
+        presupuestos = presupuesto_service.obtener_todos(perfil=proyeccion)
     
     return jsonify({
         'success': True,
         'count': len(presupuestos),
-        'data': [p.to_dict() for p in presupuestos]
+        'data': [serializar(p, proyeccion) for p in presupuestos]
     }), 200
 
 
@@ -48,6 +70,7 @@ def obtener_ganancias():
 
 @presupuesto_bp.route('/<int:cod_presupuesto>', methods=['GET'])
 @handle_errors
+@conditional_get(lambda cod_presupuesto: version_service.etag_presupuesto(cod_presupuesto))
 def obtener_presupuesto(cod_presupuesto: int):
     """
     Obtiene información detallada de un presupuesto.
@@ -55,11 +78,17 @@ def obtener_presupuesto(cod_presupuesto: int):
     Args:
         cod_presupuesto: Código del presupuesto
     
+    Query params:
+        fields: Campos a devolver, separados por coma
+        include: Relaciones a expandir (service)
+    
     Returns:
         200: Información del presupuesto
+        400: Campo o relación desconocidos
         404: Presupuesto no encontrado
     """
-    presupuesto = presupuesto_service.obtener_presupuesto(cod_presupuesto)
+    proyeccion = get_proyeccion(Presupuesto)
+    presupuesto = presupuesto_service.obtener_presupuesto(cod_presupuesto, perfil=proyeccion)
     
     if not presupuesto:
         return error_response(
@@ -67,11 +96,14 @@ def obtener_presupuesto(cod_presupuesto: int):
             404
         )
     
-    return success_response(presupuesto.to_dict())
+    return success_response(serializar(presupuesto, proyeccion))
 
 
 @presupuesto_bp.route('/service/<int:cod_service>', methods=['GET'])
 @handle_errors
+@conditional_get(
+    lambda cod_service: version_service.etag_presupuesto_de_service(cod_service), weak=True
+)
 def obtener_por_service(cod_service: int):
     """
     Obtiene el presupuesto de un servicio.
@@ -79,11 +111,17 @@ def obtener_por_service(cod_service: int):
     Args:
         cod_service: Código del servicio
     
+    Query params:
+        fields: Campos a devolver, separados por coma
+        include: Relaciones a expandir (service)
+    
     Returns:
         200: Presupuesto del servicio
+        400: Campo o relación desconocidos
         404: No tiene presupuesto
     """
-    presupuesto = presupuesto_service.obtener_por_service(cod_service)
+    proyeccion = get_proyeccion(Presupuesto)
+    presupuesto = presupuesto_service.obtener_por_service(cod_service, perfil=proyeccion)
     
     if not presupuesto:
         return error_response(
@@ -91,7 +129,7 @@ def obtener_por_service(cod_service: int):
             404
         )
     
-    return success_response(presupuesto.to_dict())
+    return success_response(serializar(presupuesto, proyeccion))
 
 
 @presupuesto_bp.route('', methods=['POST'])
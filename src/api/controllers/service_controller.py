@@ -1,14 +1,26 @@
 """Controlador REST para Services (Reparaciones)"""
-from flask import Blueprint, request, jsonify
+import csv
+import io
+import json
+from datetime import date
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from src.services.service_service import ServiceService
-from src.api.controllers.base_controller import handle_errors, success_response, error_response
+from src.services.version_service import VersionService
+from src.api.controllers.base_controller import (
+    handle_errors, success_response, error_response,
+    get_pagination_args, paginated_response, DEFAULT_PAGE_SIZE,
+    get_bulk_items, bulk_response, conditional_get, get_proyeccion, serializar
+)
+from src.models.service import Service
 
 service_bp = Blueprint('services', __name__, url_prefix='/api/services')
 service_service = ServiceService()
+version_service = VersionService()
 
 
 @service_bp.route('', methods=['GET'])
 @handle_errors
+@conditional_get(lambda: version_service.etag_listado('services'), weak=True)
 def listar_services():
     """
     Lista todos los servicios.
@@ -16,35 +28,152 @@ def listar_services():
     Query params:
         cliente: Filtrar por código de cliente
         estado: Filtrar por estado (pendiente, revisado, reparado, entregado)
+        limit: Tamaño de página (activa la paginación por cursor)
+        after: Cursor de la página anterior (next_cursor)
+        fields: Campos a devolver, separados por coma
+        include: Relaciones a expandir (cliente, presupuesto, repuestos)
     
     Returns:
         200: Lista de servicios
+        400: Campo o relación desconocidos
     """
     cliente_filtro = request.args.get('cliente')
     estado_filtro = request.args.get('estado')
     
+    # to_dict() usa cliente, presupuesto y repuestos: se cargan por lotes.
+    # Con fields/include solo se cargan las relaciones pedidas.
+    proyeccion = get_proyeccion(Service)
+    perfil = proyeccion or 'list'
+    
+    pagination = get_pagination_args()
+    if pagination:
+        limit, after = pagination
+        services, next_cursor = service_service.obtener_pagina(
+            limit, after,
+            cod_cliente=int(cliente_filtro) if cliente_filtro else None,
+            estado=estado_filtro,
+            perfil=perfil
+        )
+        return paginated_response([serializar(s, proyeccion) for s in services], next_cursor)
+    
     if cliente_filtro:
-        services = service_service.obtener_por_cliente(int(cliente_filtro))
+        services = service_service.obtener_por_cliente(int(cliente_filtro), perfil=perfil)
     elif estado_filtro:
-        estado_lower = estado_filtro.lower()
-        if estado_lower == 'pendiente':
-            services = service_service.obtener_pendientes()
-        elif estado_lower == 'entregado':
-            services = [s for s in service_service.obtener_todos() if s.entregado]
-        elif estado_lower == 'reparado':
-            services = service_service.obtener_listos_para_entregar()
-        else:
-            services = service_service.obtener_todos()
+        services = service_service.obtener_por_estado(estado_filtro, perfil=perfil)
     else:
-        services = service_service.obtener_todos()
+        services = service_service.obtener_todos(perfil=perfil)
     
     return jsonify({
         'success': True,
         'count': len(services),
-        'data': [s.to_dict() for s in services]
+        'data': [serializar(s, proyeccion) for s in services]
     }), 200
 
 
+def _parse_fecha(nombre: str):
+    """Lee un parámetro de fecha AAAA-MM-DD de la query string (None si falta)"""
+    valor = request.args.get(nombre)
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f"Fecha inválida en '{nombre}': {valor} (formato AAAA-MM-DD)")
+
+
+def _valor_exportable(valor):
+    """Convierte fechas a ISO para la exportación"""
+    return valor.isoformat() if isinstance(valor, date) else valor
+
+
+def _lotes_ndjson(lotes):
+    """Genera una línea JSON por fila"""
+    for filas in lotes:
+        yield ''.join(
+            json.dumps({k: _valor_exportable(v) for k, v in fila.items()}, ensure_ascii=False) + '\n'
+            for fila in filas
+        )
+
+
+def _lotes_csv(lotes, columnas):
+    """Genera el CSV: el encabezado y luego un bloque de texto por lote"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columnas)
+    yield buffer.getvalue()
+    
+    for filas in lotes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows([_valor_exportable(v) for v in fila.values()] for fila in filas)
+        yield buffer.getvalue()
+
+
+@service_bp.route('/export', methods=['GET'])
+@handle_errors
+def exportar_services():
+    """
+    Exporta el historial de servicios sin cargarlo completo en memoria.
+    
+    Query params:
+        format: ndjson (por defecto) o csv
+        desde: Fecha de ingreso mínima, inclusive (AAAA-MM-DD)
+        hasta: Fecha de ingreso máxima, inclusive (AAAA-MM-DD)
+    
+    Returns:
+        200: Filas en NDJSON o CSV, enviadas a medida que se leen
+        400: Formato o fechas inválidos
+    """
+    formato = request.args.get('format', 'ndjson').lower()
+    if formato not in ('ndjson', 'csv'):
+        return error_response(f'Formato no soportado: {formato} (usar ndjson o csv)')
+    
+    lotes = service_service.exportar(_parse_fecha('desde'), _parse_fecha('hasta'))
+    
+    if formato == 'csv':
+        cuerpo = _lotes_csv(lotes, service_service.columnas_exportacion())
+        mimetype = 'text/csv'
+    else:
+        cuerpo = _lotes_ndjson(lotes)
+        mimetype = 'application/x-ndjson'
+    
+    return Response(
+        stream_with_context(cuerpo),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=services.{formato}'}
+    )
+
+
+@service_bp.route('/search', methods=['GET'])
+@handle_errors
+def buscar_services():
+    """
+    Busca servicios por producto, modelo, descripción o falla.
+    
+    Query params:
+        q: Texto a buscar (requerido); cada palabra por prefijo en SQLite o
+            como subcadena en PostgreSQL
+        limit: Tamaño de página (por defecto 50)
+        after: Cursor de la página anterior (next_cursor)
+        fields: Campos a devolver, separados por coma
+        include: Relaciones a expandir (cliente, presupuesto, repuestos)
+    
+    Returns:
+        200: Servicios ordenados por relevancia
+        400: Falta el texto de búsqueda, o campo o relación desconocidos
+    """
+    texto = request.args.get('q', '').strip()
+    if not texto:
+        return error_response('Debe indicar el texto de búsqueda (q)')
+    
+    proyeccion = get_proyeccion(Service)
+    limit, after = get_pagination_args() or (DEFAULT_PAGE_SIZE, None)
+    services, next_cursor = service_service.buscar(
+        texto, limit, after, perfil=proyeccion or 'list'
+    )
+    return paginated_response([serializar(s, proyeccion) for s in services], next_cursor)
+
+
 @service_bp.route('/estadisticas', methods=['GET'])
 @handle_errors
 def obtener_estadisticas():
@@ -60,6 +189,7 @@ def obtener_estadisticas():
 
 @service_bp.route('/<int:cod_service>', methods=['GET'])
 @handle_errors
+@conditional_get(lambda cod_service: version_service.etag_service(cod_service))
 def obtener_service(cod_service: int):
     """
     Obtiene información detallada de un servicio.
@@ -67,15 +197,24 @@ def obtener_service(cod_service: int):
     Args:
         cod_service: Código del servicio
     
+    Query params:
+        fields: Campos a devolver, separados por coma
+        include: Relaciones a expandir (cliente, presupuesto, repuestos)
+    
     Returns:
         200: Información del servicio
+        400: Campo o relación desconocidos
         404: Servicio no encontrado
     """
-    service = service_service.obtener_service(cod_service)
+    proyeccion = get_proyeccion(Service)
+    service = service_service.obtener_service(cod_service, perfil=proyeccion or 'detail')
     
     if not service:
         return error_response(f'Servicio con código {cod_service} no encontrado', 404)
     
+    if proyeccion:
+        return success_response(proyeccion.serializar(service))
+    
     data = service.to_dict()
     # Incluir presupuesto si existe
     if service.presupuesto:
@@ -115,6 +254,24 @@ def crear_service():
     }), 201
 
 
+@service_bp.route('/bulk', methods=['POST'])
+@handle_errors
+def crear_services_bulk():
+    """
+    Crea varios servicios en una sola transacción.
+    
+    Body JSON:
+        Lista de servicios con los mismos campos que POST /api/services
+    
+    Returns:
+        201: Servicios creados (codService de cada elemento)
+        400: Errores de validación por elemento; no se crea ninguno
+    """
+    items = get_bulk_items()
+    errores, ids = service_service.crear_services(items)
+    return bulk_response(len(items), errores, ids, 'codService')
+
+
 @service_bp.route('/<int:cod_service>', methods=['PUT'])
 @handle_errors
 def actualizar_service(cod_service: int):
@@ -209,6 +366,42 @@ def marcar_entregado(cod_service: int):
     }), 200
 
 
+@service_bp.route('/bulk/<accion>', methods=['POST'])
+@handle_errors
+def marcar_services_bulk(accion: str):
+    """
+    Marca varios servicios como revisados, reparados o entregados.
+    
+    Args:
+        accion: revisar, reparar o entregar
+        
+    Body JSON:
+        Lista de códigos de servicio
+    
+    Returns:
+        200: Servicios actualizados y códigos que fallaron con el motivo
+        400: Cuerpo inválido o códigos que no son enteros
+        404: Acción desconocida
+    """
+    if accion not in ('revisar', 'reparar', 'entregar'):
+        return error_response(f'Acción desconocida: {accion}', 404)
+    
+    ids = get_bulk_items()
+    actualizados, errores = service_service.marcar_lote(accion, ids)
+    
+    return jsonify({
+        'success': not errores,
+        'message': f'{len(actualizados)} de {len(ids)} servicios actualizados',
+        'count': len(actualizados),
+        'data': {
+            'actualizados': actualizados,
+            'fallidos': [
+                {'codService': cod, 'message': mensaje} for cod, mensaje in errores.items()
+            ]
+        }
+    }), 200
+
+
 @service_bp.route('/<int:cod_service>', methods=['DELETE'])
 @handle_errors
 def eliminar_service(cod_service: int):
@@ -242,15 +435,13 @@ def listar_repuestos(cod_service: int):
     Returns:
         200: Lista de repuestos
     """
-    from src.models.repuesto import Repuesto
-    
     service = service_service.obtener_service(cod_service)
     if not service:
         return error_response(f'Servicio {cod_service} no encontrado', 404)
     
     return jsonify({
         'success': True,
-        'data': [r.to_dict() for r in service.repuestos],
+        'data': [r.to_dict() for r in service_service.obtener_repuestos(cod_service)],
         'total': service.total_costo_repuestos
     }), 200
 
@@ -268,9 +459,6 @@ def agregar_repuesto(cod_service: int):
     Returns:
         201: Repuesto agregado
     """
-    from src.models.repuesto import Repuesto
-    from src.config.database import db
-    
     service = service_service.obtener_service(cod_service)
     if not service:
         return error_response(f'Servicio {cod_service} no encontrado', 404)
@@ -279,15 +467,12 @@ def agregar_repuesto(cod_service: int):
     if not data or not data.get('nombre'):
         return error_response('El nombre del repuesto es requerido')
     
-    repuesto = Repuesto(
-        codService=cod_service,
+    repuesto = service_service.agregar_repuesto(
+        cod_service,
         nombre=data['nombre'],
         costo=int(data.get('costo', 0))
     )
     
-    db.session.add(repuesto)
-    db.session.commit()
-    
     return jsonify({
         'success': True,
         'message': 'Repuesto agregado exitosamente',
@@ -295,6 +480,28 @@ def agregar_repuesto(cod_service: int):
     }), 201
 
 
+@service_bp.route('/<int:cod_service>/repuestos/bulk', methods=['POST'])
+@handle_errors
+def agregar_repuestos_bulk(cod_service: int):
+    """
+    Agrega varios repuestos a un servicio en una sola transacción.
+    
+    Body JSON:
+        Lista de repuestos con nombre (requerido) y costo
+    
+    Returns:
+        201: Repuestos agregados (id de cada elemento)
+        400: Errores de validación por elemento; no se agrega ninguno
+        404: Servicio no encontrado
+    """
+    if not service_service.obtener_service(cod_service):
+        return error_response(f'Servicio {cod_service} no encontrado', 404)
+    
+    items = get_bulk_items()
+    errores, ids = service_service.agregar_repuestos(cod_service, items)
+    return bulk_response(len(items), errores, ids, 'id')
+
+
 @service_bp.route('/<int:cod_service>/repuestos/<int:repuesto_id>', methods=['PUT'])
 @handle_errors
 def actualizar_repuesto(cod_service: int, repuesto_id: int):
@@ -308,20 +515,12 @@ def actualizar_repuesto(cod_service: int, repuesto_id: int):
     Returns:
         200: Repuesto actualizado
     """
-    from src.models.repuesto import Repuesto
-    from src.config.database import db
-    
-    repuesto = Repuesto.query.filter_by(id=repuesto_id, codService=cod_service).first()
+    repuesto = service_service.obtener_repuesto(cod_service, repuesto_id)
     if not repuesto:
         return error_response(f'Repuesto no encontrado', 404)
     
     data = request.get_json()
-    if data.get('nombre'):
-        repuesto.nombre = data['nombre']
-    if 'costo' in data:
-        repuesto.costo = int(data['costo'])
-    
-    db.session.commit()
+    repuesto = service_service.actualizar_repuesto(repuesto, data)
     
     return jsonify({
         'success': True,
@@ -339,18 +538,13 @@ def eliminar_repuesto(cod_service: int, repuesto_id: int):
     Returns:
         200: Repuesto eliminado
     """
-    from src.models.repuesto import Repuesto
-    from src.config.database import db
-    
-    repuesto = Repuesto.query.filter_by(id=repuesto_id, codService=cod_service).first()
+    repuesto = service_service.obtener_repuesto(cod_service, repuesto_id)
     if not repuesto:
         return error_response(f'Repuesto no encontrado', 404)
     
-    db.session.delete(repuesto)
-    db.session.commit()
+    service_service.eliminar_repuesto(repuesto)
     
     return jsonify({
         'success': True,
         'message': 'Repuesto eliminado exitosamente'
     }), 200
-
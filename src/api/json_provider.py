@@ -0,0 +1,107 @@
+"""Proveedor JSON de la API: orjson o msgspec si están instalados"""
+from datetime import date
+from typing import Any, Callable, Optional
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depende del entorno
+    msgspec = None
+
+
+def _default(o: Any) -> Any:
+    """
+    Convierte los tipos que el encoder no conoce.
+    
+    Las fechas van en ISO 8601 (AAAA-MM-DD), igual que las serializan
+    orjson y msgspec; el resto sigue las reglas de Flask.
+    """
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+def _encoder_orjson(obj: Any, sort_keys: bool, indent: bool) -> bytes:
+    opciones = orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        opciones |= orjson.OPT_SORT_KEYS
+    if indent:
+        opciones |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=_default, option=opciones)
+
+
+_ENCODERS_MSGSPEC = {}
+
+
+def _encoder_msgspec(obj: Any, sort_keys: bool, indent: bool) -> bytes:
+    encoder = _ENCODERS_MSGSPEC.get(sort_keys)
+    if encoder is None:
+        encoder = msgspec.json.Encoder(enc_hook=_default, order='sorted' if sort_keys else None)
+        _ENCODERS_MSGSPEC[sort_keys] = encoder
+    datos = encoder.encode(obj)
+    return msgspec.json.format(datos, indent=2) if indent else datos
+
+
+def _elegir_backend():
+    """Elige el encoder disponible: orjson, msgspec o ninguno (json estándar)"""
+    if orjson is not None:
+        return 'orjson', _encoder_orjson, orjson.loads
+    if msgspec is not None:
+        return 'msgspec', _encoder_msgspec, msgspec.json.decode
+    return 'json', None, None
+
+
+JSON_BACKEND, _encoder, _decoder = _elegir_backend()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Proveedor JSON de Flask con un encoder nativo.
+    
+    jsonify() y request.get_json() usan orjson (o msgspec) cuando está
+    instalado y el json estándar si no. Las fechas (ej. Service.fecha) se
+    serializan en ISO 8601 con cualquiera de los tres, así los modelos
+    pueden devolver el objeto date sin convertirlo. La salida no escapa
+    caracteres no ASCII y mantiene las claves ordenadas.
+    """
+    
+    default: Callable[[Any], Any] = staticmethod(_default)
+    ensure_ascii = False
+    
+    def __init__(self, app, backend: Optional[str] = None):
+        """
+        Args:
+            app: Aplicación Flask
+            backend: Forzar 'json' para usar el encoder estándar (opcional)
+        """
+        super().__init__(app)
+        if backend == 'json':
+            self.backend, self._encoder, self._decoder = 'json', None, None
+        else:
+            self.backend, self._encoder, self._decoder = JSON_BACKEND, _encoder, _decoder
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # Con argumentos propios de json.dumps se respeta su semántica exacta
+        if self._encoder is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._encoder(obj, self.sort_keys, False).decode('utf-8')
+    
+    def loads(self, s, **kwargs: Any) -> Any:
+        if self._decoder is None or kwargs:
+            return super().loads(s, **kwargs)
+        return self._decoder(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        if self._encoder is None:
+            return super().response(*args, **kwargs)
+        
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._encoder(obj, self.sort_keys, indent) + b'\n', mimetype=self.mimetype
+        )
@@ -1,43 +1,299 @@
 """Configuración de la base de datos"""
+import sqlite3
+import time
+from flask import g, has_request_context, request, session as flask_session
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSession
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import text
+from sqlalchemy import bindparam, event, text
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bind de la réplica de solo lectura (SQLALCHEMY_BINDS)
+REPLICA_BIND = 'replica'
+
+# Clave de la sesión HTTP con el instante hasta el que se lee de la primaria
+_CLAVE_LEER_PRIMARIA = '_leer_primaria_hasta'
+
 
 class Base(DeclarativeBase):
-    """Clase base para todos los modelos"""
-    pass
+    """
+    Clase base para todos los modelos.
+    
+    Los modelos expuestos en la API declaran los campos de su to_dict()
+    para los parámetros fields/include:
+    
+    - CAMPOS: todos los campos, en orden.
+    - CAMPOS_DERIVADOS: campos que no son columnas, asociados a la relación,
+      expresión o columna de la que salen.
+    - INCLUSIONES: relaciones que se pueden expandir.
+    """
+    CAMPOS: tuple = ()
+    CAMPOS_DERIVADOS: dict = {}
+    INCLUSIONES: tuple = ()
+    
+    @classmethod
+    def campos_columna(cls) -> list:
+        """Campos de to_dict() que son columnas propias (sin relaciones)"""
+        return [c for c in cls.CAMPOS if c not in cls.CAMPOS_DERIVADOS]
+
+
+class RoutingSession(FlaskSession):
+    """
+    Sesión que envía las lecturas de las peticiones GET a la réplica.
+    
+    Las escrituras, los flush y cualquier petición que no sea GET/HEAD usan
+    la base primaria. Después de escribir, el mismo cliente (sesión HTTP)
+    sigue leyendo de la primaria durante read_sticky_seconds, para ver sus
+    propios cambios aunque la réplica todavía no los tenga.
+    """
+    
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._leer_de_replica(clause):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+    
+    def _leer_de_replica(self, clause) -> bool:
+        """Decide si la sentencia puede ejecutarse en la réplica"""
+        if REPLICA_BIND not in self._db.engines or self._flushing:
+            return False
+        if not has_request_context() or request.method not in ('GET', 'HEAD'):
+            return False
+        if clause is not None and getattr(clause, 'is_dml', False):
+            return False
+        if g.get('leer_primaria'):
+            return False
+        return flask_session.get(_CLAVE_LEER_PRIMARIA, 0) <= time.time()
+
+
+def _registrar_escritura() -> None:
+    """Fija la lectura desde la primaria para el cliente que acaba de escribir"""
+    if not has_request_context():
+        return
+    from src.config.settings import settings
+    g.leer_primaria = True
+    if settings.database.read_url:
+        flask_session[_CLAVE_LEER_PRIMARIA] = time.time() + settings.database.read_sticky_seconds
+
+
+# Tablas con contador de versión (ETag de los listados)
+TABLAS_VERSIONADAS = ('clientes', 'services', 'presupuestos', 'repuestos')
+
+# Clave de session.info con las tablas modificadas en la transacción
+_CLAVE_TABLAS_MODIFICADAS = 'tablas_modificadas'
+
+
+def registrar_tabla_modificada(session, tabla: str) -> None:
+    """
+    Anota que la transacción en curso modificó una tabla versionada.
+    
+    Los flush y las sentencias DML del ORM se anotan solos; solo hace falta
+    llamarla para escrituras que no pasan por la sesión (ej. COPY).
+    
+    Args:
+        session: Sesión de la transacción
+        tabla: Nombre de la tabla
+    """
+    if tabla in TABLAS_VERSIONADAS:
+        session.info.setdefault(_CLAVE_TABLAS_MODIFICADAS, set()).add(tabla)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _escritura_por_flush(session, flush_context):
+    _registrar_escritura()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        registrar_tabla_modificada(session, getattr(obj, '__tablename__', None))
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _escritura_por_sentencia(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _registrar_escritura()
+        tabla = getattr(orm_execute_state.statement, 'table', None)
+        if tabla is not None:
+            registrar_tabla_modificada(orm_execute_state.session, tabla.name)
+
+
+@event.listens_for(RoutingSession, 'before_commit')
+def _incrementar_versiones(session):
+    """Incrementa, dentro de la misma transacción, la versión de las tablas modificadas"""
+    # El flush final de commit() ocurre después de este evento: se adelanta
+    session.flush()
+    tablas = session.info.pop(_CLAVE_TABLAS_MODIFICADAS, None)
+    if tablas:
+        session.execute(
+            text("UPDATE versiones_tablas SET version = version + 1 WHERE tabla IN :tablas")
+            .bindparams(bindparam('tablas', expanding=True)),
+            {'tablas': sorted(tablas)}
+        )
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _descartar_versiones(session):
+    session.info.pop(_CLAVE_TABLAS_MODIFICADAS, None)
+
+
+db = SQLAlchemy(model_class=Base, session_options={'class_': RoutingSession})
+
+
+def _get_columns(table: str) -> list:
+    """Obtiene los nombres de columna de una tabla según el dialecto"""
+    dialect = db.engine.dialect.name
+    
+    if dialect == 'sqlite':
+        # SQLite: usar PRAGMA
+        result = db.session.execute(
+            text(f"PRAGMA table_info({table})")
+        ).fetchall()
+        return [row[1] for row in result]
+    
+    # PostgreSQL: usar information_schema
+    result = db.session.execute(
+        text("""
+            SELECT column_name 
+            FROM information_schema.columns 
+            WHERE table_name = :table
+        """),
+        {'table': table}
+    ).fetchall()
+    return [row[0] for row in result]
+
+
+def _crear_versiones_tablas():
+    """
+    Crea la fila de versión de cada tabla versionada que aún no la tiene.
+    
+    La versión inicial es el instante actual, para que una base recreada
+    no repita ETags que los clientes puedan tener guardados.
+    """
+    existentes = set(db.session.execute(text("SELECT tabla FROM versiones_tablas")).scalars())
+    faltantes = [t for t in TABLAS_VERSIONADAS if t not in existentes]
+    if faltantes:
+        inicial = int(time.time())
+        db.session.execute(
+            text("INSERT INTO versiones_tablas (tabla, version) VALUES (:tabla, :version)"),
+            [{'tabla': t, 'version': inicial} for t in faltantes]
+        )
+        db.session.commit()
+
+
+def _sembrar_ganancias():
+    """
+    Calcula ganancias_mensuales si está vacía y ya hay presupuestos.
+    
+    Los resúmenes se mantienen sumando deltas: sobre una base existente,
+    sin esta carga inicial, el primer delta de un mes crearía una fila
+    parcial que los reportes de meses cerrados tomarían como total.
+    """
+    if db.session.execute(text("SELECT 1 FROM ganancias_mensuales LIMIT 1")).first():
+        return
+    if not db.session.execute(text("SELECT 1 FROM presupuestos LIMIT 1")).first():
+        return
+    
+    from src.repositories.reporte_repository import ReporteRepository
+    logger.info("Calculando resúmenes de ganancias mensuales...")
+    meses = ReporteRepository().reconstruir_resumenes()
+    logger.info(f"Resúmenes de ganancias calculados: {meses} meses")
+
+
+def _create_missing_indexes():
+    """Crea los índices declarados en los modelos que aún no existen"""
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+
+# Tablas con índice de búsqueda: (clave primaria, campos indexados)
+BUSQUEDA_CAMPOS = {
+    'clientes': ('codCliente', ('nombre', 'tel', 'email', 'direccion')),
+    'services': ('codService', ('nomProducto', 'modelo', 'descrip', 'descripFalla')),
+}
 
 
-db = SQLAlchemy(model_class=Base)
+def documento_busqueda_pg(tabla: str) -> str:
+    """
+    Expresión SQL con los campos de búsqueda concatenados (PostgreSQL).
+    
+    Debe coincidir exactamente con la del índice de trigramas.
+    """
+    _, campos = BUSQUEDA_CAMPOS[tabla]
+    return " || ' ' || ".join(f'coalesce("{c}", \'\')' for c in campos)
+
+
+def _setup_fts5(tabla: str):
+    """Crea la tabla virtual FTS5 de una tabla y sus triggers de sincronización"""
+    clave, campos = BUSQUEDA_CAMPOS[tabla]
+    fts = f'{tabla}_fts'
+    
+    existe = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :fts"), {'fts': fts}
+    ).first()
+    if existe:
+        return
+    
+    logger.info(f"Creando índice FTS5 de búsqueda para '{tabla}'...")
+    columnas = ', '.join(f'"{c}"' for c in campos)
+    nuevos = ', '.join(f'new."{c}"' for c in campos)
+    viejos = ', '.join(f'old."{c}"' for c in campos)
+    
+    db.session.execute(text(f"""
+        CREATE VIRTUAL TABLE {fts} USING fts5(
+            {columnas},
+            content='{tabla}', content_rowid='{clave}',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """))
+    db.session.execute(text(f"""
+        CREATE TRIGGER {fts}_ai AFTER INSERT ON {tabla} BEGIN
+            INSERT INTO {fts}(rowid, {columnas}) VALUES (new."{clave}", {nuevos});
+        END
+    """))
+    db.session.execute(text(f"""
+        CREATE TRIGGER {fts}_ad AFTER DELETE ON {tabla} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {columnas})
+            VALUES ('delete', old."{clave}", {viejos});
+        END
+    """))
+    db.session.execute(text(f"""
+        CREATE TRIGGER {fts}_au AFTER UPDATE ON {tabla} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {columnas})
+            VALUES ('delete', old."{clave}", {viejos});
+            INSERT INTO {fts}(rowid, {columnas}) VALUES (new."{clave}", {nuevos});
+        END
+    """))
+    # Indexar las filas existentes
+    db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+def _setup_busqueda():
+    """
+    Crea los índices de búsqueda de texto declarados en BUSQUEDA_CAMPOS.
+    
+    SQLite: tablas virtuales FTS5 sincronizadas por triggers.
+    PostgreSQL: índices GIN de trigramas sobre los campos concatenados.
+    """
+    dialect = db.engine.dialect.name
+    
+    if dialect == 'sqlite':
+        for tabla in BUSQUEDA_CAMPOS:
+            _setup_fts5(tabla)
+    elif dialect == 'postgresql':
+        db.session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for tabla in BUSQUEDA_CAMPOS:
+            db.session.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{tabla}_busqueda_trgm ON {tabla} "
+                f"USING gin (({documento_busqueda_pg(tabla)}) gin_trgm_ops)"
+            ))
+        db.session.commit()
 
 
 def run_migrations(app):
     """Ejecuta migraciones necesarias para mantener el schema actualizado"""
     with app.app_context():
         try:
-            # Detectar tipo de base de datos
-            dialect = db.engine.dialect.name
-            
-            if dialect == 'sqlite':
-                # SQLite: usar PRAGMA
-                result = db.session.execute(
-                    text("PRAGMA table_info(clientes)")
-                ).fetchall()
-                columns = [row[1] for row in result]
-            else:
-                # PostgreSQL: usar information_schema
-                result = db.session.execute(
-                    text("""
-                        SELECT column_name 
-                        FROM information_schema.columns 
-                        WHERE table_name = 'clientes'
-                    """)
-                ).fetchall()
-                columns = [row[0] for row in result]
+            columns = _get_columns('clientes')
             
             if 'descripcion' not in columns:
                 logger.info("Agregando columna 'descripcion' a tabla 'clientes'...")
@@ -46,16 +302,144 @@ def run_migrations(app):
                 )
                 db.session.commit()
                 logger.info("Columna 'descripcion' agregada exitosamente")
+            
+            columns = _get_columns('services')
+            
+            if 'estado' not in columns:
+                logger.info("Agregando columna 'estado' a tabla 'services'...")
+                db.session.execute(
+                    text("ALTER TABLE services ADD COLUMN estado VARCHAR(15) "
+                         "NOT NULL DEFAULT 'Pendiente'")
+                )
+                # Backfill a partir de los flags existentes
+                db.session.execute(
+                    text("""
+                        UPDATE services SET estado = CASE
+                            WHEN entregado THEN 'Entregado'
+                            WHEN reparado THEN 'Reparado'
+                            WHEN revisado THEN 'Revisado'
+                            ELSE 'Pendiente'
+                        END
+                    """)
+                )
+                db.session.commit()
+                logger.info("Columna 'estado' agregada exitosamente")
+            
+            if 'total_repuestos' not in columns:
+                logger.info("Agregando columna 'total_repuestos' a tabla 'services'...")
+                db.session.execute(
+                    text("ALTER TABLE services ADD COLUMN total_repuestos INTEGER "
+                         "NOT NULL DEFAULT 0")
+                )
+                # Backfill a partir de los repuestos existentes
+                db.session.execute(
+                    text("""
+                        UPDATE services SET total_repuestos = COALESCE((
+                            SELECT SUM(repuestos.costo) FROM repuestos
+                            WHERE repuestos."codService" = services."codService"
+                        ), 0)
+                    """)
+                )
+                db.session.commit()
+                logger.info("Columna 'total_repuestos' agregada exitosamente")
+            
+            for tabla in ('clientes', 'services', 'presupuestos'):
+                if 'version' not in _get_columns(tabla):
+                    logger.info(f"Agregando columna 'version' a tabla '{tabla}'...")
+                    db.session.execute(
+                        text(f"ALTER TABLE {tabla} ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+                    )
+                    db.session.commit()
+            
+            _crear_versiones_tablas()
+            _sembrar_ganancias()
+            _create_missing_indexes()
+            _setup_busqueda()
         except Exception as e:
             logger.warning(f"No se pudo ejecutar migración: {e}")
             db.session.rollback()
 
 
+def _configurar_conexion(dbapi_connection, connection_record):
+    """
+    Configura cada conexión nueva del pool.
+    
+    SQLite: PRAGMAs de rendimiento (WAL para que los lectores no esperen
+    al escritor, synchronous=NORMAL, busy_timeout, mmap, caché y temporales
+    en memoria). MySQL: tiempo máximo por sentencia. En PostgreSQL el
+    statement_timeout se pasa en connect_args.
+    """
+    from src.config.settings import settings
+    config = settings.database
+    
+    cursor = dbapi_connection.cursor()
+    try:
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            for pragma, valor in config.sqlite_pragmas().items():
+                try:
+                    cursor.execute(f"PRAGMA {pragma}={valor}")
+                except sqlite3.OperationalError as e:
+                    # Una réplica abierta con mode=ro no acepta cambiar journal_mode
+                    logger.debug(f"PRAGMA {pragma} no aplicado: {e}")
+        elif config.url.startswith('mysql') and config.statement_timeout:
+            cursor.execute(f"SET SESSION max_execution_time={int(config.statement_timeout)}")
+    finally:
+        cursor.close()
+
+
+def estado_base_datos() -> dict:
+    """
+    Resume la configuración efectiva de la base de datos (para /api/health).
+    
+    Returns:
+        Diccionario con dialecto, pool, statement timeout y, en SQLite,
+        los PRAGMAs leídos de una conexión real
+    """
+    from src.config.settings import settings
+    config = settings.database
+    engine = db.engine
+    pool = engine.pool
+    
+    estado = {
+        'dialect': engine.dialect.name,
+        'pool': {
+            'class': type(pool).__name__,
+            'size': pool.size() if hasattr(pool, 'size') else None,
+            'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+            'max_overflow': config.max_overflow,
+            'recycle': config.pool_recycle,
+            'pre_ping': config.pre_ping,
+        },
+        'statement_timeout_ms': None if config.is_sqlite else config.statement_timeout,
+    }
+    
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        if config.is_sqlite:
+            estado['pragmas'] = {
+                pragma: conn.exec_driver_sql(f"PRAGMA {pragma}").scalar()
+                for pragma in config.sqlite_pragmas()
+            }
+    
+    replica = db.engines.get(REPLICA_BIND)
+    if replica is not None:
+        with replica.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        estado['replica'] = {
+            'dialect': replica.dialect.name,
+            'sticky_seconds': config.read_sticky_seconds,
+        }
+    return estado
+
+
 def init_db(app):
     """Inicializa la base de datos con la aplicación Flask"""
     db.init_app(app)
     with app.app_context():
-        db.create_all()
+        for engine in db.engines.values():
+            event.listen(engine, 'connect', _configurar_conexion)
+        # La réplica se mantiene por fuera: solo se crea el esquema en la primaria
+        db.create_all(bind_key=None)
     # Ejecutar migraciones después de crear las tablas
     run_migrations(app)
 
@@ -1,7 +1,7 @@
 """Configuración centralizada de la aplicación"""
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
 # Cargar variables de entorno
@@ -13,6 +13,79 @@ class DatabaseConfig:
     """Configuración de base de datos"""
     url: str
     echo: bool = False
+    # Réplica de solo lectura para las peticiones GET (opcional)
+    read_url: Optional[str] = None
+    # Segundos que un cliente lee de la primaria después de escribir
+    read_sticky_seconds: int = 5
+    # Pool de conexiones
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_recycle: int = 1800
+    pre_ping: bool = True
+    # Tiempo máximo por sentencia en milisegundos (0 = sin límite)
+    statement_timeout: int = 30000
+    # PRAGMAs aplicados a cada conexión SQLite
+    sqlite_journal_mode: str = 'WAL'
+    sqlite_synchronous: str = 'NORMAL'
+    sqlite_busy_timeout: int = 5000
+    sqlite_mmap_size: int = 268435456
+    sqlite_cache_size: int = -65536
+    sqlite_temp_store: str = 'MEMORY'
+    
+    @property
+    def is_sqlite(self) -> bool:
+        """Indica si la URL apunta a una base SQLite"""
+        return self.url.startswith('sqlite')
+    
+    def sqlite_pragmas(self) -> Dict[str, object]:
+        """PRAGMAs a ejecutar al abrir cada conexión SQLite"""
+        return {
+            'journal_mode': self.sqlite_journal_mode,
+            'synchronous': self.sqlite_synchronous,
+            'busy_timeout': self.sqlite_busy_timeout,
+            'mmap_size': self.sqlite_mmap_size,
+            'cache_size': self.sqlite_cache_size,
+            'temp_store': self.sqlite_temp_store,
+        }
+    
+    def engine_options(self) -> Dict[str, object]:
+        """Opciones de create_engine (SQLALCHEMY_ENGINE_OPTIONS)"""
+        options = {
+            'pool_pre_ping': self.pre_ping,
+            'pool_recycle': self.pool_recycle,
+        }
+        if self.url.startswith('sqlite:///:memory:') or self.url == 'sqlite://':
+            return options
+        
+        options['pool_size'] = self.pool_size
+        options['max_overflow'] = self.max_overflow
+        
+        if self.is_sqlite:
+            # El sqlite3 de Python espera busy_timeout en segundos
+            options['connect_args'] = {'timeout': self.sqlite_busy_timeout / 1000}
+        elif self.url.startswith('postgresql') and self.statement_timeout:
+            options['connect_args'] = {
+                'options': f'-c statement_timeout={self.statement_timeout}'
+            }
+        return options
+
+
+@dataclass
+class CacheConfig:
+    """Configuración de la caché de estadísticas del tablero"""
+    # memory (por proceso), sqlite (archivo compartido) o redis
+    backend: str = 'memory'
+    # Ruta del archivo (sqlite) o redis://host:puerto/db (redis)
+    url: Optional[str] = None
+    # Segundos que una entrada es válida aunque no haya escrituras
+    ttl_seconds: float = 30.0
+    # Entradas máximas antes de desalojar la menos usada (LRU)
+    max_entries: int = 256
+    # Retraso máximo con que un worker ve las invalidaciones de otro
+    # (copia local sobre sqlite/redis; 0 = leer siempre del backend)
+    sync_seconds: float = 1.0
+    # Prefijo de las claves en redis
+    key_prefix: str = 'serviceadmin:cache:'
 
 
 @dataclass
@@ -66,7 +139,30 @@ class Settings:
         
         self.database = DatabaseConfig(
             url=database_url,
-            echo=os.getenv('DB_ECHO', 'False').lower() == 'true'
+            echo=os.getenv('DB_ECHO', 'False').lower() == 'true',
+            read_url=os.getenv('DATABASE_READ_URL') or None,
+            read_sticky_seconds=int(os.getenv('DB_READ_STICKY_SECONDS', 5)),
+            pool_size=int(os.getenv('DB_POOL_SIZE', 5)),
+            max_overflow=int(os.getenv('DB_MAX_OVERFLOW', 10)),
+            pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 1800)),
+            pre_ping=os.getenv('DB_PRE_PING', 'True').lower() == 'true',
+            statement_timeout=int(os.getenv('DB_STATEMENT_TIMEOUT', 30000)),
+            sqlite_journal_mode=os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+            sqlite_synchronous=os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+            sqlite_busy_timeout=int(os.getenv('SQLITE_BUSY_TIMEOUT', 5000)),
+            sqlite_mmap_size=int(os.getenv('SQLITE_MMAP_SIZE', 268435456)),
+            sqlite_cache_size=int(os.getenv('SQLITE_CACHE_SIZE', -65536)),
+            sqlite_temp_store=os.getenv('SQLITE_TEMP_STORE', 'MEMORY')
+        )
+        
+        # Caché de estadísticas
+        self.cache = CacheConfig(
+            backend=os.getenv('CACHE_BACKEND', 'memory').lower(),
+            url=os.getenv('CACHE_URL') or None,
+            ttl_seconds=float(os.getenv('CACHE_TTL', 30)),
+            max_entries=int(os.getenv('CACHE_MAX_ENTRIES', 256)),
+            sync_seconds=float(os.getenv('CACHE_SYNC_SECONDS', 1)),
+            key_prefix=os.getenv('CACHE_KEY_PREFIX', 'serviceadmin:cache:')
         )
     
     @classmethod
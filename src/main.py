@@ -2,8 +2,10 @@
 import os
 import logging
 from flask import Flask, jsonify, render_template, request, redirect, url_for
-from src.config.database import init_db, db
+from src.config.database import init_db, db, estado_base_datos, REPLICA_BIND
 from src.config.settings import settings
+from src.services.cache import cache_estadisticas
+from src.api.json_provider import FastJSONProvider
 
 
 # Configurar logging
@@ -30,11 +32,17 @@ def create_app():
         static_folder='static'
     )
     
+    # jsonify con orjson/msgspec si están instalados (fechas en ISO 8601)
+    app.json = FastJSONProvider(app)
+    
     # Configuración
     app.config['SECRET_KEY'] = settings.app.secret_key
     app.config['SQLALCHEMY_DATABASE_URI'] = settings.database.url
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['SQLALCHEMY_ECHO'] = settings.database.echo
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = settings.database.engine_options()
+    if settings.database.read_url:
+        app.config['SQLALCHEMY_BINDS'] = {REPLICA_BIND: settings.database.read_url}
     
     # IMPORTANTE: Importar modelos ANTES de init_db para que SQLAlchemy
     # los conozca al momento de crear las tablas con db.create_all()
@@ -42,6 +50,7 @@ def create_app():
     from src.models.service import Service
     from src.models.presupuesto import Presupuesto
     from src.models.repuesto import Repuesto
+    from src.models.ganancia_mensual import GananciaMensual
     
     # Inicializar base de datos (ahora creará las tablas correctamente)
     init_db(app)
@@ -50,10 +59,12 @@ def create_app():
     from src.api.controllers.cliente_controller import cliente_bp
     from src.api.controllers.service_controller import service_bp
     from src.api.controllers.presupuesto_controller import presupuesto_bp
+    from src.api.controllers.import_controller import import_bp
     
     app.register_blueprint(cliente_bp)
     app.register_blueprint(service_bp)
     app.register_blueprint(presupuesto_bp)
+    app.register_blueprint(import_bp)
     
     # =====================
     # RUTAS DE TEMPLATES
@@ -62,22 +73,15 @@ def create_app():
     @app.route('/')
     def index():
         """Página principal - Dashboard"""
-        from src.services.service_service import ServiceService
-        from src.services.cliente_service import ClienteService
-        from src.services.presupuesto_service import PresupuestoService
+        from src.services.dashboard_service import DashboardService
         
-        service_service = ServiceService()
-        cliente_service = ClienteService()
-        presupuesto_service = PresupuestoService()
-        
-        estadisticas = service_service.obtener_estadisticas()
-        total_clientes = len(cliente_service.obtener_todos())
-        total_ganancias = presupuesto_service.obtener_total_ganancias()
+        # Totales servidos desde la caché entre escrituras
+        resumen = DashboardService().obtener_resumen()
         
         return render_template('index.html',
-            estadisticas=estadisticas,
-            total_clientes=total_clientes,
-            total_ganancias=total_ganancias
+            estadisticas=resumen['estadisticas'],
+            total_clientes=resumen['total_clientes'],
+            total_ganancias=resumen['total_ganancias']
         )
     
     @app.route('/clientes')
@@ -85,7 +89,7 @@ def create_app():
         """Página de gestión de clientes"""
         from src.services.cliente_service import ClienteService
         cliente_service = ClienteService()
-        clientes = cliente_service.obtener_todos()
+        clientes = cliente_service.obtener_todos(perfil='conteos')
         return render_template('clientes.html', clientes=clientes)
     
     @app.route('/services')
@@ -100,19 +104,14 @@ def create_app():
         # Obtener parámetro de filtro
         estado_filtro = request.args.get('estado')
         
+        # El listado solo muestra el nombre del cliente
+        perfil = 'board'
+        
         # Aplicar filtro según el estado
-        if estado_filtro == 'pendiente':
-            services = service_service.obtener_pendientes()
-        elif estado_filtro == 'revisado':
-            # Revisados pero no reparados
-            services = [s for s in service_service.obtener_todos() 
-                       if s.revisado and not s.reparado]
-        elif estado_filtro == 'reparado':
-            services = service_service.obtener_listos_para_entregar()
-        elif estado_filtro == 'entregado':
-            services = [s for s in service_service.obtener_todos() if s.entregado]
+        if estado_filtro in ('pendiente', 'revisado', 'reparado', 'entregado'):
+            services = service_service.obtener_por_estado(estado_filtro, perfil=perfil)
         else:
-            services = service_service.obtener_todos()
+            services = service_service.obtener_todos(perfil=perfil)
         
         clientes = cliente_service.obtener_todos()
         
@@ -124,37 +123,35 @@ def create_app():
     @app.route('/ganancias')
     def ganancias_page():
         """Página de reporte de ganancias por mes"""
-        from src.services.service_service import ServiceService
+        from src.services.reporte_service import ReporteService
         from datetime import date
         
-        service_service = ServiceService()
+        reporte_service = ReporteService()
         
         # Obtener mes y año de los parámetros o usar el actual
         mes = request.args.get('mes', type=int, default=date.today().month)
         anio = request.args.get('anio', type=int, default=date.today().year)
+        if not 1 <= mes <= 12:
+            mes = date.today().month
+        # date() no admite años fuera de 1..9999 (y diciembre necesita el siguiente)
+        if not date.min.year <= anio <= date.max.year - 1:
+            anio = date.today().year
         
         # Nombres de meses en español
         meses = ['', 'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
                  'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
         
-        # Obtener todos los services y filtrar por mes
-        todos_services = service_service.obtener_todos()
-        services = [s for s in todos_services 
-                   if s.fecha and s.fecha.month == mes and s.fecha.year == anio]
-        
-        # Calcular totales (solo de services con presupuesto)
-        total_repuestos = sum(s.total_costo_repuestos for s in services if s.presupuesto)
-        total_mano_obra = sum(s.presupuesto.manoDeObra for s in services if s.presupuesto)
-        total_general = total_repuestos + total_mano_obra
+        # Totales calculados en SQL sobre el rango de fechas del mes
+        reporte = reporte_service.obtener_ganancias_mes(mes, anio)
         
         return render_template('ganancias.html',
-            services=services,
+            services=reporte['services'],
             mes=mes,
             anio=anio,
             mes_nombre=meses[mes],
-            total_repuestos=total_repuestos,
-            total_mano_obra=total_mano_obra,
-            total_general=total_general
+            total_repuestos=reporte['total_repuestos'],
+            total_mano_obra=reporte['total_mano_obra'],
+            total_general=reporte['total_general']
         )
     
     @app.route('/services/agregar')
@@ -174,7 +171,7 @@ def create_app():
         service_service = ServiceService()
         cliente_service = ClienteService()
         
-        service = service_service.obtener_service(cod_service)
+        service = service_service.obtener_service(cod_service, perfil='detail')
         if not service:
             return redirect(url_for('services_page'))
         
@@ -231,10 +228,22 @@ def create_app():
     
     @app.route('/api/health')
     def health():
-        """Health check"""
+        """Health check con la configuración efectiva de la base de datos"""
+        try:
+            estado = estado_base_datos()
+        except Exception as e:
+            logger.error(f"Health check: base de datos no disponible: {e}")
+            return jsonify({
+                'status': 'unhealthy',
+                'database': 'disconnected'
+            }), 503
+        
         return jsonify({
             'status': 'healthy',
-            'database': 'connected'
+            'database': 'connected',
+            'database_config': estado,
+            'cache': cache_estadisticas.estadisticas(),
+            'json': app.json.backend
         })
     
     logger.info("Aplicación ServiceAdmin configurada correctamente")
@@ -287,6 +296,101 @@ def init_database():
         logger.info(f"Creados {len(services_demo)} servicios de ejemplo")
 
 
+def rebuild_ganancias():
+    """Reconstruye la tabla de resúmenes mensuales de ganancias"""
+    app = create_app()
+    
+    with app.app_context():
+        from src.services.reporte_service import ReporteService
+        
+        meses = ReporteService().reconstruir_resumenes()
+        logger.info(f"Resúmenes de ganancias reconstruidos: {meses} meses")
+        return meses
+
+
+def check_total_repuestos(reparar: bool = False):
+    """
+    Verifica el total de repuestos cacheado en cada servicio.
+    
+    Args:
+        reparar: True para recalcular los totales inconsistentes
+        
+    Returns:
+        Cantidad de servicios inconsistentes encontrados
+    """
+    app = create_app()
+    
+    with app.app_context():
+        from src.services.service_service import ServiceService
+        
+        service_service = ServiceService()
+        inconsistentes = service_service.verificar_total_repuestos()
+        for cod_service, guardado, real in inconsistentes:
+            logger.warning(
+                f"Service #{cod_service}: total_repuestos={guardado}, real={real}"
+            )
+        
+        if reparar and inconsistentes:
+            corregidos = service_service.reconstruir_total_repuestos()
+            logger.info(f"Totales de repuestos corregidos: {corregidos}")
+        return len(inconsistentes)
+
+
+def import_csv(tipo: str, ruta: str, tamano_lote: int = None):
+    """
+    Importa un CSV de clientes o services desde la línea de comandos.
+    
+    El avance se guarda en <ruta>.checkpoint.json después de cada lote
+    confirmado; si la importación se interrumpe, volver a ejecutarla
+    continúa desde ese punto. El checkpoint se borra al terminar.
+    
+    Args:
+        tipo: 'clientes' o 'services'
+        ruta: Ruta del archivo CSV
+        tamano_lote: Filas por lote (opcional)
+        
+    Returns:
+        Tupla (filas insertadas, filas con errores)
+    """
+    import json
+    import os
+    
+    app = create_app()
+    checkpoint = f"{ruta}.checkpoint.json"
+    
+    desde_fila = 0
+    if os.path.exists(checkpoint):
+        with open(checkpoint, encoding='utf-8') as f:
+            estado = json.load(f)
+        if estado.get('tipo') == tipo:
+            desde_fila = estado['filas_procesadas']
+            logger.info(f"Reanudando importación desde la fila {desde_fila}")
+    
+    with app.app_context():
+        from src.services.import_service import ImportService, TAMANO_LOTE
+        
+        insertadas = errores = 0
+        with open(ruta, encoding='utf-8-sig', newline='') as archivo:
+            lotes = ImportService().importar(
+                tipo, archivo, desde_fila, tamano_lote or TAMANO_LOTE
+            )
+            for lote in lotes:
+                insertadas += lote['insertadas']
+                errores += len(lote['errores'])
+                for error in lote['errores']:
+                    logger.warning(f"Fila {error['fila']}: {error['message']}")
+                with open(checkpoint, 'w', encoding='utf-8') as f:
+                    json.dump({'tipo': tipo, 'filas_procesadas': lote['filas_procesadas']}, f)
+                logger.info(
+                    f"Filas procesadas: {lote['filas_procesadas']} "
+                    f"(insertadas: {insertadas}, con errores: {errores})"
+                )
+        
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        return insertadas, errores
+
+
 if __name__ == '__main__':
     import sys
     
@@ -3,3 +3,5 @@ from src.models.cliente import Cliente
 from src.models.service import Service
 from src.models.presupuesto import Presupuesto
 from src.models.repuesto import Repuesto
+from src.models.ganancia_mensual import GananciaMensual
+from src.models.version_tabla import VersionTabla
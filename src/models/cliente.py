@@ -1,7 +1,7 @@
 """Modelo de Cliente"""
 from sqlalchemy import Integer, String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from typing import List
+from sqlalchemy.orm import Mapped, mapped_column, relationship, query_expression
+from typing import Iterable, List, Optional
 from src.config.database import db
 
 
@@ -13,12 +13,30 @@ class Cliente(db.Model):
     """
     __tablename__ = 'clientes'
     
+    # Campos de to_dict() (parámetros fields/include de la API)
+    CAMPOS = (
+        'codCliente', 'nombre', 'direccion', 'tel', 'email', 'descripcion',
+        'total_services', 'services_pendientes',
+    )
+    CAMPOS_DERIVADOS = {
+        'total_services': 'cantidad_services',
+        'services_pendientes': 'cantidad_pendientes',
+    }
+    INCLUSIONES = ('services',)
+    
     codCliente: Mapped[int] = mapped_column(Integer, primary_key=True)
     nombre: Mapped[str] = mapped_column(String(90), nullable=False)
     direccion: Mapped[str] = mapped_column(String(50), nullable=True)
-    tel: Mapped[str] = mapped_column(String(15), nullable=True)
-    email: Mapped[str] = mapped_column(String(50), nullable=True)
+    tel: Mapped[str] = mapped_column(String(15), nullable=True, index=True)
+    email: Mapped[str] = mapped_column(String(50), nullable=True, index=True)
     descripcion: Mapped[str] = mapped_column(String(255), nullable=True)
+    # Versión de la fila: se incrementa en cada UPDATE (ETag del detalle)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    __mapper_args__ = {'version_id_col': version}
+    
+    # Conteos calculados en SQL (perfil 'conteos' de ClienteRepository)
+    cantidad_services: Mapped[Optional[int]] = query_expression()
+    cantidad_pendientes: Mapped[Optional[int]] = query_expression()
     
     # Relaciones
     services: Mapped[List["Service"]] = relationship(
@@ -50,25 +68,53 @@ class Cliente(db.Model):
     @property
     def total_services(self) -> int:
         """Retorna el total de servicios del cliente"""
+        if self.cantidad_services is not None:
+            return self.cantidad_services
         return len(self.services)
     
     @property
     def services_pendientes(self) -> int:
         """Retorna la cantidad de servicios no entregados"""
+        if self.cantidad_pendientes is not None:
+            return self.cantidad_pendientes
         return len([s for s in self.services if not s.entregado])
     
-    def to_dict(self) -> dict:
-        """Convierte el cliente a diccionario"""
-        return {
-            'codCliente': self.codCliente,
-            'nombre': self.nombre,
-            'direccion': self.direccion,
-            'tel': self.tel,
-            'email': self.email,
-            'descripcion': self.descripcion,
-            'total_services': self.total_services,
-            'services_pendientes': self.services_pendientes
-        }
+    def to_dict(self, campos: Optional[Iterable[str]] = None,
+                incluir: Iterable[str] = ()) -> dict:
+        """
+        Convierte el cliente a diccionario.
+        
+        Args:
+            campos: Campos a incluir (None para todos)
+            incluir: Relaciones a expandir (services)
+        
+        Returns:
+            Diccionario con los campos pedidos y las relaciones expandidas
+        """
+        if campos is not None:
+            data = {c: self._valor_campo(c) for c in self.CAMPOS if c in campos}
+        else:
+            data = {
+                'codCliente': self.codCliente,
+                'nombre': self.nombre,
+                'direccion': self.direccion,
+                'tel': self.tel,
+                'email': self.email,
+                'descripcion': self.descripcion,
+                'total_services': self.total_services,
+                'services_pendientes': self.services_pendientes
+            }
+        if 'services' in incluir:
+            data['services'] = [s.to_dict(s.campos_columna()) for s in self.services]
+        return data
+    
+    def _valor_campo(self, campo: str):
+        """Valor de un campo de to_dict()"""
+        if campo == 'total_services':
+            return self.total_services
+        if campo == 'services_pendientes':
+            return self.services_pendientes
+        return getattr(self, campo)
     
     def __repr__(self) -> str:
         return f"<Cliente(cod={self.codCliente}, nombre='{self.nombre}')>"
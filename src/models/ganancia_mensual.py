@@ -0,0 +1,53 @@
+"""Modelo de GananciaMensual (resumen de ganancias por mes)"""
+from sqlalchemy import Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from src.config.database import db
+
+
+class GananciaMensual(db.Model):
+    """
+    Resumen precalculado de ganancias de un mes.
+    
+    Se mantiene actualizado al escribir presupuestos y repuestos, de modo
+    que consultar un mes pasado es una búsqueda por clave primaria.
+    """
+    __tablename__ = 'ganancias_mensuales'
+    
+    anio: Mapped[int] = mapped_column(Integer, primary_key=True)
+    mes: Mapped[int] = mapped_column(Integer, primary_key=True)
+    total_repuestos: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_mano_obra: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    
+    def __init__(self, anio: int, mes: int, total_repuestos: int = 0,
+                 total_mano_obra: int = 0):
+        """
+        Inicializa un nuevo resumen mensual.
+        
+        Args:
+            anio: Año
+            mes: Mes (1-12)
+            total_repuestos: Total de repuestos de services con presupuesto
+            total_mano_obra: Total de mano de obra presupuestada
+        """
+        self.anio = anio
+        self.mes = mes
+        self.total_repuestos = total_repuestos
+        self.total_mano_obra = total_mano_obra
+    
+    @property
+    def total_general(self) -> int:
+        """Retorna el total del mes (repuestos + mano de obra)"""
+        return self.total_repuestos + self.total_mano_obra
+    
+    def to_dict(self) -> dict:
+        """Convierte el resumen a diccionario"""
+        return {
+            'anio': self.anio,
+            'mes': self.mes,
+            'total_repuestos': self.total_repuestos,
+            'total_mano_obra': self.total_mano_obra,
+            'total_general': self.total_general
+        }
+    
+    def __repr__(self) -> str:
+        return f"<GananciaMensual({self.mes}/{self.anio}, total=${self.total_general})>"
@@ -1,6 +1,7 @@
 """Modelo de Presupuesto"""
-from sqlalchemy import Integer, Boolean, ForeignKey
+from sqlalchemy import Integer, Boolean, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from typing import Iterable, Optional
 from src.config.database import db
 
 
@@ -12,6 +13,18 @@ class Presupuesto(db.Model):
     El cliente puede aceptar o rechazar el presupuesto.
     """
     __tablename__ = 'presupuestos'
+    __table_args__ = (
+        # Filtro por aceptación; cubre la suma de ganancias aceptadas
+        Index('ix_presupuestos_aceptado', 'aceptado', 'gananciaTotal'),
+    )
+    
+    # Campos de to_dict() (parámetros fields/include de la API)
+    CAMPOS = (
+        'codPresupuesto', 'codService', 'costo', 'manoDeObra',
+        'gananciaTotal', 'aceptado', 'estado',
+    )
+    CAMPOS_DERIVADOS = {'estado': 'aceptado'}
+    INCLUSIONES = ('service',)
     
     codPresupuesto: Mapped[int] = mapped_column(Integer, primary_key=True)
     codService: Mapped[int] = mapped_column(
@@ -24,6 +37,9 @@ class Presupuesto(db.Model):
     manoDeObra: Mapped[int] = mapped_column(Integer, default=0)
     gananciaTotal: Mapped[int] = mapped_column(Integer, default=0)
     aceptado: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Versión de la fila: se incrementa en cada UPDATE (ETag del detalle)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    __mapper_args__ = {'version_id_col': version}
     
     # Relaciones
     service: Mapped["Service"] = relationship(
@@ -87,17 +103,33 @@ class Presupuesto(db.Model):
         """Calcula el total usando el costo de repuestos actualizado"""
         return self.costo_repuestos_actual + self.manoDeObra
     
-    def to_dict(self) -> dict:
-        """Convierte el presupuesto a diccionario"""
-        return {
-            'codPresupuesto': self.codPresupuesto,
-            'codService': self.codService,
-            'costo': self.costo,
-            'manoDeObra': self.manoDeObra,
-            'gananciaTotal': self.gananciaTotal,
-            'aceptado': self.aceptado,
-            'estado': self.estado
-        }
+    def to_dict(self, campos: Optional[Iterable[str]] = None,
+                incluir: Iterable[str] = ()) -> dict:
+        """
+        Convierte el presupuesto a diccionario.
+        
+        Args:
+            campos: Campos a incluir (None para todos)
+            incluir: Relaciones a expandir (service)
+        
+        Returns:
+            Diccionario con los campos pedidos y las relaciones expandidas
+        """
+        if campos is not None:
+            data = {c: getattr(self, c) for c in self.CAMPOS if c in campos}
+        else:
+            data = {
+                'codPresupuesto': self.codPresupuesto,
+                'codService': self.codService,
+                'costo': self.costo,
+                'manoDeObra': self.manoDeObra,
+                'gananciaTotal': self.gananciaTotal,
+                'aceptado': self.aceptado,
+                'estado': self.estado
+            }
+        if 'service' in incluir:
+            data['service'] = self.service.to_dict(self.service.campos_columna())
+        return data
     
     def __repr__(self) -> str:
         return f"<Presupuesto(cod={self.codPresupuesto}, total=${self.gananciaTotal}, aceptado={self.aceptado})>"
@@ -16,7 +16,8 @@ class Repuesto(db.Model):
     codService: Mapped[int] = mapped_column(
         Integer,
         ForeignKey('services.codService'),
-        nullable=False
+        nullable=False,
+        index=True
     )
     nombre: Mapped[str] = mapped_column(String(100), nullable=False)
     costo: Mapped[int] = mapped_column(Integer, default=0)
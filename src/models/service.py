@@ -1,7 +1,7 @@
 """Modelo de Service (Servicio de reparación)"""
-from sqlalchemy import Integer, String, Boolean, Date, ForeignKey
+from sqlalchemy import Integer, String, Boolean, Date, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from typing import Optional, List
+from typing import Iterable, Optional, List
 from datetime import date
 from src.config.database import db
 
@@ -14,6 +14,36 @@ class Service(db.Model):
     y puede tener un presupuesto asociado.
     """
     __tablename__ = 'services'
+    __table_args__ = (
+        # Filtros por estado ordenados por fecha (listados y tablero)
+        Index('ix_services_estado_fecha', 'estado', 'fecha'),
+        # Services de un cliente y conteo de pendientes por cliente
+        Index('ix_services_cliente_estado', 'codCliente', 'estado'),
+        # Rangos de fecha (reportes) y paginación por (fecha, codService)
+        Index('ix_services_fecha', 'fecha', 'codService'),
+    )
+    
+    # Estados posibles, en orden de avance
+    ESTADOS = ('Pendiente', 'Revisado', 'Reparado', 'Entregado')
+    
+    # Campos de to_dict() (parámetros fields/include de la API)
+    CAMPOS = (
+        'codService', 'codCliente', 'cliente_nombre', 'fecha', 'nomProducto',
+        'modelo', 'descrip', 'descripFalla', 'revisado', 'repuesto',
+        'costoRepuesto', 'reparado', 'entregado', 'estado',
+        'tiene_presupuesto', 'repuestos_lista', 'total_costo_repuestos',
+    )
+    CAMPOS_DERIVADOS = {
+        'cliente_nombre': 'cliente',
+        'tiene_presupuesto': 'presupuesto',
+        'repuestos_lista': 'repuestos',
+        'total_costo_repuestos': 'total_repuestos',
+    }
+    INCLUSIONES = ('cliente', 'presupuesto', 'repuestos')
+    
+    # Mensajes de las validaciones de marcar_reparado / marcar_entregado
+    ERROR_SIN_REVISAR = "El servicio debe estar revisado antes de marcarlo como reparado"
+    ERROR_SIN_REPARAR = "El servicio debe estar reparado antes de marcarlo como entregado"
     
     codService: Mapped[int] = mapped_column(Integer, primary_key=True)
     codCliente: Mapped[int] = mapped_column(
@@ -29,8 +59,15 @@ class Service(db.Model):
     revisado: Mapped[bool] = mapped_column(Boolean, default=False)
     repuesto: Mapped[str] = mapped_column(String(80), nullable=True)
     costoRepuesto: Mapped[int] = mapped_column(Integer, default=0)
+    # Suma de los costos de repuestos, mantenida al escribir repuestos
+    total_repuestos: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     reparado: Mapped[bool] = mapped_column(Boolean, default=False)
     entregado: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Estado desnormalizado a partir de los flags, para filtrar por índice
+    estado: Mapped[str] = mapped_column(String(15), nullable=False, default='Pendiente')
+    # Versión de la fila: se incrementa en cada UPDATE (ETag del detalle)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    __mapper_args__ = {'version_id_col': version}
     
     # Relaciones
     cliente: Mapped["Cliente"] = relationship(
@@ -75,19 +112,25 @@ class Service(db.Model):
         self.reparado = False
         self.entregado = False
         self.costoRepuesto = 0
+        self.total_repuestos = 0
+        self.estado = 'Pendiente'
     
-    @property
-    def estado(self) -> str:
-        """Retorna el estado actual del servicio"""
-        if self.entregado:
+    @staticmethod
+    def calcular_estado(revisado: bool, reparado: bool, entregado: bool) -> str:
+        """Calcula el estado a partir de los flags del servicio"""
+        if entregado:
             return "Entregado"
-        elif self.reparado:
+        elif reparado:
             return "Reparado"
-        elif self.revisado:
+        elif revisado:
             return "Revisado"
         else:
             return "Pendiente"
     
+    def _sincronizar_estado(self) -> None:
+        """Actualiza la columna estado según los flags actuales"""
+        self.estado = self.calcular_estado(self.revisado, self.reparado, self.entregado)
+    
     @property
     def estado_badge_class(self) -> str:
         """Retorna la clase CSS para el badge de estado"""
@@ -101,8 +144,8 @@ class Service(db.Model):
     
     @property
     def total_costo_repuestos(self) -> int:
-        """Calcula el costo total de todos los repuestos"""
-        return sum(r.costo for r in self.repuestos)
+        """Retorna el costo total de todos los repuestos (sin cargarlos)"""
+        return self.total_repuestos or 0
     
     def marcar_revisado(self, repuesto: str = None, costoRepuesto: int = 0) -> None:
         """Marca el servicio como revisado"""
@@ -110,26 +153,71 @@ class Service(db.Model):
         if repuesto:
             self.repuesto = repuesto
             self.costoRepuesto = costoRepuesto
+        self._sincronizar_estado()
     
     def marcar_reparado(self) -> None:
         """Marca el servicio como reparado"""
         if not self.revisado:
-            raise ValueError("El servicio debe estar revisado antes de marcarlo como reparado")
+            raise ValueError(self.ERROR_SIN_REVISAR)
         self.reparado = True
+        self._sincronizar_estado()
     
     def marcar_entregado(self) -> None:
         """Marca el servicio como entregado"""
         if not self.reparado:
-            raise ValueError("El servicio debe estar reparado antes de marcarlo como entregado")
+            raise ValueError(self.ERROR_SIN_REPARAR)
         self.entregado = True
+        self._sincronizar_estado()
+    
+    def to_dict(self, campos: Optional[Iterable[str]] = None,
+                incluir: Iterable[str] = ()) -> dict:
+        """
+        Convierte el servicio a diccionario.
+        
+        Args:
+            campos: Campos a incluir (None para todos); solo se accede a las
+                relaciones que esos campos necesitan
+            incluir: Relaciones a expandir (cliente, presupuesto, repuestos)
+        
+        Returns:
+            Diccionario con los campos pedidos y las relaciones expandidas
+        """
+        if campos is not None:
+            data = {c: self._valor_campo(c) for c in self.CAMPOS if c in campos}
+        else:
+            data = self._todos_los_campos()
+        for relacion in incluir:
+            data[relacion] = self._inclusion(relacion)
+        return data
+    
+    def _valor_campo(self, campo: str):
+        """Valor de un campo de to_dict()"""
+        if campo == 'cliente_nombre':
+            return self.cliente.nombre if self.cliente else None
+        if campo == 'tiene_presupuesto':
+            return self.presupuesto is not None
+        if campo == 'repuestos_lista':
+            return [r.to_dict() for r in self.repuestos]
+        if campo == 'total_costo_repuestos':
+            return self.total_costo_repuestos
+        return getattr(self, campo)
+    
+    def _inclusion(self, relacion: str):
+        """Relación expandida (include), sin sus propias relaciones"""
+        if relacion == 'cliente':
+            return self.cliente.to_dict(self.cliente.campos_columna()) if self.cliente else None
+        if relacion == 'presupuesto':
+            return self.presupuesto.to_dict() if self.presupuesto else None
+        return [r.to_dict() for r in self.repuestos]
     
-    def to_dict(self) -> dict:
-        """Convierte el servicio a diccionario"""
+    def _todos_los_campos(self) -> dict:
+        """Todos los campos (respuesta por defecto de la API)"""
         return {
             'codService': self.codService,
             'codCliente': self.codCliente,
             'cliente_nombre': self.cliente.nombre if self.cliente else None,
-            'fecha': self.fecha.isoformat() if self.fecha else None,
+            # date: el proveedor JSON de la API lo serializa en ISO 8601
+            'fecha': self.fecha,
             'nomProducto': self.nomProducto,
             'modelo': self.modelo,
             'descrip': self.descrip,
@@ -0,0 +1,20 @@
+"""Modelo de VersionTabla (contador de cambios por tabla)"""
+from sqlalchemy import Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from src.config.database import db
+
+
+class VersionTabla(db.Model):
+    """
+    Versión de una tabla, incrementada en cada commit que la modifica.
+    
+    Los listados derivan su ETag de estas versiones, así una petición
+    condicional se responde leyendo una fila por tabla.
+    """
+    __tablename__ = 'versiones_tablas'
+    
+    tabla: Mapped[str] = mapped_column(String(30), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    
+    def __repr__(self) -> str:
+        return f"<VersionTabla(tabla='{self.tabla}', version={self.version})>"
@@ -1,5 +1,8 @@
 """Repositorios del sistema ServiceAdmin"""
-from src.repositories.base_repository import BaseRepository
+from src.repositories.base_repository import BaseRepository, Proyeccion
 from src.repositories.cliente_repository import ClienteRepository
 from src.repositories.service_repository import ServiceRepository
 from src.repositories.presupuesto_repository import PresupuestoRepository
+from src.repositories.reporte_repository import ReporteRepository
+from src.repositories.repuesto_repository import RepuestoRepository
+from src.repositories.version_repository import VersionRepository
@@ -1,18 +1,221 @@
 """Repositorio base con operaciones CRUD genéricas"""
-from typing import Generic, TypeVar, List, Optional
-from sqlalchemy.orm import Session
-from src.config.database import db
+import base64
+import csv
+import io
+import json
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, FrozenSet, Generic, Iterator, TypeVar, List, Optional, Sequence, Tuple, Union
+from sqlalchemy import (
+    Float, Integer, func, insert, inspect, literal, literal_column, or_, select, text, tuple_
+)
+from sqlalchemy.engine import ScalarResult
+from sqlalchemy.orm import Session, Query, load_only
+from sqlalchemy.sql import Select
+from src.config.database import (
+    db, BUSQUEDA_CAMPOS, documento_busqueda_pg, registrar_tabla_modificada
+)
 
 T = TypeVar('T')
 
+# Sentencias de módulo con un perfil de carga aplicado, por (sentencia, perfil)
+_SENTENCIAS_CON_PERFIL: dict = {}
+
+
+def terminos_busqueda(texto: str) -> List[str]:
+    """Separa un texto de búsqueda en palabras (letras y dígitos)"""
+    return re.findall(r'\w+', texto or '')
+
+
+@contextmanager
+def unit_of_work(session: Optional[Session] = None) -> Iterator[Session]:
+    """
+    Agrupa las escrituras de una operación de negocio en una única transacción.
+    
+    El bloque más externo hace commit al terminar (o rollback si se produce
+    una excepción). Los bloques anidados, incluidos los de los métodos de
+    escritura de los repositorios, no hacen commit: sus cambios se confirman
+    junto con los del bloque que los contiene.
+    
+    Args:
+        session: Sesión a usar (por defecto db.session)
+        
+    Yields:
+        La sesión de la transacción
+    """
+    if session is None:
+        session = db.session
+    if session.info.get('unit_of_work'):
+        yield session
+        return
+    
+    session.info['unit_of_work'] = True
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.info.pop('unit_of_work', None)
+
+
+def _valor_por_defecto(columna) -> Any:
+    """Valor por defecto (del lado de Python) de una columna, o None"""
+    default = columna.default
+    if default is None:
+        return None
+    if default.is_callable:
+        return default.arg(None)
+    return default.arg if default.is_scalar else None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Codifica los valores de la clave de paginación en un cursor opaco.
+    
+    Args:
+        values: Valores de las columnas de la clave (fechas incluidas)
+        
+    Returns:
+        Cursor en base64 apto para URLs
+    """
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decodifica un cursor generado por encode_cursor().
+    
+    Args:
+        cursor: Cursor recibido del cliente
+        columns: Columnas de la clave, para restaurar los tipos
+        
+    Returns:
+        Lista de valores de la clave
+        
+    Raises:
+        ValueError: Si el cursor es inválido
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor de paginación inválido")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Cursor de paginación inválido")
+    # Listas u objetos JSON no son valores de columna: fallarían al comparar
+    if not all(v is None or isinstance(v, (str, int, float)) for v in values):
+        raise ValueError("Cursor de paginación inválido")
+    
+    result = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        try:
+            if python_type is date and isinstance(value, str):
+                value = date.fromisoformat(value)
+            elif python_type is datetime and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError("Cursor de paginación inválido")
+        result.append(value)
+    return result
+
+
+@dataclass(frozen=True)
+class Proyeccion:
+    """
+    Campos y relaciones pedidos para una respuesta (?fields= / ?include=).
+    
+    Se pasa en lugar de un perfil de carga: el repositorio carga solo las
+    columnas de esos campos (load_only) y solo las relaciones que necesitan.
+    
+    Attributes:
+        campos: Campos de to_dict() a devolver (None para todos)
+        incluir: Relaciones a expandir
+    """
+    campos: Optional[FrozenSet[str]] = None
+    incluir: FrozenSet[str] = frozenset()
+    
+    @classmethod
+    def desde_parametros(cls, modelo: type, fields: Optional[str],
+                         include: Optional[str]) -> 'Proyeccion':
+        """
+        Arma la proyección a partir de los parámetros de la petición.
+        
+        La clave primaria se devuelve siempre.
+        
+        Args:
+            modelo: Clase del modelo (declara CAMPOS e INCLUSIONES)
+            fields: Campos separados por coma (None para todos)
+            include: Relaciones separadas por coma (opcional)
+        
+        Returns:
+            La proyección validada
+        
+        Raises:
+            ValueError: Si algún campo o relación no existe en el modelo
+        """
+        campos = None
+        if fields is not None:
+            campos = {c.strip() for c in fields.split(',') if c.strip()}
+            desconocidos = campos - set(modelo.CAMPOS)
+            if desconocidos:
+                raise ValueError(
+                    f"Campos desconocidos: {', '.join(sorted(desconocidos))} "
+                    f"(disponibles: {', '.join(modelo.CAMPOS)})"
+                )
+            campos.update(c.key for c in inspect(modelo).primary_key)
+        
+        incluir = {r.strip() for r in (include or '').split(',') if r.strip()}
+        desconocidas = incluir - set(modelo.INCLUSIONES)
+        if desconocidas:
+            disponibles = ', '.join(modelo.INCLUSIONES) or 'ninguna'
+            raise ValueError(
+                f"Relaciones desconocidas en include: {', '.join(sorted(desconocidas))} "
+                f"(disponibles: {disponibles})"
+            )
+        return cls(frozenset(campos) if campos is not None else None, frozenset(incluir))
+    
+    def serializar(self, entidad) -> dict:
+        """Convierte una entidad con los campos y relaciones pedidos"""
+        return entidad.to_dict(self.campos, self.incluir)
+
+
+# Perfil de carga: nombre de load_profiles o proyección de campos
+Perfil = Union[str, Proyeccion, None]
+
 
 class BaseRepository(Generic[T]):
     """
     Repositorio base que implementa operaciones CRUD genéricas.
     
     Todas las clases de repositorio específicas deben heredar de esta clase.
+    
+    Las subclases pueden declarar perfiles de carga en ``load_profiles``:
+    un nombre ('list', 'detail', ...) asociado a las opciones de carga
+    (joinedload/selectinload) que se aplican a las consultas.
+    
+    En lugar de un nombre de perfil se puede pasar una Proyeccion; las
+    opciones se arman con ``expansiones``: por cada relación o expresión
+    de la que sale un campo derivado del modelo (CAMPOS_DERIVADOS) o que
+    se puede incluir (INCLUSIONES), las opciones que la cargan.
+    
+    ``page_keys`` define las columnas de la paginación por cursor; por
+    defecto se usa la clave primaria.
+    
+    Los modelos cuya tabla figura en BUSQUEDA_CAMPOS admiten búsqueda de
+    texto con search()/search_page().
     """
     
+    load_profiles: dict = {}
+    expansiones: dict = {}
+    page_keys: Tuple = ()
+    
     def __init__(self, model_class: type[T]):
         """
         Inicializa el repositorio con el modelo de datos.
@@ -23,45 +226,392 @@ class BaseRepository(Generic[T]):
         self.model_class = model_class
         self.session: Session = db.session
     
+    def unit_of_work(self):
+        """Abre (o se une a) la transacción de la operación en curso; ver unit_of_work()"""
+        return unit_of_work(self.session)
+    
+    def _load_options(self, profile: Perfil = None) -> Tuple:
+        """
+        Obtiene las opciones de carga de un perfil.
+        
+        Args:
+            profile: Nombre del perfil o Proyeccion (None para carga lazy
+                por defecto)
+            
+        Returns:
+            Tupla de opciones de carga
+            
+        Raises:
+            ValueError: Si el perfil no existe
+        """
+        if profile is None:
+            return ()
+        if isinstance(profile, Proyeccion):
+            return self._opciones_proyeccion(profile)
+        if profile not in self.load_profiles:
+            raise ValueError(f"Perfil de carga desconocido: {profile}")
+        return self.load_profiles[profile]
+    
+    def _opciones_proyeccion(self, proyeccion: Proyeccion) -> Tuple:
+        """
+        Opciones de carga para devolver solo los campos de una proyección.
+        
+        Las columnas se limitan con load_only (más la clave primaria y las
+        de paginación); las relaciones y expresiones se cargan solo si algún
+        campo pedido o include las usa, así una petición liviana no hace
+        ningún JOIN.
+        """
+        modelo = self.model_class
+        campos = proyeccion.campos if proyeccion.campos is not None else modelo.CAMPOS
+        fuentes = set(proyeccion.incluir)
+        fuentes.update(modelo.CAMPOS_DERIVADOS.get(c, c) for c in campos)
+        
+        columnas = {c.key for c in inspect(modelo).primary_key}
+        columnas.update(c.key for c in self._page_columns())
+        opciones = []
+        for fuente in sorted(fuentes):
+            if fuente in self.expansiones:
+                opciones.extend(self.expansiones[fuente])
+            else:
+                columnas.add(fuente)
+        
+        if proyeccion.campos is not None:
+            opciones.insert(0, load_only(*(getattr(modelo, c) for c in sorted(columnas))))
+        return tuple(opciones)
+    
+    def _query(self, profile: Perfil = None) -> Query:
+        """
+        Construye una consulta sobre el modelo aplicando el perfil de carga.
+        
+        Args:
+            profile: Nombre del perfil de carga o Proyeccion
+            
+        Returns:
+            Consulta lista para filtrar
+        """
+        return self.session.query(self.model_class).options(
+            *self._load_options(profile)
+        )
+    
+    def _execute(self, stmt: Select, params: Optional[dict] = None,
+                 profile: Perfil = None) -> ScalarResult:
+        """
+        Ejecuta una sentencia select() construida a nivel de módulo.
+        
+        Las sentencias con parámetros enlazados (bindparam) se arman una sola
+        vez; la combinación sentencia + perfil también se guarda, de modo que
+        la caché de compilación de SQLAlchemy siempre encuentra la misma clave.
+        Las proyecciones no se guardan: sus combinaciones no están acotadas.
+        
+        Args:
+            stmt: Sentencia select() sobre el modelo
+            params: Valores de los bindparam de la sentencia
+            profile: Nombre del perfil de carga o Proyeccion
+            
+        Returns:
+            Resultado escalar (entidades)
+        """
+        if isinstance(profile, Proyeccion):
+            stmt = stmt.options(*self._load_options(profile))
+        elif profile is not None:
+            clave = (stmt, profile)
+            con_perfil = _SENTENCIAS_CON_PERFIL.get(clave)
+            if con_perfil is None:
+                con_perfil = stmt.options(*self._load_options(profile))
+                _SENTENCIAS_CON_PERFIL[clave] = con_perfil
+            stmt = con_perfil
+        return self.session.scalars(stmt, params)
+    
+    def _page_columns(self) -> Tuple:
+        """Columnas que forman la clave de paginación (únicas y ordenables)"""
+        if self.page_keys:
+            return tuple(self.page_keys)
+        return tuple(inspect(self.model_class).primary_key)
+    
+    def paginate(self, limit: int, after: Optional[str] = None,
+                 filters: Sequence[Any] = (),
+                 profile: Perfil = None) -> Tuple[List[T], Optional[str]]:
+        """
+        Obtiene una página de entidades usando paginación por cursor (keyset).
+        
+        A diferencia de OFFSET, cada página se resuelve con un rango sobre
+        el índice de la clave, por lo que las páginas profundas cuestan lo
+        mismo que la primera.
+        
+        Args:
+            limit: Cantidad máxima de entidades a devolver
+            after: Cursor devuelto por la página anterior (opcional)
+            filters: Condiciones adicionales de filtrado
+            profile: Perfil de carga de relaciones (opcional)
+            
+        Returns:
+            Tupla (entidades, cursor siguiente o None si no hay más)
+            
+        Raises:
+            ValueError: Si el cursor es inválido
+        """
+        columns = self._page_columns()
+        query = self._query(profile).filter(*filters)
+        
+        if after:
+            values = decode_cursor(after, columns)
+            if len(columns) == 1:
+                query = query.filter(columns[0] > values[0])
+            else:
+                query = query.filter(tuple_(*columns) > tuple_(*values))
+        
+        # Se pide un registro extra para saber si existe una página siguiente
+        items = query.order_by(*columns).limit(limit + 1).all()
+        
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+        return items, next_cursor
+    
+    def _search_query(self, terminos: List[str],
+                      profile: Perfil = None) -> Tuple[Query, Any]:
+        """
+        Construye la consulta de búsqueda de texto según el motor.
+        
+        SQLite usa la tabla FTS5 ``<tabla>_fts`` y su rank (bm25), y cada
+        palabra coincide por prefijo. PostgreSQL usa el índice de trigramas
+        y similarity(), y otros motores ILIKE sobre cada campo: ahí cada
+        palabra coincide en cualquier parte del texto (subcadena).
+        
+        Args:
+            terminos: Palabras a buscar
+            profile: Perfil de carga de relaciones (opcional)
+            
+        Returns:
+            Tupla (consulta filtrada, expresión de puntaje: menor es más relevante)
+        """
+        tabla = self.model_class.__tablename__
+        clave = inspect(self.model_class).primary_key[0]
+        dialect = self.session.get_bind().dialect.name
+        query = self._query(profile)
+        
+        if dialect == 'sqlite':
+            consulta = ' '.join(f'"{t}"*' for t in terminos)
+            fts = text(
+                f"SELECT rowid AS cod, rank FROM {tabla}_fts WHERE {tabla}_fts MATCH :consulta"
+            ).bindparams(consulta=consulta).columns(cod=Integer, rank=Float).subquery()
+            return query.join(fts, fts.c.cod == clave), fts.c.rank
+        
+        if dialect == 'postgresql':
+            documento = literal_column(f"({documento_busqueda_pg(tabla)})")
+            query = query.filter(*(documento.ilike(f'%{t}%') for t in terminos))
+            return query, -func.similarity(documento, ' '.join(terminos), type_=Float)
+        
+        _, campos = BUSQUEDA_CAMPOS[tabla]
+        columnas = [getattr(self.model_class, c) for c in campos]
+        query = query.filter(
+            *(or_(*(c.ilike(f'%{t}%') for c in columnas)) for t in terminos)
+        )
+        return query, literal(0.0, type_=Float)
+    
+    def search_page(self, texto: str, limit: int, after: Optional[str] = None,
+                    profile: Perfil = None) -> Tuple[List[T], Optional[str]]:
+        """
+        Busca entidades por texto, ordenadas por relevancia y paginadas por cursor.
+        
+        Cada palabra del texto debe coincidir con algún campo indexado: por
+        prefijo en SQLite, como subcadena en PostgreSQL y otros motores. El
+        cursor se arma con (puntaje, clave primaria).
+        
+        Args:
+            texto: Texto a buscar
+            limit: Cantidad máxima de resultados
+            after: Cursor de la página anterior (opcional)
+            profile: Perfil de carga de relaciones (opcional)
+            
+        Returns:
+            Tupla (entidades, cursor siguiente o None si no hay más)
+            
+        Raises:
+            ValueError: Si el cursor es inválido
+        """
+        terminos = terminos_busqueda(texto)
+        if not terminos:
+            return [], None
+        
+        query, puntaje = self._search_query(terminos, profile)
+        clave = inspect(self.model_class).primary_key[0]
+        
+        if after:
+            valores = decode_cursor(after, (puntaje, clave))
+            query = query.filter(tuple_(puntaje, clave) > tuple_(*valores))
+        
+        filas = query.add_columns(puntaje).order_by(puntaje, clave).limit(limit + 1).all()
+        
+        next_cursor = None
+        if len(filas) > limit:
+            filas = filas[:limit]
+            entidad, valor = filas[-1]
+            next_cursor = encode_cursor([valor, getattr(entidad, clave.key)])
+        return [entidad for entidad, _ in filas], next_cursor
+    
+    def search(self, texto: str, limit: int = 50,
+               profile: Perfil = None) -> List[T]:
+        """
+        Busca entidades por texto, ordenadas por relevancia.
+        
+        Args:
+            texto: Texto a buscar
+            limit: Cantidad máxima de resultados
+            profile: Perfil de carga de relaciones (opcional)
+            
+        Returns:
+            Lista de entidades más relevantes
+        """
+        return self.search_page(texto, limit, profile=profile)[0]
+    
     def create(self, entity: T) -> T:
         """
         Crea una nueva entidad en la base de datos.
         
+        Dentro de un unit_of_work() solo hace flush; el commit lo hace el
+        bloque externo.
+        
         Args:
             entity: Entidad a crear
             
         Returns:
             La entidad creada con su ID asignado
         """
-        try:
+        with self.unit_of_work():
             self.session.add(entity)
-            self.session.commit()
-            self.session.refresh(entity)
-            return entity
-        except Exception as e:
-            self.session.rollback()
-            raise e
+            # El flush asigna la clave primaria sin volver a leer la fila
+            self.session.flush()
+        return entity
+    
+    def bulk_insert(self, filas: List[dict]) -> List[int]:
+        """
+        Inserta varias filas con un único INSERT ejecutado por lotes (executemany).
+        
+        No hace commit: el lote queda en la transacción del llamador.
+        
+        Las claves se leen con RETURNING. MySQL no lo soporta: ahí se
+        inserta una fila por sentencia y se usa la clave que informa cada
+        INSERT.
+        
+        Args:
+            filas: Diccionarios con los atributos de cada entidad
+            
+        Returns:
+            Claves primarias generadas, en el mismo orden que las filas
+        """
+        if not filas:
+            return []
+        if not self.session.get_bind().dialect.insert_returning:
+            return [
+                self.session.execute(insert(self.model_class), fila).inserted_primary_key[0]
+                for fila in filas
+            ]
+        clave = inspect(self.model_class).primary_key[0]
+        # Nada garantiza que RETURNING devuelva las claves en el orden de
+        # las filas: sort_by_parameter_order las empareja con cada fila
+        return list(self.session.scalars(
+            insert(self.model_class).returning(clave, sort_by_parameter_order=True), filas
+        ))
+    
+    def bulk_load(self, filas: List[dict]) -> int:
+        """
+        Carga filas sin devolver sus claves, para importaciones grandes.
+        
+        PostgreSQL usa COPY ... FROM STDIN; el resto de los motores un INSERT
+        ejecutado por lotes (executemany). No hace commit.
+        
+        Args:
+            filas: Diccionarios con los atributos de cada entidad
+            
+        Returns:
+            Cantidad de filas cargadas
+        """
+        if not filas:
+            return 0
+        if self.session.get_bind().dialect.name == 'postgresql':
+            self._copy(filas)
+        else:
+            self.session.execute(insert(self.model_class), filas)
+        return len(filas)
+    
+    def _copy(self, filas: List[dict]) -> None:
+        """
+        Carga filas con COPY (psycopg2 o psycopg 3).
+        
+        COPY no aplica los valores por defecto del modelo, así que se
+        completan acá para las columnas que la fila no trae.
+        """
+        tabla = self.model_class.__table__
+        columnas = [
+            c for c in tabla.columns
+            if not (c.primary_key and c.autoincrement and c.key not in filas[0])
+        ]
+        valores = [
+            [fila[c.key] if c.key in fila else _valor_por_defecto(c) for c in columnas]
+            for fila in filas
+        ]
+        nombres = ', '.join('"%s"' % c.name for c in columnas)
+        sql = f"COPY {tabla.name} ({nombres}) FROM STDIN"
+        
+        conexion = self.session.connection().connection.driver_connection
+        with conexion.cursor() as cursor:
+            if hasattr(cursor, 'copy_expert'):
+                # psycopg2: CSV en memoria por lote
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(valores)
+                buffer.seek(0)
+                cursor.copy_expert(f"{sql} WITH (FORMAT csv)", buffer)
+            else:
+                with cursor.copy(sql) as copy:
+                    for fila in valores:
+                        copy.write_row(fila)
+        # COPY no pasa por la sesión: anotar la tabla para su versión (ETag)
+        registrar_tabla_modificada(self.session, tabla.name)
     
-    def get_by_id(self, entity_id: int) -> Optional[T]:
+    def find_ids_existentes(self, ids: Sequence[int]) -> set:
+        """
+        Obtiene cuáles de las claves primarias dadas existen, en una consulta.
+        
+        Args:
+            ids: Claves primarias a verificar
+            
+        Returns:
+            Conjunto de claves existentes
+        """
+        if not ids:
+            return set()
+        clave = inspect(self.model_class).primary_key[0]
+        return set(self.session.scalars(select(clave).where(clave.in_(set(ids)))))
+    
+    def get_by_id(self, entity_id: int, profile: Perfil = None) -> Optional[T]:
         """
         Obtiene una entidad por su ID.
         
         Args:
             entity_id: ID de la entidad
+            profile: Perfil de carga de relaciones (opcional)
             
         Returns:
             La entidad si existe, None en caso contrario
         """
-        return self.session.get(self.model_class, entity_id)
+        return self.session.get(
+            self.model_class, entity_id, options=self._load_options(profile)
+        )
     
-    def get_all(self) -> List[T]:
+    def get_all(self, profile: Perfil = None) -> List[T]:
         """
         Obtiene todas las entidades.
         
+        Args:
+            profile: Perfil de carga de relaciones (opcional)
+        
         Returns:
             Lista de todas las entidades
         """
-        return self.session.query(self.model_class).all()
+        return self._query(profile).all()
     
     def find_all(self) -> List[T]:
         """Alias para get_all()"""
@@ -77,39 +627,30 @@ class BaseRepository(Generic[T]):
         Returns:
             La entidad actualizada
         """
-        try:
-            self.session.merge(entity)
-            self.session.commit()
-            return entity
-        except Exception as e:
-            self.session.rollback()
-            raise e
+        return self.save(entity)
     
     def save(self, entity: T) -> T:
         """
         Guarda una entidad (crea si es nueva, actualiza si existe).
         
+        El estado se obtiene con la API de inspección de SQLAlchemy: una
+        entidad ya asociada a la sesión no necesita merge ni refresh, y el
+        flush solo escribe las columnas modificadas. merge() queda para
+        entidades separadas (detached) de su sesión.
+        
         Args:
             entity: Entidad a guardar
             
         Returns:
-            La entidad guardada
+            La entidad guardada (la instancia de la sesión si estaba separada)
         """
-        try:
-            if hasattr(entity, 'codCliente') and entity.codCliente is not None:
-                self.session.merge(entity)
-            elif hasattr(entity, 'codService') and entity.codService is not None:
-                self.session.merge(entity)
-            elif hasattr(entity, 'codPresupuesto') and entity.codPresupuesto is not None:
-                self.session.merge(entity)
-            else:
+        estado = inspect(entity)
+        with self.unit_of_work():
+            if estado.transient:
                 self.session.add(entity)
-            self.session.commit()
-            self.session.refresh(entity)
-            return entity
-        except Exception as e:
-            self.session.rollback()
-            raise e
+            elif estado.detached:
+                entity = self.session.merge(entity)
+        return entity
     
     def delete(self, entity_id: int) -> bool:
         """
@@ -122,15 +663,11 @@ class BaseRepository(Generic[T]):
             True si se eliminó correctamente, False si no existía
         """
         entity = self.get_by_id(entity_id)
-        if entity:
-            try:
-                self.session.delete(entity)
-                self.session.commit()
-                return True
-            except Exception as e:
-                self.session.rollback()
-                raise e
-        return False
+        if not entity:
+            return False
+        with self.unit_of_work():
+            self.session.delete(entity)
+        return True
     
     def exists(self, entity_id: int) -> bool:
         """
@@ -143,3 +680,12 @@ class BaseRepository(Generic[T]):
             True si existe, False en caso contrario
         """
         return self.get_by_id(entity_id) is not None
+    
+    def count(self) -> int:
+        """
+        Cuenta las entidades sin cargarlas.
+        
+        Returns:
+            Cantidad de filas de la tabla
+        """
+        return self.session.scalar(select(func.count()).select_from(self.model_class))
@@ -1,40 +1,84 @@
 """Repositorio para la entidad Cliente"""
-from typing import List, Optional
+from typing import List, Optional, Sequence
+from sqlalchemy import bindparam, func, select
+from sqlalchemy.orm import selectinload, with_expression
 from src.repositories.base_repository import BaseRepository
 from src.models.cliente import Cliente
+from src.models.service import Service
+
+
+def _conteo_services(*criterios):
+    """Subconsulta correlacionada que cuenta los services de cada cliente"""
+    return (
+        select(func.count(Service.codService))
+        .where(Service.codCliente == Cliente.codCliente, *criterios)
+        .correlate(Cliente)
+        .scalar_subquery()
+    )
+
+
+# Búsqueda por email (alta y edición de clientes), construida una sola vez
+_POR_EMAIL = select(Cliente).where(Cliente.email == bindparam('email')).limit(1)
 
 
 class ClienteRepository(BaseRepository[Cliente]):
-    """Repositorio para operaciones con Clientes"""
+    """
+    Repositorio para operaciones con Clientes.
+    
+    Perfiles de carga disponibles:
+        conteos: total_services y services_pendientes calculados en SQL,
+            sin cargar la colección de services
+    
+    Con una Proyeccion (?fields= / ?include=) cada conteo se calcula solo
+    si se pide su campo, y los services solo con include=services.
+    """
+    
+    load_profiles = {
+        'conteos': (
+            with_expression(Cliente.cantidad_services, _conteo_services()),
+            with_expression(
+                Cliente.cantidad_pendientes,
+                _conteo_services(Service.estado != 'Entregado')
+            ),
+        ),
+    }
+    
+    expansiones = {
+        'cantidad_services': load_profiles['conteos'][:1],
+        'cantidad_pendientes': load_profiles['conteos'][1:],
+        'services': (selectinload(Cliente.services),),
+    }
     
     def __init__(self):
         super().__init__(Cliente)
     
-    def find_by_nombre(self, nombre: str) -> List[Cliente]:
+    def find_by_email(self, email: str) -> Optional[Cliente]:
         """
-        Busca clientes que contengan el nombre dado.
+        Busca un cliente por su email exacto.
         
         Args:
-            nombre: Nombre a buscar (búsqueda parcial)
+            email: Email del cliente
             
         Returns:
-            Lista de clientes que coinciden
+            El cliente si existe, None en caso contrario
         """
-        return self.session.query(Cliente).filter(
-            Cliente.nombre.ilike(f'%{nombre}%')
-        ).all()
+        return self._execute(_POR_EMAIL, {'email': email}).first()
     
-    def find_by_email(self, email: str) -> Optional[Cliente]:
+    def find_emails_existentes(self, emails: Sequence[str]) -> set:
         """
-        Busca un cliente por su email exacto.
+        Obtiene cuáles de los emails dados ya están registrados, en una consulta.
         
         Args:
-            email: Email del cliente
+            emails: Emails a verificar
             
         Returns:
-            El cliente si existe, None en caso contrario
+            Conjunto de emails existentes
         """
-        return self.session.query(Cliente).filter_by(email=email).first()
+        if not emails:
+            return set()
+        return set(self.session.scalars(
+            select(Cliente.email).where(Cliente.email.in_(set(emails)))
+        ))
     
     def find_by_tel(self, tel: str) -> Optional[Cliente]:
         """
@@ -55,7 +99,9 @@ class ClienteRepository(BaseRepository[Cliente]):
         Returns:
             Lista de clientes con servicios pendientes
         """
-        from src.models.service import Service
-        return self.session.query(Cliente).join(Service).filter(
-            Service.entregado == False
-        ).distinct().all()
+        no_entregados = select(Service.codCliente).where(
+            Service.estado.in_(('Pendiente', 'Revisado', 'Reparado'))
+        )
+        return self.session.query(Cliente).filter(
+            Cliente.codCliente.in_(no_entregados)
+        ).all()
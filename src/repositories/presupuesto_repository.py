@@ -1,40 +1,77 @@
 """Repositorio para la entidad Presupuesto"""
-from typing import List, Optional
-from src.repositories.base_repository import BaseRepository
+from typing import List, Optional, Tuple
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import joinedload
+from src.repositories.base_repository import BaseRepository, Perfil
 from src.models.presupuesto import Presupuesto
 
+# Presupuesto de un servicio, construida una sola vez
+_POR_SERVICE = (
+    select(Presupuesto)
+    .where(Presupuesto.codService == bindparam('cod_service'))
+    .limit(1)
+)
+
 
 class PresupuestoRepository(BaseRepository[Presupuesto]):
-    """Repositorio para operaciones con Presupuestos"""
+    """
+    Repositorio para operaciones con Presupuestos.
+    
+    Con una Proyeccion, el service se carga (JOIN) solo con include=service.
+    """
+    
+    expansiones = {
+        'service': (joinedload(Presupuesto.service, innerjoin=True),),
+    }
     
     def __init__(self):
         super().__init__(Presupuesto)
     
-    def find_by_service(self, cod_service: int) -> Optional[Presupuesto]:
+    def find_by_service(self, cod_service: int,
+                        profile: Perfil = None) -> Optional[Presupuesto]:
         """
         Encuentra el presupuesto de un servicio.
         
         Args:
             cod_service: Código del servicio
+            profile: Perfil de carga (opcional)
             
         Returns:
             El presupuesto si existe, None en caso contrario
         """
-        return self.session.query(Presupuesto).filter_by(
-            codService=cod_service
-        ).first()
+        return self._execute(_POR_SERVICE, {'cod_service': cod_service}, profile).first()
     
-    def find_pendientes_aceptacion(self) -> List[Presupuesto]:
+    def find_pendientes_aceptacion(self, profile: Perfil = None) -> List[Presupuesto]:
         """
         Encuentra presupuestos pendientes de aceptación.
         
+        Args:
+            profile: Perfil de carga (opcional)
+            
         Returns:
             Lista de presupuestos no aceptados
         """
-        return self.session.query(Presupuesto).filter_by(
+        return self._query(profile).filter_by(
             aceptado=False
         ).all()
     
+    def paginate_pendientes_aceptacion(self, limit: int, after: Optional[str] = None,
+                                       profile: Perfil = None) -> Tuple[List[Presupuesto], Optional[str]]:
+        """
+        Obtiene una página de presupuestos pendientes de aceptación.
+        
+        Args:
+            limit: Cantidad máxima de presupuestos
+            after: Cursor de la página anterior (opcional)
+            profile: Perfil de carga (opcional)
+            
+        Returns:
+            Tupla (presupuestos, cursor siguiente)
+        """
+        return self.paginate(
+            limit, after, filters=(Presupuesto.aceptado == False,), profile=profile
+        )
+    
     def find_aceptados(self) -> List[Presupuesto]:
         """
         Encuentra presupuestos aceptados.
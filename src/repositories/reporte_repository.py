@@ -0,0 +1,228 @@
+"""Repositorio de consultas agregadas para reportes"""
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import bindparam, delete, extract, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as insert_pg
+from sqlalchemy.dialects.sqlite import insert as insert_sqlite
+from sqlalchemy.orm import Session, joinedload
+from src.config.database import db
+from src.repositories.base_repository import unit_of_work
+from src.models.service import Service
+from src.models.presupuesto import Presupuesto
+from src.models.ganancia_mensual import GananciaMensual
+
+_RESUMENES = GananciaMensual.__table__
+_VALORES_RESUMEN = dict(
+    anio=bindparam('anio'), mes=bindparam('mes'),
+    total_repuestos=bindparam('repuestos'), total_mano_obra=bindparam('mano_obra')
+)
+
+
+def _upsert_resumen(insert_dialecto):
+    """INSERT del resumen que, si el mes ya existe, suma los deltas a la fila"""
+    stmt = insert_dialecto(_RESUMENES).values(**_VALORES_RESUMEN)
+    return stmt.on_conflict_do_update(
+        index_elements=[_RESUMENES.c.anio, _RESUMENES.c.mes],
+        set_={
+            'total_repuestos': _RESUMENES.c.total_repuestos + stmt.excluded.total_repuestos,
+            'total_mano_obra': _RESUMENES.c.total_mano_obra + stmt.excluded.total_mano_obra,
+        }
+    )
+
+
+# Ajuste de un mes, construido una sola vez por motor
+_AJUSTE_RESUMEN = {
+    'sqlite': _upsert_resumen(insert_sqlite),
+    'postgresql': _upsert_resumen(insert_pg),
+}
+
+# Otros motores: UPDATE y, si el mes no existía, INSERT
+_SUMA_RESUMEN = (
+    update(_RESUMENES)
+    .where(_RESUMENES.c.anio == bindparam('anio'), _RESUMENES.c.mes == bindparam('mes'))
+    .values(
+        total_repuestos=_RESUMENES.c.total_repuestos + bindparam('repuestos'),
+        total_mano_obra=_RESUMENES.c.total_mano_obra + bindparam('mano_obra')
+    )
+)
+_INSERT_RESUMEN = insert(_RESUMENES).values(**_VALORES_RESUMEN)
+
+
+class ReporteRepository:
+    """
+    Repositorio para reportes de ganancias.
+    
+    Los totales se calculan en la base de datos con predicados de rango
+    sobre Service.fecha, sin cargar el historial completo en memoria.
+    
+    La tabla ganancias_mensuales guarda esos totales por mes; cuando
+    cambian presupuestos o repuestos, ajustar_resumen_fechas le suma la
+    diferencia en SQL dentro de la transacción en curso (sin commit).
+    Como cada escritura solo suma su propio delta, dos transacciones
+    concurrentes sobre el mismo mes no se pisan.
+    """
+    
+    def __init__(self):
+        self.session: Session = db.session
+    
+    @staticmethod
+    def rango_mes(anio: int, mes: int) -> Tuple[date, date]:
+        """
+        Calcula el rango [desde, hasta) de un mes.
+        
+        Args:
+            anio: Año
+            mes: Mes (1-12)
+        
+        Returns:
+            Tupla (primer día del mes, primer día del mes siguiente)
+        """
+        desde = date(anio, mes, 1)
+        hasta = date(anio + 1, 1, 1) if mes == 12 else date(anio, mes + 1, 1)
+        return desde, hasta
+    
+    def find_services_mes(self, anio: int, mes: int) -> List[Service]:
+        """
+        Obtiene los servicios ingresados en un mes, con cliente y
+        presupuesto ya cargados.
+        
+        Args:
+            anio: Año
+            mes: Mes (1-12)
+        
+        Returns:
+            Lista de servicios del mes ordenados por fecha
+        """
+        desde, hasta = self.rango_mes(anio, mes)
+        return self.session.query(Service).options(
+            joinedload(Service.cliente, innerjoin=True),
+            joinedload(Service.presupuesto),
+        ).filter(
+            Service.fecha >= desde,
+            Service.fecha < hasta
+        ).order_by(Service.fecha, Service.codService).all()
+    
+    def get_totales_mes(self, anio: int, mes: int) -> dict:
+        """
+        Calcula los totales de un mes para services con presupuesto.
+        
+        Args:
+            anio: Año
+            mes: Mes (1-12)
+        
+        Returns:
+            Diccionario con total_repuestos, total_mano_obra y total_general
+        """
+        desde, hasta = self.rango_mes(anio, mes)
+        
+        total_repuestos, total_mano_obra = self.session.execute(
+            select(
+                func.coalesce(func.sum(Service.total_repuestos), 0),
+                func.coalesce(func.sum(Presupuesto.manoDeObra), 0)
+            )
+            .join(Presupuesto, Presupuesto.codService == Service.codService)
+            .where(Service.fecha >= desde, Service.fecha < hasta)
+        ).one()
+        
+        return {
+            'total_repuestos': total_repuestos,
+            'total_mano_obra': total_mano_obra,
+            'total_general': total_repuestos + total_mano_obra
+        }
+    
+    def get_resumen_mes(self, anio: int, mes: int) -> Optional[GananciaMensual]:
+        """
+        Obtiene el resumen precalculado de un mes.
+        
+        Args:
+            anio: Año
+            mes: Mes (1-12)
+            
+        Returns:
+            El resumen si existe, None en caso contrario
+        """
+        return self.session.get(GananciaMensual, (anio, mes))
+    
+    def ajustar_resumen_mes(self, anio: int, mes: int, delta_repuestos: int = 0,
+                            delta_mano_obra: int = 0) -> None:
+        """
+        Suma los deltas al resumen de un mes, creándolo si no existe.
+        
+        El incremento se hace en SQL (INSERT ... ON CONFLICT DO UPDATE en
+        SQLite y PostgreSQL): no depende de lo que leyó la transacción y
+        dos primeras escrituras del mes no chocan por la clave primaria.
+        No hace commit.
+        
+        Args:
+            anio: Año
+            mes: Mes (1-12)
+            delta_repuestos: Diferencia en el total de repuestos
+            delta_mano_obra: Diferencia en el total de mano de obra
+        """
+        params = {
+            'anio': anio, 'mes': mes,
+            'repuestos': delta_repuestos, 'mano_obra': delta_mano_obra
+        }
+        upsert = _AJUSTE_RESUMEN.get(self.session.get_bind().dialect.name)
+        if upsert is not None:
+            self.session.execute(upsert, params)
+        elif self.session.execute(_SUMA_RESUMEN, params).rowcount == 0:
+            self.session.execute(_INSERT_RESUMEN, params)
+    
+    def ajustar_resumen_fechas(self, deltas: Iterable[Tuple[date, int, int]]) -> None:
+        """
+        Aplica los deltas de varios services a los resúmenes de sus meses.
+        
+        Los deltas se agrupan por mes y se aplican en orden de mes, así dos
+        transacciones que tocan los mismos meses los bloquean en el mismo
+        orden.
+        
+        Args:
+            deltas: Tuplas (fecha del service, delta de repuestos,
+                delta de mano de obra)
+        """
+        por_mes: Dict[Tuple[int, int], List[int]] = {}
+        for fecha, repuestos, mano_obra in deltas:
+            if not fecha:
+                continue
+            acumulado = por_mes.setdefault((fecha.year, fecha.month), [0, 0])
+            acumulado[0] += repuestos
+            acumulado[1] += mano_obra
+        
+        for (anio, mes), (repuestos, mano_obra) in sorted(por_mes.items()):
+            if repuestos or mano_obra:
+                self.ajustar_resumen_mes(anio, mes, repuestos, mano_obra)
+    
+    def reconstruir_resumenes(self) -> int:
+        """
+        Reconstruye la tabla ganancias_mensuales desde cero.
+        
+        Returns:
+            Cantidad de meses generados
+        """
+        anio = extract('year', Service.fecha)
+        mes = extract('month', Service.fecha)
+        
+        filas = self.session.execute(
+            select(
+                anio, mes,
+                func.sum(Service.total_repuestos),
+                func.sum(Presupuesto.manoDeObra)
+            )
+            .join(Presupuesto, Presupuesto.codService == Service.codService)
+            .group_by(anio, mes)
+        ).all()
+        
+        resumenes = [
+            GananciaMensual(
+                anio=int(a), mes=int(m),
+                total_repuestos=repuestos or 0,
+                total_mano_obra=mano_obra or 0
+            )
+            for a, m, repuestos, mano_obra in filas
+        ]
+        
+        with unit_of_work(self.session):
+            self.session.execute(delete(GananciaMensual))
+            self.session.add_all(resumenes)
+        return len(resumenes)
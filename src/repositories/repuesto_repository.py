@@ -0,0 +1,40 @@
+"""Repositorio para la entidad Repuesto"""
+from typing import List, Optional
+from src.repositories.base_repository import BaseRepository
+from src.models.repuesto import Repuesto
+
+
+class RepuestoRepository(BaseRepository[Repuesto]):
+    """Repositorio para operaciones con Repuestos"""
+    
+    def __init__(self):
+        super().__init__(Repuesto)
+    
+    def find_by_service(self, cod_service: int) -> List[Repuesto]:
+        """
+        Encuentra los repuestos de un servicio.
+        
+        Args:
+            cod_service: Código del servicio
+            
+        Returns:
+            Lista de repuestos del servicio
+        """
+        return self.session.query(Repuesto).filter_by(
+            codService=cod_service
+        ).order_by(Repuesto.id).all()
+    
+    def find_de_service(self, cod_service: int, repuesto_id: int) -> Optional[Repuesto]:
+        """
+        Busca un repuesto verificando que pertenezca al servicio.
+        
+        Args:
+            cod_service: Código del servicio
+            repuesto_id: ID del repuesto
+            
+        Returns:
+            El repuesto si existe y pertenece al servicio, None en caso contrario
+        """
+        return self.session.query(Repuesto).filter_by(
+            id=repuesto_id, codService=cod_service
+        ).first()
@@ -1,110 +1,409 @@
 """Repositorio para la entidad Service"""
-from typing import List, Optional
-from src.repositories.base_repository import BaseRepository
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, case, func, select, update
+from sqlalchemy.orm import joinedload, selectinload
+from src.repositories.base_repository import BaseRepository, Perfil
 from src.models.service import Service
+from src.models.cliente import Cliente
+from src.models.presupuesto import Presupuesto
+from src.models.repuesto import Repuesto
+
+
+# Consultas frecuentes, construidas una vez para reutilizar la compilación
+_POR_CLIENTE = (
+    select(Service)
+    .where(Service.codCliente == bindparam('cod_cliente'))
+    .order_by(Service.fecha.desc())
+)
+_POR_ESTADO = (
+    select(Service)
+    .where(Service.estado == bindparam('estado'))
+    .order_by(Service.fecha)
+)
+_NO_ENTREGADOS = (
+    select(Service)
+    .where(Service.estado.in_(('Pendiente', 'Revisado', 'Reparado')))
+    .order_by(Service.fecha)
+)
+
+# Columnas de la exportación del historial (filas planas, sin entidades ORM)
+_EXPORTACION = (
+    select(
+        Service.codService,
+        Service.fecha,
+        Service.codCliente,
+        Cliente.nombre.label('cliente'),
+        Service.nomProducto,
+        Service.modelo,
+        Service.descrip,
+        Service.descripFalla,
+        Service.estado,
+        Service.total_repuestos,
+        Presupuesto.costo.label('presupuesto_costo'),
+        Presupuesto.manoDeObra.label('presupuesto_mano_obra'),
+        Presupuesto.gananciaTotal.label('presupuesto_total'),
+        Presupuesto.aceptado.label('presupuesto_aceptado'),
+    )
+    .join(Cliente, Cliente.codCliente == Service.codCliente)
+    .outerjoin(Presupuesto, Presupuesto.codService == Service.codService)
+    .order_by(Service.fecha, Service.codService)
+)
+
+# Transiciones de estado en lote: (requisito, valores del UPDATE).
+# Replican Service.marcar_*: el estado se recalcula igual que calcular_estado()
+TRANSICIONES = {
+    'revisar': (
+        None,
+        {
+            'revisado': True,
+            'estado': case(
+                (Service.entregado, 'Entregado'),
+                (Service.reparado, 'Reparado'),
+                else_='Revisado'
+            ),
+        },
+    ),
+    'reparar': (
+        Service.revisado,
+        {
+            'reparado': True,
+            'estado': case((Service.entregado, 'Entregado'), else_='Reparado'),
+        },
+    ),
+    'entregar': (
+        Service.reparado,
+        {'entregado': True, 'estado': 'Entregado'},
+    ),
+}
 
 
 class ServiceRepository(BaseRepository[Service]):
-    """Repositorio para operaciones con Services"""
+    """
+    Repositorio para operaciones con Services.
+    
+    Perfiles de carga disponibles:
+        list: cliente, presupuesto y repuestos (lo que usa to_dict())
+        detail: igual que list, para un único servicio
+        board: solo cliente (listado de la página /services)
+    
+    Con una Proyeccion (?fields= / ?include=) solo se cargan las relaciones
+    que piden los campos o las inclusiones: cliente (cliente_nombre),
+    presupuesto (tiene_presupuesto) y repuestos (repuestos_lista).
+    """
+    
+    load_profiles = {
+        'list': (
+            joinedload(Service.cliente, innerjoin=True),
+            selectinload(Service.presupuesto),
+            selectinload(Service.repuestos),
+        ),
+        'detail': (
+            joinedload(Service.cliente, innerjoin=True),
+            joinedload(Service.presupuesto),
+            selectinload(Service.repuestos),
+        ),
+        'board': (
+            joinedload(Service.cliente, innerjoin=True),
+        ),
+    }
+    
+    expansiones = {
+        'cliente': (joinedload(Service.cliente, innerjoin=True),),
+        'presupuesto': (selectinload(Service.presupuesto),),
+        'repuestos': (selectinload(Service.repuestos),),
+    }
+    
+    # Paginación por fecha de ingreso; codService desempata dentro del día
+    page_keys = (Service.fecha, Service.codService)
+    
+    @staticmethod
+    def normalizar_estado(estado: str) -> str:
+        """
+        Convierte un estado recibido como filtro ('entregado') al valor
+        almacenado en la columna estado ('Entregado').
+        
+        Raises:
+            ValueError: Si el estado no existe
+        """
+        valor = estado.strip().capitalize()
+        if valor not in Service.ESTADOS:
+            raise ValueError(f"Estado desconocido: {estado}")
+        return valor
     
     def __init__(self):
         super().__init__(Service)
     
-    def find_by_cliente(self, cod_cliente: int) -> List[Service]:
+    def find_by_cliente(self, cod_cliente: int,
+                        profile: Perfil = None) -> List[Service]:
         """
         Encuentra todos los servicios de un cliente.
         
         Args:
             cod_cliente: Código del cliente
+            profile: Perfil de carga de relaciones (opcional)
             
         Returns:
             Lista de servicios del cliente
         """
-        return self.session.query(Service).filter_by(
-            codCliente=cod_cliente
-        ).order_by(Service.fecha.desc()).all()
+        return self._execute(_POR_CLIENTE, {'cod_cliente': cod_cliente}, profile).all()
     
-    def find_pendientes(self) -> List[Service]:
+    def find_by_estado(self, estado: str,
+                       profile: Perfil = None) -> List[Service]:
+        """
+        Encuentra servicios en un estado dado, ordenados por fecha.
+        
+        Se resuelve con un rango sobre el índice (estado, fecha).
+        
+        Args:
+            estado: Estado del servicio (pendiente, revisado, reparado, entregado)
+            profile: Perfil de carga de relaciones (opcional)
+            
+        Returns:
+            Lista de servicios en ese estado
+            
+        Raises:
+            ValueError: Si el estado no existe
+        """
+        return self._execute(
+            _POR_ESTADO, {'estado': self.normalizar_estado(estado)}, profile
+        ).all()
+    
+    def find_pendientes(self, profile: Perfil = None) -> List[Service]:
         """
         Encuentra servicios que no han sido revisados.
         
+        Args:
+            profile: Perfil de carga de relaciones (opcional)
+            
         Returns:
             Lista de servicios pendientes de revisión
         """
-        return self.session.query(Service).filter_by(
-            revisado=False
-        ).order_by(Service.fecha).all()
+        return self.find_by_estado('Pendiente', profile)
     
-    def find_revisados_sin_reparar(self) -> List[Service]:
+    def find_revisados_sin_reparar(self, profile: Perfil = None) -> List[Service]:
         """
         Encuentra servicios revisados pero no reparados.
         
+        Args:
+            profile: Perfil de carga de relaciones (opcional)
+            
         Returns:
             Lista de servicios en proceso
         """
-        return self.session.query(Service).filter(
-            Service.revisado == True,
-            Service.reparado == False
-        ).order_by(Service.fecha).all()
+        return self.find_by_estado('Revisado', profile)
     
-    def find_reparados_sin_entregar(self) -> List[Service]:
+    def find_reparados_sin_entregar(self, profile: Perfil = None) -> List[Service]:
         """
         Encuentra servicios reparados pero no entregados.
         
+        Args:
+            profile: Perfil de carga de relaciones (opcional)
+            
         Returns:
             Lista de servicios listos para entrega
         """
-        return self.session.query(Service).filter(
-            Service.reparado == True,
-            Service.entregado == False
-        ).order_by(Service.fecha).all()
+        return self.find_by_estado('Reparado', profile)
     
-    def find_no_entregados(self) -> List[Service]:
+    def find_no_entregados(self, profile: Perfil = None) -> List[Service]:
         """
         Encuentra todos los servicios que no han sido entregados.
         
+        Args:
+            profile: Perfil de carga de relaciones (opcional)
+            
         Returns:
             Lista de servicios no entregados
         """
-        return self.session.query(Service).filter_by(
-            entregado=False
-        ).order_by(Service.fecha).all()
+        return self._execute(_NO_ENTREGADOS, profile=profile).all()
+    
+    def find_entregados(self, profile: Perfil = None) -> List[Service]:
+        """
+        Encuentra servicios ya entregados.
+        
+        Args:
+            profile: Perfil de carga de relaciones (opcional)
+            
+        Returns:
+            Lista de servicios entregados
+        """
+        return self.find_by_estado('Entregado', profile)
+    
+    def paginate_filtered(self, limit: int, after: Optional[str] = None,
+                          cod_cliente: Optional[int] = None,
+                          estado: Optional[str] = None,
+                          profile: Perfil = None) -> Tuple[List[Service], Optional[str]]:
+        """
+        Obtiene una página de servicios ordenada por (fecha, codService).
+        
+        Args:
+            limit: Cantidad máxima de servicios
+            after: Cursor de la página anterior (opcional)
+            cod_cliente: Filtrar por cliente (opcional)
+            estado: Filtrar por estado: pendiente, revisado, reparado o entregado
+            profile: Perfil de carga de relaciones (opcional)
+            
+        Returns:
+            Tupla (servicios, cursor siguiente)
+        """
+        filters = []
+        if cod_cliente is not None:
+            filters.append(Service.codCliente == cod_cliente)
+        if estado:
+            filters.append(Service.estado == self.normalizar_estado(estado))
+        return self.paginate(limit, after, filters=filters, profile=profile)
+    
+    @staticmethod
+    def export_columns() -> List[str]:
+        """Nombres de las columnas de iter_export(), en orden"""
+        return list(_EXPORTACION.selected_columns.keys())
     
-    def find_by_producto(self, producto: str) -> List[Service]:
+    def iter_export(self, desde: Optional[date] = None, hasta: Optional[date] = None,
+                    batch_size: int = 1000) -> Iterator[list]:
         """
-        Busca servicios por nombre de producto.
+        Recorre el historial de servicios por lotes, para exportarlo.
+        
+        Usa yield_per (cursor del lado del servidor donde el motor lo
+        permite), así la memoria no crece con la cantidad de filas.
         
         Args:
-            producto: Nombre del producto (búsqueda parcial)
+            desde: Fecha de ingreso mínima, inclusive (opcional)
+            hasta: Fecha de ingreso máxima, inclusive (opcional)
+            batch_size: Filas por lote
             
+        Yields:
+            Listas de filas (mappings con las columnas de la exportación)
+        """
+        stmt = _EXPORTACION
+        if desde is not None:
+            stmt = stmt.where(Service.fecha >= desde)
+        if hasta is not None:
+            stmt = stmt.where(Service.fecha <= hasta)
+        
+        result = self.session.execute(stmt.execution_options(yield_per=batch_size))
+        yield from result.mappings().partitions()
+    
+    def ajustar_total_repuestos(self, service: Service, delta: int) -> None:
+        """
+        Suma delta al total de repuestos del servicio (sin commit).
+        
+        El incremento se hace en SQL para no perder escrituras concurrentes.
+        Se aplica aunque delta sea cero: el UPDATE incrementa la versión del
+        servicio, cuyo detalle incluye la lista de repuestos.
+        
+        Args:
+            service: Servicio a actualizar
+            delta: Diferencia de costo a aplicar
+        """
+        service.total_repuestos = Service.total_repuestos + delta
+    
+    def _suma_repuestos(self):
+        """Subconsulta correlacionada con la suma real de repuestos"""
+        return (
+            select(func.coalesce(func.sum(Repuesto.costo), 0))
+            .where(Repuesto.codService == Service.codService)
+            .scalar_subquery()
+        )
+    
+    def find_total_repuestos_inconsistentes(self) -> List[tuple]:
+        """
+        Encuentra servicios cuyo total_repuestos no coincide con sus repuestos.
+        
         Returns:
-            Lista de servicios que coinciden
+            Lista de tuplas (codService, total guardado, total real)
         """
-        return self.session.query(Service).filter(
-            Service.nomProducto.ilike(f'%{producto}%')
+        suma = self._suma_repuestos()
+        return self.session.execute(
+            select(Service.codService, Service.total_repuestos, suma)
+            .where(Service.total_repuestos != suma)
+            .order_by(Service.codService)
         ).all()
     
+    def rebuild_total_repuestos(self) -> int:
+        """
+        Recalcula total_repuestos de todos los servicios inconsistentes.
+        
+        Returns:
+            Cantidad de servicios corregidos
+        """
+        suma = self._suma_repuestos()
+        with self.unit_of_work():
+            result = self.session.execute(
+                update(Service)
+                .where(Service.total_repuestos != suma)
+                .values(total_repuestos=suma, version=Service.version + 1)
+                .execution_options(synchronize_session=False)
+            )
+        return result.rowcount
+    
+    def find_flags(self, ids: Sequence[int]) -> Dict[int, Tuple[bool, bool, bool]]:
+        """
+        Obtiene los flags de estado de varios servicios en una consulta.
+        
+        Args:
+            ids: Códigos de los servicios
+            
+        Returns:
+            Diccionario codService -> (revisado, reparado, entregado)
+        """
+        if not ids:
+            return {}
+        filas = self.session.execute(
+            select(Service.codService, Service.revisado, Service.reparado, Service.entregado)
+            .where(Service.codService.in_(set(ids)))
+        )
+        return {cod: (bool(rev), bool(rep), bool(ent)) for cod, rev, rep, ent in filas}
+    
+    def marcar_lote(self, ids: Sequence[int], accion: str) -> List[int]:
+        """
+        Aplica una transición de estado a varios servicios con un único UPDATE.
+        
+        Solo se actualizan los servicios que cumplen el requisito de la
+        transición (ej. estar reparado para entregar). No hace commit.
+        
+        Args:
+            ids: Códigos de los servicios
+            accion: 'revisar', 'reparar' o 'entregar'
+            
+        Returns:
+            Códigos de los servicios actualizados
+        """
+        requisito, valores = TRANSICIONES[accion]
+        if not ids:
+            return []
+        
+        criterios = [Service.codService.in_(set(ids))]
+        if requisito is not None:
+            criterios.append(requisito)
+        
+        return list(self.session.scalars(
+            update(Service)
+            .where(*criterios)
+            .values(**valores, version=Service.version + 1)
+            .returning(Service.codService)
+            .execution_options(synchronize_session=False)
+        ))
+    
     def count_by_estado(self) -> dict:
         """
         Cuenta servicios agrupados por estado.
         
+        Se resuelve en una sola consulta GROUP BY sobre el índice
+        (estado, fecha).
+        
         Returns:
             Diccionario con conteos por estado
         """
-        total = self.session.query(Service).count()
-        pendientes = self.session.query(Service).filter_by(revisado=False).count()
-        revisados = self.session.query(Service).filter(
-            Service.revisado == True, Service.reparado == False
-        ).count()
-        reparados = self.session.query(Service).filter(
-            Service.reparado == True, Service.entregado == False
-        ).count()
-        entregados = self.session.query(Service).filter_by(entregado=True).count()
+        conteos = dict(
+            self.session.query(Service.estado, func.count())
+            .group_by(Service.estado)
+            .all()
+        )
         
         return {
-            'total': total,
-            'pendientes': pendientes,
-            'revisados': revisados,
-            'reparados': reparados,
-            'entregados': entregados
+            'total': sum(conteos.values()),
+            'pendientes': conteos.get('Pendiente', 0),
+            'revisados': conteos.get('Revisado', 0),
+            'reparados': conteos.get('Reparado', 0),
+            'entregados': conteos.get('Entregado', 0)
         }
@@ -0,0 +1,120 @@
+"""Repositorio de versiones de tablas y filas (ETags)"""
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+from src.config.database import db
+from src.models.version_tabla import VersionTabla
+from src.models.cliente import Cliente
+from src.models.service import Service
+from src.models.presupuesto import Presupuesto
+
+# Consultas de solo columnas: no cargan entidades en la sesión
+_VERSIONES_TABLAS = (
+    select(VersionTabla.tabla, VersionTabla.version)
+    .where(VersionTabla.tabla.in_(bindparam('tablas', expanding=True)))
+)
+
+_VERSION_SERVICE = (
+    select(Service.version, Cliente.version, Presupuesto.version)
+    .join(Cliente, Cliente.codCliente == Service.codCliente)
+    .outerjoin(Presupuesto, Presupuesto.codService == Service.codService)
+    .where(Service.codService == bindparam('cod_service'))
+)
+
+_VERSION_CLIENTE = select(Cliente.version).where(Cliente.codCliente == bindparam('cod_cliente'))
+
+_VERSION_PRESUPUESTO = (
+    select(Presupuesto.version, Service.version)
+    .join(Service, Service.codService == Presupuesto.codService)
+    .where(Presupuesto.codPresupuesto == bindparam('cod_presupuesto'))
+)
+
+_VERSION_PRESUPUESTO_DE_SERVICE = (
+    select(Presupuesto.codPresupuesto, Presupuesto.version, Service.version)
+    .join(Service, Service.codService == Presupuesto.codService)
+    .where(Presupuesto.codService == bindparam('cod_service'))
+)
+
+
+class VersionRepository:
+    """
+    Repositorio de lectura de versiones.
+    
+    Las tablas versionadas tienen un contador en versiones_tablas que se
+    incrementa al confirmar cada transacción que las modifica; las filas
+    de clientes, services y presupuestos tienen una columna version que
+    el ORM incrementa en cada UPDATE.
+    """
+    
+    def __init__(self):
+        self.session: Session = db.session
+    
+    def get_versiones(self, tablas: Sequence[str]) -> Dict[str, int]:
+        """
+        Obtiene la versión actual de varias tablas en una consulta.
+        
+        Args:
+            tablas: Nombres de las tablas
+        
+        Returns:
+            Diccionario tabla -> versión
+        """
+        return dict(self.session.execute(_VERSIONES_TABLAS, {'tablas': list(tablas)}).all())
+    
+    def get_version_service(self, cod_service: int) -> Optional[Tuple[int, int, Optional[int]]]:
+        """
+        Obtiene las versiones de un servicio, su cliente y su presupuesto.
+        
+        Args:
+            cod_service: Código del servicio
+        
+        Returns:
+            Tupla (servicio, cliente, presupuesto o None), o None si el
+            servicio no existe
+        """
+        fila = self.session.execute(_VERSION_SERVICE, {'cod_service': cod_service}).first()
+        return tuple(fila) if fila else None
+    
+    def get_version_cliente(self, cod_cliente: int) -> Optional[int]:
+        """
+        Obtiene la versión de un cliente.
+        
+        Args:
+            cod_cliente: Código del cliente
+        
+        Returns:
+            La versión, o None si el cliente no existe
+        """
+        return self.session.execute(_VERSION_CLIENTE, {'cod_cliente': cod_cliente}).scalar()
+    
+    def get_version_presupuesto(self, cod_presupuesto: int) -> Optional[Tuple[int, int]]:
+        """
+        Obtiene las versiones de un presupuesto y de su servicio.
+        
+        Args:
+            cod_presupuesto: Código del presupuesto
+        
+        Returns:
+            Tupla (presupuesto, servicio), o None si el presupuesto no existe
+        """
+        fila = self.session.execute(
+            _VERSION_PRESUPUESTO, {'cod_presupuesto': cod_presupuesto}
+        ).first()
+        return tuple(fila) if fila else None
+    
+    def get_version_presupuesto_de_service(self, cod_service: int) -> Optional[Tuple[int, int, int]]:
+        """
+        Obtiene código y versión del presupuesto de un servicio, y la
+        versión del servicio.
+        
+        Args:
+            cod_service: Código del servicio
+        
+        Returns:
+            Tupla (codPresupuesto, versión, versión del servicio), o None si
+            no tiene presupuesto
+        """
+        fila = self.session.execute(
+            _VERSION_PRESUPUESTO_DE_SERVICE, {'cod_service': cod_service}
+        ).first()
+        return tuple(fila) if fila else None
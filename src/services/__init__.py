@@ -2,3 +2,7 @@
 from src.services.cliente_service import ClienteService
 from src.services.service_service import ServiceService
 from src.services.presupuesto_service import PresupuestoService
+from src.services.reporte_service import ReporteService
+from src.services.import_service import ImportService
+from src.services.version_service import VersionService
+from src.services.dashboard_service import DashboardService
@@ -0,0 +1,207 @@
+"""Caché de estadísticas, con vencimiento e invalidación por temas"""
+import logging
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Tuple
+from src.config.settings import settings
+from src.services.cache_backends import (
+    CacheBackend, MemoriaBackend, NO_ENCONTRADO, crear_backend
+)
+
+logger = logging.getLogger(__name__)
+
+# Temas de invalidación: uno por tabla que afecta a las estadísticas
+TEMA_CLIENTES = 'clientes'
+TEMA_SERVICES = 'services'
+TEMA_PRESUPUESTOS = 'presupuestos'
+TEMA_REPUESTOS = 'repuestos'
+
+
+class Cache:
+    """
+    Caché de estadísticas sobre un backend intercambiable.
+    
+    Cada entrada declara los temas de los que depende; invalidar un tema
+    descarta sus entradas. Un cálculo que empezó antes de una invalidación
+    no se guarda, para no volver a cachear datos anteriores a la escritura.
+    
+    Con un backend compartido y intervalo_sincronizacion > 0, cada worker
+    guarda además una copia local y consulta la generación del backend como
+    mucho una vez por intervalo: las invalidaciones de otros workers se ven
+    con ese retraso máximo. Con intervalo 0 se lee siempre del backend.
+    
+    Si el backend falla, se calcula el valor sin caché (y se registra).
+    """
+    
+    def __init__(self, backend: CacheBackend, ttl: float,
+                 intervalo_sincronizacion: float = 0.0, max_entradas_locales: int = 256):
+        """
+        Inicializa la caché.
+        
+        Args:
+            backend: Almacenamiento de las entradas
+            ttl: Segundos de validez de cada entrada
+            intervalo_sincronizacion: Retraso máximo, en segundos, con que se
+                ven las invalidaciones de otros workers (copia local)
+            max_entradas_locales: Tamaño de la copia local
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.intervalo_sincronizacion = intervalo_sincronizacion
+        self._local = None
+        if backend.compartido and intervalo_sincronizacion > 0:
+            self._local = MemoriaBackend(max_entradas_locales)
+        self._generacion_vista = None
+        self._proxima_sincronizacion = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.hits_locales = 0
+        self.misses = 0
+        self.invalidaciones = 0
+        self.errores = 0
+    
+    def _contar(self, contador: str) -> None:
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+    
+    def _error(self, operacion: str, error: Exception) -> None:
+        self._contar('errores')
+        logger.warning(f"Caché ({type(self.backend).__name__}): falló {operacion}: {error}")
+    
+    def _sincronizar(self) -> None:
+        """Descarta la copia local si otro worker invalidó desde la última consulta"""
+        ahora = time.monotonic()
+        if ahora < self._proxima_sincronizacion:
+            return
+        self._proxima_sincronizacion = ahora + self.intervalo_sincronizacion
+        generacion = self.backend.generacion()
+        if generacion != self._generacion_vista:
+            self._local.limpiar()
+            self._generacion_vista = generacion
+    
+    def obtener(self, clave: str, calcular: Callable[[], Any],
+                temas: Iterable[str] = ()) -> Any:
+        """
+        Devuelve el valor cacheado o lo calcula y lo guarda.
+        
+        Args:
+            clave: Clave de la entrada
+            calcular: Función que calcula el valor si no está cacheado
+            temas: Temas cuya invalidación descarta la entrada
+        
+        Returns:
+            El valor de la entrada
+        """
+        temas = tuple(temas)
+        try:
+            if self._local is not None:
+                self._sincronizar()
+                valor = self._local.leer(clave)
+                if valor is not NO_ENCONTRADO:
+                    self._contar('hits_locales')
+                    return valor
+            
+            valor = self.backend.leer(clave)
+            if valor is not NO_ENCONTRADO:
+                self._contar('hits')
+                self._guardar_local(clave, valor, temas)
+                return valor
+            generacion = self.backend.generacion()
+        except Exception as e:
+            self._error('la lectura', e)
+            return calcular()
+        
+        self._contar('misses')
+        valor = calcular()
+        try:
+            if self.backend.escribir(clave, valor, self.ttl, temas, generacion):
+                self._guardar_local(clave, valor, temas)
+        except Exception as e:
+            self._error('la escritura', e)
+        return valor
+    
+    def _guardar_local(self, clave: str, valor: Any, temas: Tuple[str, ...]) -> None:
+        if self._local is not None:
+            self._local.escribir(clave, valor, self.ttl, temas, self._local.generacion())
+    
+    def invalidar(self, *temas: str) -> None:
+        """
+        Descarta las entradas que dependen de alguno de los temas.
+        
+        Args:
+            temas: Temas modificados (ej. TEMA_SERVICES)
+        """
+        self._contar('invalidaciones')
+        if self._local is not None:
+            self._local.invalidar(temas)
+        try:
+            self.backend.invalidar(temas)
+        except Exception as e:
+            self._error('la invalidación', e)
+    
+    def limpiar(self) -> None:
+        """Descarta todas las entradas (los contadores se conservan)"""
+        if self._local is not None:
+            self._local.limpiar()
+        self.backend.limpiar()
+    
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Resume el uso de la caché en este worker.
+        
+        Returns:
+            Diccionario con backend, hits (del backend y de la copia
+            local), misses, hit_ratio, invalidaciones, errores, entradas,
+            desalojos (solo en memoria) y ttl
+        """
+        try:
+            entradas = self.backend.entradas()
+        except Exception as e:
+            self._error('el conteo', e)
+            entradas = None
+        with self._lock:
+            aciertos = self.hits + self.hits_locales
+            consultas = aciertos + self.misses
+            return {
+                'backend': type(self.backend).__name__,
+                'hits': self.hits,
+                'hits_locales': self.hits_locales,
+                'misses': self.misses,
+                'hit_ratio': round(aciertos / consultas, 3) if consultas else None,
+                'invalidaciones': self.invalidaciones,
+                'errores': self.errores,
+                'entradas': entradas,
+                'desalojos': getattr(self.backend, 'desalojos', None),
+                'ttl': self.ttl,
+                'intervalo_sincronizacion': self.intervalo_sincronizacion,
+            }
+
+
+# Caché de los servicios (backend según CACHE_BACKEND)
+cache_estadisticas = Cache(
+    crear_backend(settings.cache),
+    ttl=settings.cache.ttl_seconds,
+    intervalo_sincronizacion=settings.cache.sync_seconds,
+    max_entradas_locales=settings.cache.max_entries
+)
+
+
+def invalida_cache(*temas: str):
+    """
+    Decorador para mutadores de servicios: invalida los temas al terminar.
+    
+    Solo invalida si el método termina sin error, es decir después del
+    commit de su unidad de trabajo; si falla, no hubo cambios que invalidar.
+    
+    Args:
+        temas: Temas que el método modifica
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            resultado = f(*args, **kwargs)
+            cache_estadisticas.invalidar(*temas)
+            return resultado
+        return decorated_function
+    return decorator
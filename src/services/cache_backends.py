@@ -0,0 +1,490 @@
+"""Backends de almacenamiento para la caché de estadísticas"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# Resultado de leer() cuando la clave no está (None es un valor cacheable)
+NO_ENCONTRADO = object()
+
+
+class CacheBackend(ABC):
+    """
+    Interfaz de almacenamiento de la caché.
+    
+    Cada entrada tiene vencimiento y temas. La generación es un contador
+    que incrementa cada invalidación: escribir() recibe la generación leída
+    antes de calcular el valor y no guarda nada si cambió en el medio.
+    
+    Los backends compartidos (compartido=True) guardan entradas y
+    generación fuera del proceso, así las invalidaciones de un worker las
+    ven todos.
+    """
+    
+    compartido = False
+    
+    @abstractmethod
+    def leer(self, clave: str) -> Any:
+        """Devuelve el valor vigente de la clave o NO_ENCONTRADO"""
+    
+    @abstractmethod
+    def escribir(self, clave: str, valor: Any, ttl: float,
+                 temas: Iterable[str], generacion: int) -> bool:
+        """
+        Guarda un valor si la generación no cambió desde que se leyó.
+        
+        Returns:
+            True si se guardó
+        """
+    
+    @abstractmethod
+    def invalidar(self, temas: Iterable[str]) -> None:
+        """Descarta las entradas de los temas e incrementa la generación"""
+    
+    @abstractmethod
+    def generacion(self) -> int:
+        """Generación actual de invalidaciones"""
+    
+    @abstractmethod
+    def limpiar(self) -> None:
+        """Descarta todas las entradas e incrementa la generación"""
+    
+    def entradas(self) -> Optional[int]:
+        """Cantidad de entradas guardadas, si el backend la conoce"""
+        return None
+
+
+class MemoriaBackend(CacheBackend):
+    """
+    Backend en memoria del proceso: diccionario ordenado con desalojo LRU.
+    
+    Es el más rápido, pero cada worker tiene el suyo: las invalidaciones no
+    llegan a otros procesos. Alcanza con un único worker.
+    """
+    
+    def __init__(self, max_entradas: int):
+        """
+        Args:
+            max_entradas: Cantidad máxima de entradas (se desaloja la menos usada)
+        """
+        self.max_entradas = max_entradas
+        self._entradas: 'OrderedDict[str, Tuple[float, Any, frozenset]]' = OrderedDict()
+        self._generacion = 0
+        self._lock = threading.Lock()
+        self.desalojos = 0
+    
+    def leer(self, clave: str) -> Any:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return NO_ENCONTRADO
+            if entrada[0] <= time.monotonic():
+                del self._entradas[clave]
+                return NO_ENCONTRADO
+            self._entradas.move_to_end(clave)
+            return entrada[1]
+    
+    def escribir(self, clave: str, valor: Any, ttl: float,
+                 temas: Iterable[str], generacion: int) -> bool:
+        with self._lock:
+            if self._generacion != generacion:
+                return False
+            self._entradas[clave] = (time.monotonic() + ttl, valor, frozenset(temas))
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+                self.desalojos += 1
+            return True
+    
+    def invalidar(self, temas: Iterable[str]) -> None:
+        modificados = set(temas)
+        with self._lock:
+            self._generacion += 1
+            for clave in [c for c, (_, _, t) in self._entradas.items() if t & modificados]:
+                del self._entradas[clave]
+    
+    def generacion(self) -> int:
+        return self._generacion
+    
+    def limpiar(self) -> None:
+        with self._lock:
+            self._generacion += 1
+            self._entradas.clear()
+    
+    def entradas(self) -> Optional[int]:
+        return len(self._entradas)
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Backend en un archivo SQLite compartido por los workers de un host.
+    
+    El archivo se abre en modo WAL y con mmap, así las lecturas de cada
+    worker son accesos a memoria compartida sin bloquear al escritor. Las
+    escrituras e invalidaciones usan transacciones IMMEDIATE; al superar
+    max_entradas se desalojan las de acceso más antiguo.
+    """
+    
+    compartido = True
+    
+    # El acceso de una entrada se actualiza como mucho una vez por intervalo
+    _INTERVALO_ACCESO = 1.0
+    
+    def __init__(self, ruta: str, max_entradas: int, mmap_size: int = 67108864):
+        """
+        Args:
+            ruta: Archivo de la caché (se crea si no existe)
+            max_entradas: Cantidad máxima de entradas
+            mmap_size: Bytes del archivo mapeados en memoria
+        """
+        self.ruta = ruta
+        self.max_entradas = max_entradas
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+    
+    def _conexion(self) -> sqlite3.Connection:
+        """Conexión del hilo actual (se reabre después de un fork)"""
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is not None and self._local.pid == os.getpid():
+            return conexion
+        
+        conexion = sqlite3.connect(self.ruta, timeout=5, isolation_level=None,
+                                   check_same_thread=False)
+        conexion.execute("PRAGMA journal_mode=WAL")
+        conexion.execute("PRAGMA synchronous=NORMAL")
+        conexion.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        conexion.executescript("""
+            CREATE TABLE IF NOT EXISTS cache_entradas (
+                clave TEXT PRIMARY KEY,
+                valor TEXT NOT NULL,
+                vence REAL NOT NULL,
+                acceso REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_cache_entradas_acceso ON cache_entradas (acceso);
+            CREATE TABLE IF NOT EXISTS cache_temas (
+                tema TEXT NOT NULL,
+                clave TEXT NOT NULL,
+                PRIMARY KEY (tema, clave)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS cache_generacion (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                valor INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO cache_generacion (id, valor) VALUES (1, 0);
+        """)
+        self._local.conexion = conexion
+        self._local.pid = os.getpid()
+        return conexion
+    
+    def leer(self, clave: str) -> Any:
+        conexion = self._conexion()
+        fila = conexion.execute(
+            "SELECT valor, vence, acceso FROM cache_entradas WHERE clave = ?", (clave,)
+        ).fetchone()
+        ahora = time.time()
+        if fila is None or fila[1] <= ahora:
+            return NO_ENCONTRADO
+        if ahora - fila[2] >= self._INTERVALO_ACCESO:
+            conexion.execute("UPDATE cache_entradas SET acceso = ? WHERE clave = ?", (ahora, clave))
+        return json.loads(fila[0])
+    
+    def escribir(self, clave: str, valor: Any, ttl: float,
+                 temas: Iterable[str], generacion: int) -> bool:
+        conexion = self._conexion()
+        ahora = time.time()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            if self._leer_generacion(conexion) != generacion:
+                conexion.execute("ROLLBACK")
+                return False
+            conexion.execute(
+                "INSERT OR REPLACE INTO cache_entradas (clave, valor, vence, acceso) "
+                "VALUES (?, ?, ?, ?)",
+                (clave, json.dumps(valor), ahora + ttl, ahora)
+            )
+            conexion.execute("DELETE FROM cache_temas WHERE clave = ?", (clave,))
+            conexion.executemany(
+                "INSERT INTO cache_temas (tema, clave) VALUES (?, ?)",
+                [(tema, clave) for tema in set(temas)]
+            )
+            self._desalojar(conexion, ahora)
+            conexion.execute("COMMIT")
+            return True
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+    
+    def _desalojar(self, conexion: sqlite3.Connection, ahora: float) -> None:
+        """Borra las entradas vencidas y, si sobran, las de acceso más antiguo"""
+        conexion.execute("DELETE FROM cache_entradas WHERE vence <= ?", (ahora,))
+        sobrantes = conexion.execute("SELECT COUNT(*) FROM cache_entradas").fetchone()[0] - self.max_entradas
+        if sobrantes > 0:
+            conexion.execute(
+                "DELETE FROM cache_entradas WHERE clave IN "
+                "(SELECT clave FROM cache_entradas ORDER BY acceso LIMIT ?)",
+                (sobrantes,)
+            )
+        conexion.execute(
+            "DELETE FROM cache_temas WHERE clave NOT IN (SELECT clave FROM cache_entradas)"
+        )
+    
+    def invalidar(self, temas: Iterable[str]) -> None:
+        temas = sorted(set(temas))
+        marcadores = ', '.join('?' for _ in temas)
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            conexion.execute("UPDATE cache_generacion SET valor = valor + 1 WHERE id = 1")
+            if temas:
+                conexion.execute(
+                    f"DELETE FROM cache_entradas WHERE clave IN "
+                    f"(SELECT clave FROM cache_temas WHERE tema IN ({marcadores}))",
+                    temas
+                )
+                conexion.execute(
+                    f"DELETE FROM cache_temas WHERE clave IN "
+                    f"(SELECT clave FROM cache_temas WHERE tema IN ({marcadores}))",
+                    temas
+                )
+            conexion.execute("COMMIT")
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+    
+    @staticmethod
+    def _leer_generacion(conexion: sqlite3.Connection) -> int:
+        return conexion.execute("SELECT valor FROM cache_generacion WHERE id = 1").fetchone()[0]
+    
+    def generacion(self) -> int:
+        return self._leer_generacion(self._conexion())
+    
+    def limpiar(self) -> None:
+        conexion = self._conexion()
+        conexion.execute("BEGIN IMMEDIATE")
+        try:
+            conexion.execute("DELETE FROM cache_entradas")
+            conexion.execute("DELETE FROM cache_temas")
+            conexion.execute("UPDATE cache_generacion SET valor = valor + 1 WHERE id = 1")
+            conexion.execute("COMMIT")
+        except Exception:
+            conexion.execute("ROLLBACK")
+            raise
+    
+    def entradas(self) -> Optional[int]:
+        return self._conexion().execute("SELECT COUNT(*) FROM cache_entradas").fetchone()[0]
+
+
+class ErrorRESP(Exception):
+    """Error devuelto por el servidor (respuesta '-' del protocolo RESP)"""
+
+
+class ClienteRESP:
+    """
+    Cliente mínimo del protocolo de Redis (RESP2) sobre un socket.
+    
+    Sirve con Redis, Valkey, KeyDB o cualquier servidor que hable RESP,
+    incluido un sustituto local para pruebas. Una conexión por proceso,
+    protegida por un lock; se reconecta una vez si la conexión se cae.
+    """
+    
+    def __init__(self, url: str, timeout: float = 2.0):
+        """
+        Args:
+            url: redis://[:password@]host[:puerto][/db]
+            timeout: Segundos máximos de conexión y de respuesta
+        """
+        partes = urlparse(url)
+        self.host = partes.hostname or 'localhost'
+        self.puerto = partes.port or 6379
+        self.password = partes.password
+        self.db = int(partes.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._socket: Optional[socket.socket] = None
+        self._archivo = None
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    def _conectar(self) -> None:
+        self._socket = socket.create_connection((self.host, self.puerto), timeout=self.timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._archivo = self._socket.makefile('rb')
+        self._pid = os.getpid()
+        if self.password:
+            self._enviar(('AUTH', self.password))
+        if self.db:
+            self._enviar(('SELECT', self.db))
+    
+    def _cerrar(self) -> None:
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+        self._socket = self._archivo = None
+    
+    @staticmethod
+    def _codificar(argumentos: Tuple) -> bytes:
+        partes = [b'*%d\r\n' % len(argumentos)]
+        for argumento in argumentos:
+            if not isinstance(argumento, bytes):
+                argumento = str(argumento).encode('utf-8')
+            partes.append(b'$%d\r\n%s\r\n' % (len(argumento), argumento))
+        return b''.join(partes)
+    
+    def _leer_respuesta(self) -> Any:
+        linea = self._archivo.readline()
+        if not linea:
+            raise ConnectionError("El servidor cerró la conexión")
+        tipo, resto = linea[:1], linea[1:-2]
+        if tipo == b'+':
+            return resto.decode('utf-8')
+        if tipo == b'-':
+            raise ErrorRESP(resto.decode('utf-8'))
+        if tipo == b':':
+            return int(resto)
+        if tipo == b'$':
+            largo = int(resto)
+            if largo < 0:
+                return None
+            datos = self._archivo.read(largo + 2)
+            return datos[:-2]
+        if tipo == b'*':
+            cantidad = int(resto)
+            if cantidad < 0:
+                return None
+            return [self._leer_respuesta() for _ in range(cantidad)]
+        raise ConnectionError(f"Respuesta RESP inválida: {linea!r}")
+    
+    def _enviar(self, *comandos: Tuple) -> List[Any]:
+        self._socket.sendall(b''.join(self._codificar(c) for c in comandos))
+        return [self._leer_respuesta() for _ in comandos]
+    
+    def ejecutar(self, *comandos: Tuple) -> List[Any]:
+        """
+        Envía uno o más comandos en un solo viaje (pipeline).
+        
+        Args:
+            comandos: Tuplas con el comando y sus argumentos
+        
+        Returns:
+            Respuesta de cada comando, en orden
+        """
+        with self._lock:
+            for intento in (1, 2):
+                try:
+                    if self._socket is None or self._pid != os.getpid():
+                        self._conectar()
+                    return self._enviar(*comandos)
+                except (ConnectionError, socket.timeout, OSError):
+                    self._cerrar()
+                    if intento == 2:
+                        raise
+
+
+class RedisBackend(CacheBackend):
+    """
+    Backend en un servidor con protocolo Redis, compartido entre hosts.
+    
+    Claves: <prefijo>e:<clave> con el valor en JSON y vencimiento nativo
+    (PX), <prefijo>t:<tema> con el conjunto de claves de cada tema y
+    <prefijo>generacion. El desalojo por memoria queda a cargo del servidor
+    (maxmemory-policy allkeys-lru).
+    """
+    
+    compartido = True
+    
+    def __init__(self, url: str, prefijo: str = 'serviceadmin:cache:'):
+        """
+        Args:
+            url: redis://[:password@]host[:puerto][/db]
+            prefijo: Prefijo de todas las claves
+        """
+        self.cliente = ClienteRESP(url)
+        self.prefijo = prefijo
+        self._clave_generacion = f'{prefijo}generacion'
+    
+    def _clave(self, clave: str) -> str:
+        return f'{self.prefijo}e:{clave}'
+    
+    def _clave_tema(self, tema: str) -> str:
+        return f'{self.prefijo}t:{tema}'
+    
+    def leer(self, clave: str) -> Any:
+        valor, = self.cliente.ejecutar(('GET', self._clave(clave)))
+        return NO_ENCONTRADO if valor is None else json.loads(valor)
+    
+    def escribir(self, clave: str, valor: Any, ttl: float,
+                 temas: Iterable[str], generacion: int) -> bool:
+        if self.generacion() != generacion:
+            return False
+        ttl_ms = max(int(ttl * 1000), 1)
+        comandos = [('SET', self._clave(clave), json.dumps(valor), 'PX', ttl_ms)]
+        for tema in set(temas):
+            comandos.append(('SADD', self._clave_tema(tema), clave))
+            comandos.append(('PEXPIRE', self._clave_tema(tema), ttl_ms))
+        comandos.append(('GET', self._clave_generacion))
+        respuestas = self.cliente.ejecutar(*comandos)
+        # invalidar() incrementa la generación antes de borrar: si cambió
+        # mientras se escribía, la entrada puede ser anterior a la escritura
+        if int(respuestas[-1] or 0) != generacion:
+            self.cliente.ejecutar(('DEL', self._clave(clave)))
+            return False
+        return True
+    
+    def invalidar(self, temas: Iterable[str]) -> None:
+        temas = sorted(set(temas))
+        respuestas = self.cliente.ejecutar(
+            ('INCR', self._clave_generacion),
+            *[('SMEMBERS', self._clave_tema(t)) for t in temas]
+        )
+        claves = {c.decode('utf-8') for miembros in respuestas[1:] for c in miembros}
+        borrar = [self._clave(c) for c in sorted(claves)] + [self._clave_tema(t) for t in temas]
+        if borrar:
+            self.cliente.ejecutar(('DEL', *borrar))
+    
+    def generacion(self) -> int:
+        valor, = self.cliente.ejecutar(('GET', self._clave_generacion))
+        return int(valor or 0)
+    
+    def limpiar(self) -> None:
+        cursor, claves = '0', []
+        while True:
+            cursor, lote = self.cliente.ejecutar(('SCAN', cursor, 'MATCH', f'{self.prefijo}*'))[0]
+            claves.extend(c for c in lote if c != self._clave_generacion.encode('utf-8'))
+            cursor = cursor.decode('utf-8')
+            if cursor == '0':
+                break
+        self.cliente.ejecutar(('INCR', self._clave_generacion))
+        if claves:
+            self.cliente.ejecutar(('DEL', *claves))
+
+
+def crear_backend(config) -> CacheBackend:
+    """
+    Crea el backend configurado en CacheConfig.
+    
+    Args:
+        config: settings.cache
+    
+    Returns:
+        memory: MemoriaBackend; sqlite: SQLiteBackend sobre config.url
+        (ruta del archivo); redis: RedisBackend sobre config.url
+    
+    Raises:
+        ValueError: Si el backend no existe o le falta la URL
+    """
+    if config.backend == 'memory':
+        return MemoriaBackend(config.max_entries)
+    if config.backend in ('sqlite', 'redis') and not config.url:
+        raise ValueError(f"El backend de caché '{config.backend}' requiere CACHE_URL")
+    if config.backend == 'sqlite':
+        return SQLiteBackend(config.url, config.max_entries)
+    if config.backend == 'redis':
+        return RedisBackend(config.url, config.key_prefix)
+    raise ValueError(f"Backend de caché desconocido: {config.backend} (usar memory, sqlite o redis)")
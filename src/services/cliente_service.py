@@ -1,7 +1,13 @@
 """Servicio para la gestión de Clientes"""
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from src.models.cliente import Cliente
+from src.repositories.base_repository import Perfil
 from src.repositories.cliente_repository import ClienteRepository
+from src.repositories.reporte_repository import ReporteRepository
+from src.utils.validacion import campo_no_texto
+from src.services.cache import (
+    invalida_cache, TEMA_CLIENTES, TEMA_PRESUPUESTOS, TEMA_REPUESTOS, TEMA_SERVICES
+)
 
 
 class ClienteService:
@@ -9,9 +15,14 @@ class ClienteService:
     Servicio que maneja la lógica de negocio para Clientes.
     """
     
+    # Campos que deben llegar como texto en los lotes
+    CAMPOS_TEXTO = ('nombre', 'direccion', 'tel', 'email')
+    
     def __init__(self):
         self.cliente_repository = ClienteRepository()
+        self.reporte_repository = ReporteRepository()
     
+    @invalida_cache(TEMA_CLIENTES)
     def crear_cliente(self, data: Dict[str, Any]) -> Cliente:
         """
         Crea un nuevo cliente validando reglas de negocio.
@@ -46,6 +57,75 @@ class ClienteService:
         
         return self.cliente_repository.create(cliente)
     
+    def validar_lote(self, items: List[Dict[str, Any]]) -> Tuple[Dict[int, str], Dict[int, dict]]:
+        """
+        Valida un lote de clientes sin insertarlo.
+        
+        Los emails se verifican contra la base en una única consulta y
+        contra los demás elementos del lote.
+        
+        Args:
+            items: Lista de diccionarios con los datos de cada cliente
+            
+        Returns:
+            Tupla (errores por índice, filas listas para insertar por índice)
+        """
+        errores = {}
+        for i, data in enumerate(items):
+            if not isinstance(data, dict) or not data.get('nombre'):
+                errores[i] = "El nombre del cliente es requerido"
+                continue
+            campo = campo_no_texto(data, self.CAMPOS_TEXTO)
+            if campo:
+                errores[i] = f"El campo {campo} debe ser texto"
+        
+        emails = [d.get('email') for i, d in enumerate(items) if i not in errores and d.get('email')]
+        existentes = self.cliente_repository.find_emails_existentes(emails)
+        vistos = set()
+        for i, data in enumerate(items):
+            email = data.get('email') if i not in errores else None
+            if not email:
+                continue
+            if email in existentes:
+                errores[i] = f"Ya existe un cliente con el email {email}"
+            elif email in vistos:
+                errores[i] = f"El email {email} está repetido en el lote"
+            vistos.add(email)
+        
+        filas = {
+            i: {
+                'nombre': data['nombre'],
+                'direccion': data.get('direccion'),
+                'tel': data.get('tel'),
+                'email': data.get('email') or None,
+            }
+            for i, data in enumerate(items) if i not in errores
+        }
+        return errores, filas
+    
+    @invalida_cache(TEMA_CLIENTES)
+    def crear_clientes(self, items: List[Dict[str, Any]]) -> Tuple[Dict[int, str], List[int]]:
+        """
+        Crea varios clientes en una sola transacción.
+        
+        Se valida todo el lote antes de insertar (ver validar_lote); si
+        algún elemento es inválido no se crea ninguno.
+        
+        Args:
+            items: Lista de diccionarios con los datos de cada cliente
+            
+        Returns:
+            Tupla (errores por índice de elemento, códigos de los clientes creados)
+        """
+        errores, filas = self.validar_lote(items)
+        if errores:
+            return errores, []
+        
+        with self.cliente_repository.unit_of_work():
+            ids = self.cliente_repository.bulk_insert(list(filas.values()))
+        return {}, ids
+    
+    @invalida_cache(TEMA_CLIENTES)
     def actualizar_cliente(self, cod_cliente: int, data: Dict[str, Any]) -> Cliente:
         """
         Actualiza un cliente existente.
@@ -82,6 +162,7 @@ class ClienteService:
         
         return self.cliente_repository.save(cliente)
     
+    @invalida_cache(TEMA_CLIENTES, TEMA_SERVICES, TEMA_PRESUPUESTOS, TEMA_REPUESTOS)
     def eliminar_cliente(self, cod_cliente: int) -> bool:
         """
         Elimina un cliente.
@@ -106,16 +187,47 @@ class ClienteService:
                 f"{cliente.services_pendientes} servicios pendientes"
             )
         
-        return self.cliente_repository.delete(cod_cliente)
+        # Los services presupuestados se borran en cascada con el cliente
+        deltas = [
+            (s.fecha, -s.total_repuestos, -s.presupuesto.manoDeObra)
+            for s in cliente.services if s.presupuesto is not None
+        ]
+        with self.cliente_repository.unit_of_work():
+            self.reporte_repository.ajustar_resumen_fechas(deltas)
+            self.cliente_repository.delete(cod_cliente)
+        return True
     
-    def obtener_cliente(self, cod_cliente: int) -> Optional[Cliente]:
+    def obtener_cliente(self, cod_cliente: int,
+                        perfil: Perfil = None) -> Optional[Cliente]:
         """Obtiene un cliente por su código"""
-        return self.cliente_repository.get_by_id(cod_cliente)
+        return self.cliente_repository.get_by_id(cod_cliente, profile=perfil)
     
-    def obtener_todos(self) -> List[Cliente]:
+    def obtener_todos(self, perfil: Perfil = None) -> List[Cliente]:
         """Obtiene todos los clientes"""
-        return self.cliente_repository.get_all()
+        return self.cliente_repository.get_all(profile=perfil)
+    
+    def contar_clientes(self) -> int:
+        """Cuenta los clientes sin cargarlos"""
+        return self.cliente_repository.count()
     
-    def buscar_por_nombre(self, nombre: str) -> List[Cliente]:
-        """Busca clientes por nombre"""
-        return self.cliente_repository.find_by_nombre(nombre)
+    def obtener_pagina(self, limite: int, cursor: Optional[str] = None,
+                       nombre: Optional[str] = None,
+                       perfil: Perfil = None) -> Tuple[List[Cliente], Optional[str]]:
+        """
+        Obtiene una página de clientes ordenada por código, o por
+        relevancia si se indica un texto de búsqueda.
+        
+        Args:
+            limite: Cantidad máxima de clientes
+            cursor: Cursor de la página anterior (opcional)
+            nombre: Texto de búsqueda (nombre, tel, email o dirección)
+            perfil: Perfil de carga (opcional)
+            
+        Returns:
+            Tupla (clientes, cursor siguiente)
+        """
+        if nombre:
+            return self.cliente_repository.search_page(
+                nombre, limite, cursor, profile=perfil
+            )
+        return self.cliente_repository.paginate(limite, cursor, profile=perfil)
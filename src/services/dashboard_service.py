@@ -0,0 +1,48 @@
+"""Servicio del tablero principal"""
+from typing import Dict, Any
+from src.services.service_service import ServiceService
+from src.services.cliente_service import ClienteService
+from src.services.presupuesto_service import PresupuestoService
+from src.services.cache import (
+    cache_estadisticas, TEMA_CLIENTES, TEMA_PRESUPUESTOS, TEMA_SERVICES
+)
+
+
+class DashboardService:
+    """
+    Servicio que arma los totales del tablero.
+    
+    Cada total se guarda en cache_estadisticas y se recalcula solo cuando
+    un mutador invalida su tema o vence el TTL.
+    """
+    
+    def __init__(self):
+        self.service_service = ServiceService()
+        self.cliente_service = ClienteService()
+        self.presupuesto_service = PresupuestoService()
+    
+    def obtener_resumen(self) -> Dict[str, Any]:
+        """
+        Obtiene los totales del tablero.
+        
+        Returns:
+            Diccionario con estadisticas (conteos por estado),
+            total_clientes y total_ganancias
+        """
+        return {
+            'estadisticas': cache_estadisticas.obtener(
+                'tablero.estadisticas',
+                self.service_service.obtener_estadisticas,
+                temas=(TEMA_SERVICES,)
+            ),
+            'total_clientes': cache_estadisticas.obtener(
+                'tablero.total_clientes',
+                self.cliente_service.contar_clientes,
+                temas=(TEMA_CLIENTES,)
+            ),
+            'total_ganancias': cache_estadisticas.obtener(
+                'tablero.total_ganancias',
+                self.presupuesto_service.obtener_total_ganancias,
+                temas=(TEMA_PRESUPUESTOS,)
+            ),
+        }
@@ -0,0 +1,100 @@
+"""Servicio para la importación de clientes y services desde CSV"""
+import csv
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, List
+from src.services.cliente_service import ClienteService
+from src.services.service_service import ServiceService
+from src.services.cache import cache_estadisticas
+
+# Filas por lote de validación e inserción
+TAMANO_LOTE = 1000
+
+
+class ImportService:
+    """
+    Servicio que importa planillas CSV por lotes.
+    
+    El archivo se lee fila a fila: solo un lote está en memoria a la vez.
+    Cada lote se valida con las mismas reglas que la creación masiva, las
+    filas válidas se cargan con executemany (COPY en PostgreSQL) y el lote
+    se confirma con un único commit. Las filas inválidas se informan y se
+    omiten, sin detener la importación.
+    
+    Columnas esperadas (encabezado del CSV):
+        clientes: nombre, direccion, tel, email
+        services: codCliente, nomProducto, modelo, descrip, descripFalla
+    """
+    
+    def __init__(self):
+        self.cliente_service = ClienteService()
+        self.service_service = ServiceService()
+    
+    @staticmethod
+    def _limpiar(fila: Dict[str, Any]) -> Dict[str, Any]:
+        """Quita espacios y convierte las celdas vacías en None"""
+        return {
+            (clave or '').strip(): (valor.strip() or None) if isinstance(valor, str) else valor
+            for clave, valor in fila.items()
+        }
+    
+    def importar(self, tipo: str, lineas: Iterable[str], desde_fila: int = 0,
+                 tamano_lote: int = TAMANO_LOTE) -> Iterator[Dict[str, Any]]:
+        """
+        Importa un CSV de clientes o services, lote por lote.
+        
+        Es un generador: cada lote se confirma antes de informar su
+        progreso, por lo que filas_procesadas sirve como punto de
+        reanudación (desde_fila) si la importación se interrumpe.
+        
+        Args:
+            tipo: 'clientes' o 'services'
+            lineas: Líneas del CSV, incluido el encabezado (archivo o stream)
+            desde_fila: Filas de datos ya importadas que se deben saltear
+            tamano_lote: Filas por lote
+        
+        Yields:
+            Progreso de cada lote: filas_procesadas (acumulado), insertadas
+            y errores (número de fila de datos y mensaje)
+        
+        Raises:
+            ValueError: Si el tipo no existe o el archivo no es UTF-8 válido
+            csv.Error: Si el CSV está mal formado
+            
+        Si la lectura, la validación o la carga de un lote fallan, ese lote
+        se descarta (rollback) y la excepción se propaga; los lotes ya
+        informados quedan confirmados.
+        """
+        if tipo == 'clientes':
+            servicio, repositorio = self.cliente_service, self.cliente_service.cliente_repository
+        elif tipo == 'services':
+            servicio, repositorio = self.service_service, self.service_service.service_repository
+        else:
+            raise ValueError(f"Tipo de importación desconocido: {tipo} (usar clientes o services)")
+        
+        filas = islice(csv.DictReader(lineas), desde_fila, None)
+        procesadas = desde_fila
+        
+        while True:
+            try:
+                lote: List[Dict[str, Any]] = [self._limpiar(f) for f in islice(filas, tamano_lote)]
+                if not lote:
+                    break
+                
+                errores, validas = servicio.validar_lote(lote)
+                with repositorio.unit_of_work():
+                    insertadas = repositorio.bulk_load(list(validas.values()))
+            except Exception:
+                # El lote en curso no se confirmó: se descarta y la sesión queda usable
+                repositorio.session.rollback()
+                raise
+            cache_estadisticas.invalidar(tipo)
+            
+            yield {
+                'filas_procesadas': procesadas + len(lote),
+                'insertadas': insertadas,
+                'errores': [
+                    {'fila': procesadas + i + 1, 'message': mensaje}
+                    for i, mensaje in sorted(errores.items())
+                ]
+            }
+            procesadas += len(lote)
@@ -1,9 +1,11 @@
 """Servicio para la gestión de Presupuestos"""
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from src.models.presupuesto import Presupuesto
 from src.repositories.presupuesto_repository import PresupuestoRepository
+from src.repositories.base_repository import Perfil
 from src.repositories.service_repository import ServiceRepository
-from src.config.database import db
+from src.repositories.reporte_repository import ReporteRepository
+from src.services.cache import invalida_cache, TEMA_PRESUPUESTOS
 
 
 class PresupuestoService:
@@ -14,7 +16,24 @@ class PresupuestoService:
     def __init__(self):
         self.presupuesto_repository = PresupuestoRepository()
         self.service_repository = ServiceRepository()
+        self.reporte_repository = ReporteRepository()
     
+    def _ajustar_resumen(self, service, signo: int, mano_de_obra: int) -> None:
+        """
+        Suma (signo 1) o resta (signo -1) un service presupuestado del
+        resumen de su mes.
+        
+        El UPDATE de la versión del service hace que una escritura
+        concurrente de sus repuestos, que decide si ajusta el resumen según
+        tenga o no presupuesto, falle por versión en lugar de perder su delta.
+        """
+        self.service_repository.ajustar_total_repuestos(service, 0)
+        self.service_repository.session.flush()
+        self.reporte_repository.ajustar_resumen_fechas(
+            [(service.fecha, signo * service.total_repuestos, signo * mano_de_obra)]
+        )
+    
+    @invalida_cache(TEMA_PRESUPUESTOS)
     def crear_presupuesto(self, data: Dict[str, Any]) -> Presupuesto:
         """
         Crea un nuevo presupuesto para un servicio.
@@ -52,8 +71,12 @@ class PresupuestoService:
             manoDeObra=int(mano_de_obra)
         )
         
-        return self.presupuesto_repository.create(presupuesto)
+        with self.presupuesto_repository.unit_of_work():
+            self.presupuesto_repository.create(presupuesto)
+            self._ajustar_resumen(service, 1, presupuesto.manoDeObra)
+        return presupuesto
     
+    @invalida_cache(TEMA_PRESUPUESTOS)
     def actualizar_presupuesto(self, cod_presupuesto: int, 
                                 data: Dict[str, Any]) -> Presupuesto:
         """
@@ -77,14 +100,20 @@ class PresupuestoService:
         costo = data.get('costo')
         mano_de_obra = data.get('manoDeObra')
         
-        presupuesto.actualizar_costos(
-            costo=int(costo) if costo is not None else None,
-            manoDeObra=int(mano_de_obra) if mano_de_obra is not None else None
-        )
-        
-        db.session.commit()
+        mano_de_obra_anterior = presupuesto.manoDeObra
+        with self.presupuesto_repository.unit_of_work():
+            presupuesto.actualizar_costos(
+                costo=int(costo) if costo is not None else None,
+                manoDeObra=int(mano_de_obra) if mano_de_obra is not None else None
+            )
+            
+            # La versión del presupuesto evita aplicar dos veces la misma diferencia
+            self.reporte_repository.ajustar_resumen_fechas([(
+                presupuesto.service.fecha, 0, presupuesto.manoDeObra - mano_de_obra_anterior
+            )])
         return presupuesto
     
+    @invalida_cache(TEMA_PRESUPUESTOS)
     def aceptar_presupuesto(self, cod_presupuesto: int) -> Presupuesto:
         """
         Marca un presupuesto como aceptado.
@@ -99,10 +128,12 @@ class PresupuestoService:
         if not presupuesto:
             raise ValueError(f"No existe presupuesto con código {cod_presupuesto}")
         
-        presupuesto.aceptar()
-        db.session.commit()
+        # El resumen suma los presupuestos aceptados o no: no cambia
+        with self.presupuesto_repository.unit_of_work():
+            presupuesto.aceptar()
         return presupuesto
     
+    @invalida_cache(TEMA_PRESUPUESTOS)
     def rechazar_presupuesto(self, cod_presupuesto: int) -> Presupuesto:
         """
         Marca un presupuesto como rechazado.
@@ -117,10 +148,12 @@ class PresupuestoService:
         if not presupuesto:
             raise ValueError(f"No existe presupuesto con código {cod_presupuesto}")
         
-        presupuesto.rechazar()
-        db.session.commit()
+        # El resumen suma los presupuestos aceptados o no: no cambia
+        with self.presupuesto_repository.unit_of_work():
+            presupuesto.rechazar()
         return presupuesto
     
+    @invalida_cache(TEMA_PRESUPUESTOS)
     def eliminar_presupuesto(self, cod_presupuesto: int) -> bool:
         """
         Elimina un presupuesto.
@@ -135,23 +168,52 @@ class PresupuestoService:
         if not presupuesto:
             raise ValueError(f"No existe presupuesto con código {cod_presupuesto}")
         
-        return self.presupuesto_repository.delete(cod_presupuesto)
+        service = presupuesto.service
+        mano_de_obra = presupuesto.manoDeObra
+        with self.presupuesto_repository.unit_of_work():
+            self.presupuesto_repository.delete(cod_presupuesto)
+            if service:
+                self._ajustar_resumen(service, -1, mano_de_obra)
+        return True
     
-    def obtener_presupuesto(self, cod_presupuesto: int) -> Optional[Presupuesto]:
+    def obtener_presupuesto(self, cod_presupuesto: int,
+                            perfil: Perfil = None) -> Optional[Presupuesto]:
         """Obtiene un presupuesto por su código"""
-        return self.presupuesto_repository.get_by_id(cod_presupuesto)
+        return self.presupuesto_repository.get_by_id(cod_presupuesto, profile=perfil)
     
-    def obtener_por_service(self, cod_service: int) -> Optional[Presupuesto]:
+    def obtener_por_service(self, cod_service: int,
+                            perfil: Perfil = None) -> Optional[Presupuesto]:
         """Obtiene el presupuesto de un servicio"""
-        return self.presupuesto_repository.find_by_service(cod_service)
+        return self.presupuesto_repository.find_by_service(cod_service, profile=perfil)
     
-    def obtener_todos(self) -> List[Presupuesto]:
+    def obtener_todos(self, perfil: Perfil = None) -> List[Presupuesto]:
         """Obtiene todos los presupuestos"""
-        return self.presupuesto_repository.get_all()
+        return self.presupuesto_repository.get_all(profile=perfil)
+    
+    def obtener_pagina(self, limite: int, cursor: Optional[str] = None,
+                       solo_pendientes: bool = False,
+                       perfil: Perfil = None) -> Tuple[List[Presupuesto], Optional[str]]:
+        """
+        Obtiene una página de presupuestos ordenada por código.
+        
+        Args:
+            limite: Cantidad máxima de presupuestos
+            cursor: Cursor de la página anterior (opcional)
+            solo_pendientes: True para incluir solo los no aceptados
+            perfil: Perfil de carga (opcional)
+            
+        Returns:
+            Tupla (presupuestos, cursor siguiente)
+        """
+        if solo_pendientes:
+            return self.presupuesto_repository.paginate_pendientes_aceptacion(
+                limite, cursor, profile=perfil
+            )
+        return self.presupuesto_repository.paginate(limite, cursor, profile=perfil)
     
-    def obtener_pendientes(self) -> List[Presupuesto]:
+    def obtener_pendientes(self, perfil: Perfil = None) -> List[Presupuesto]:
         """Obtiene presupuestos pendientes de aceptación"""
-        return self.presupuesto_repository.find_pendientes_aceptacion()
+        return self.presupuesto_repository.find_pendientes_aceptacion(profile=perfil)
     
     def obtener_total_ganancias(self) -> int:
         """Obtiene el total de ganancias de presupuestos aceptados"""
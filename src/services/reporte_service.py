@@ -0,0 +1,67 @@
+"""Servicio para reportes de ganancias"""
+from datetime import date
+from typing import Dict, Any, Iterable, Tuple
+from src.repositories.reporte_repository import ReporteRepository
+
+
+class ReporteService:
+    """
+    Servicio que maneja la lógica de negocio de los reportes.
+    """
+    
+    def __init__(self):
+        self.reporte_repository = ReporteRepository()
+    
+    def obtener_ganancias_mes(self, mes: int, anio: int) -> Dict[str, Any]:
+        """
+        Obtiene el reporte de ganancias de un mes.
+        
+        Args:
+            mes: Mes (1-12)
+            anio: Año
+        
+        Returns:
+            Diccionario con los services del mes y los totales
+            (total_repuestos, total_mano_obra, total_general)
+        
+        Raises:
+            ValueError: Si el mes o el año no son válidos
+        """
+        if not 1 <= mes <= 12:
+            raise ValueError(f"Mes inválido: {mes}")
+        if not date.min.year <= anio <= date.max.year - 1:
+            raise ValueError(f"Año inválido: {anio}")
+        
+        # Los meses cerrados se leen del resumen precalculado
+        hoy = date.today()
+        resumen = None
+        if (anio, mes) < (hoy.year, hoy.month):
+            resumen = self.reporte_repository.get_resumen_mes(anio, mes)
+        
+        if resumen is not None:
+            reporte = resumen.to_dict()
+        else:
+            reporte = self.reporte_repository.get_totales_mes(anio, mes)
+        reporte['services'] = self.reporte_repository.find_services_mes(anio, mes)
+        return reporte
+    
+    def ajustar_resumen(self, deltas: Iterable[Tuple[date, int, int]]) -> None:
+        """
+        Suma a los resúmenes mensuales la diferencia que produce un cambio.
+        
+        No hace commit; debe llamarse antes de confirmar la transacción.
+        
+        Args:
+            deltas: Tuplas (fecha del service, delta de repuestos,
+                delta de mano de obra)
+        """
+        self.reporte_repository.ajustar_resumen_fechas(deltas)
+    
+    def reconstruir_resumenes(self) -> int:
+        """
+        Reconstruye todos los resúmenes mensuales.
+        
+        Returns:
+            Cantidad de meses generados
+        """
+        return self.reporte_repository.reconstruir_resumenes()
@@ -1,9 +1,15 @@
 """Servicio para la gestión de Services (Reparaciones)"""
-from typing import Dict, Any, List, Optional
+from datetime import date
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from src.models.service import Service
+from src.models.repuesto import Repuesto
+from src.repositories.base_repository import Perfil
 from src.repositories.service_repository import ServiceRepository
+from src.repositories.repuesto_repository import RepuestoRepository
 from src.repositories.cliente_repository import ClienteRepository
-from src.config.database import db
+from src.repositories.reporte_repository import ReporteRepository
+from src.utils.validacion import campo_no_texto, entero
+from src.services.cache import invalida_cache, TEMA_PRESUPUESTOS, TEMA_REPUESTOS, TEMA_SERVICES
 
 
 class ServiceService:
@@ -11,10 +17,16 @@ class ServiceService:
     Servicio que maneja la lógica de negocio para Services de reparación.
     """
     
+    # Campos que deben llegar como texto en los lotes
+    CAMPOS_TEXTO = ('nomProducto', 'modelo', 'descrip', 'descripFalla')
+    
     def __init__(self):
         self.service_repository = ServiceRepository()
         self.cliente_repository = ClienteRepository()
+        self.repuesto_repository = RepuestoRepository()
+        self.reporte_repository = ReporteRepository()
     
+    @invalida_cache(TEMA_SERVICES)
     def crear_service(self, data: Dict[str, Any]) -> Service:
         """
         Crea un nuevo servicio de reparación.
@@ -50,6 +62,77 @@ class ServiceService:
         
         return self.service_repository.create(service)
     
+    def validar_lote(self, items: List[Dict[str, Any]]) -> Tuple[Dict[int, str], Dict[int, dict]]:
+        """
+        Valida un lote de servicios sin insertarlo.
+        
+        La existencia de los clientes se verifica en una única consulta.
+        
+        Args:
+            items: Lista de diccionarios con los datos de cada servicio
+            
+        Returns:
+            Tupla (errores por índice, filas listas para insertar por índice)
+        """
+        errores = {}
+        cod_clientes = {}
+        for i, data in enumerate(items):
+            if not isinstance(data, dict) or not data.get('codCliente'):
+                errores[i] = "Debe especificar un cliente"
+                continue
+            if not data.get('nomProducto'):
+                errores[i] = "Debe especificar el nombre del producto"
+                continue
+            campo = campo_no_texto(data, self.CAMPOS_TEXTO)
+            if campo:
+                errores[i] = f"El campo {campo} debe ser texto"
+                continue
+            cod_cliente = entero(data['codCliente'])
+            if cod_cliente is None:
+                errores[i] = f"Código de cliente inválido: {data['codCliente']!r}"
+            else:
+                cod_clientes[i] = cod_cliente
+        
+        existentes = self.cliente_repository.find_ids_existentes(list(cod_clientes.values()))
+        for i, cod in cod_clientes.items():
+            if cod not in existentes:
+                errores[i] = f"No existe cliente con código {cod}"
+        
+        filas = {
+            i: {
+                'codCliente': cod_clientes[i],
+                'nomProducto': data['nomProducto'],
+                'modelo': data.get('modelo'),
+                'descrip': data.get('descrip'),
+                'descripFalla': data.get('descripFalla'),
+            }
+            for i, data in enumerate(items) if i not in errores
+        }
+        return errores, filas
+    
+    @invalida_cache(TEMA_SERVICES)
+    def crear_services(self, items: List[Dict[str, Any]]) -> Tuple[Dict[int, str], List[int]]:
+        """
+        Crea varios servicios en una sola transacción.
+        
+        Se valida todo el lote antes de insertar (ver validar_lote); si
+        algún elemento es inválido no se crea ninguno.
+        
+        Args:
+            items: Lista de diccionarios con los datos de cada servicio
+            
+        Returns:
+            Tupla (errores por índice de elemento, códigos de los servicios creados)
+        """
+        errores, filas = self.validar_lote(items)
+        if errores:
+            return errores, []
+        
+        with self.service_repository.unit_of_work():
+            ids = self.service_repository.bulk_insert(list(filas.values()))
+        return {}, ids
+    
+    @invalida_cache(TEMA_SERVICES)
     def actualizar_service(self, cod_service: int, data: Dict[str, Any]) -> Service:
         """
         Actualiza un servicio existente.
@@ -69,23 +152,23 @@ class ServiceService:
         if service.entregado:
             raise ValueError("No se puede editar un servicio ya entregado")
         
-        # Actualizar campos básicos
-        if 'nomProducto' in data:
-            service.nomProducto = data['nomProducto']
-        if 'modelo' in data:
-            service.modelo = data['modelo']
-        if 'descrip' in data:
-            service.descrip = data['descrip']
-        if 'descripFalla' in data:
-            service.descripFalla = data['descripFalla']
-        if 'repuesto' in data:
-            service.repuesto = data['repuesto']
-        if 'costoRepuesto' in data:
-            service.costoRepuesto = int(data['costoRepuesto'])
-        
-        db.session.commit()
+        with self.service_repository.unit_of_work():
+            # Actualizar campos básicos
+            if 'nomProducto' in data:
+                service.nomProducto = data['nomProducto']
+            if 'modelo' in data:
+                service.modelo = data['modelo']
+            if 'descrip' in data:
+                service.descrip = data['descrip']
+            if 'descripFalla' in data:
+                service.descripFalla = data['descripFalla']
+            if 'repuesto' in data:
+                service.repuesto = data['repuesto']
+            if 'costoRepuesto' in data:
+                service.costoRepuesto = int(data['costoRepuesto'])
         return service
     
+    @invalida_cache(TEMA_SERVICES)
     def marcar_revisado(self, cod_service: int, 
                         repuesto: str = None, 
                         costo_repuesto: int = 0) -> Service:
@@ -104,10 +187,11 @@ class ServiceService:
         if not service:
             raise ValueError(f"No existe servicio con código {cod_service}")
         
-        service.marcar_revisado(repuesto, costo_repuesto)
-        db.session.commit()
+        with self.service_repository.unit_of_work():
+            service.marcar_revisado(repuesto, costo_repuesto)
         return service
     
+    @invalida_cache(TEMA_SERVICES)
     def marcar_reparado(self, cod_service: int) -> Service:
         """
         Marca un servicio como reparado.
@@ -122,10 +206,11 @@ class ServiceService:
         if not service:
             raise ValueError(f"No existe servicio con código {cod_service}")
         
-        service.marcar_reparado()
-        db.session.commit()
+        with self.service_repository.unit_of_work():
+            service.marcar_reparado()
         return service
     
+    @invalida_cache(TEMA_SERVICES)
     def marcar_entregado(self, cod_service: int) -> Service:
         """
         Marca un servicio como entregado.
@@ -140,10 +225,55 @@ class ServiceService:
         if not service:
             raise ValueError(f"No existe servicio con código {cod_service}")
         
-        service.marcar_entregado()
-        db.session.commit()
+        with self.service_repository.unit_of_work():
+            service.marcar_entregado()
         return service
     
+    @invalida_cache(TEMA_SERVICES)
+    def marcar_lote(self, accion: str, ids: List[Any]) -> Tuple[List[int], Dict[int, str]]:
+        """
+        Aplica una transición de estado a varios servicios en una sola transacción.
+        
+        Se respetan las mismas reglas que marcar_revisado/marcar_reparado/
+        marcar_entregado; los servicios que no las cumplen no se modifican.
+        
+        Args:
+            accion: 'revisar', 'reparar' o 'entregar'
+            ids: Códigos de los servicios
+            
+        Returns:
+            Tupla (códigos actualizados, errores por código de servicio)
+            
+        Raises:
+            ValueError: Si algún código no es un entero (ni texto numérico);
+                no se modifica ningún servicio
+        """
+        codigos = [entero(cod) for cod in ids]
+        invalidos = [i for i, cod in enumerate(codigos) if cod is None]
+        if invalidos:
+            raise ValueError(
+                "Los códigos de servicio deben ser números enteros; inválidos en "
+                f"las posiciones: {', '.join(str(i) for i in invalidos)}"
+            )
+        
+        errores = {}
+        flags = self.service_repository.find_flags(codigos)
+        with self.service_repository.unit_of_work():
+            actualizados = set(self.service_repository.marcar_lote(list(flags), accion))
+        
+        for cod in codigos:
+            if cod in actualizados:
+                continue
+            if cod not in flags:
+                errores[cod] = f"No existe servicio con código {cod}"
+            elif accion == 'reparar':
+                errores[cod] = Service.ERROR_SIN_REVISAR
+            else:
+                errores[cod] = Service.ERROR_SIN_REPARAR
+        
+        return sorted(actualizados), errores
+    
+    @invalida_cache(TEMA_SERVICES, TEMA_PRESUPUESTOS, TEMA_REPUESTOS)
     def eliminar_service(self, cod_service: int) -> bool:
         """
         Elimina un servicio.
@@ -158,27 +288,241 @@ class ServiceService:
         if not service:
             raise ValueError(f"No existe servicio con código {cod_service}")
         
-        return self.service_repository.delete(cod_service)
+        presupuesto = service.presupuesto
+        with self.service_repository.unit_of_work():
+            if presupuesto is not None:
+                self.reporte_repository.ajustar_resumen_fechas(
+                    [(service.fecha, -service.total_repuestos, -presupuesto.manoDeObra)]
+                )
+            self.service_repository.delete(cod_service)
+        return True
+    
+    def _repuestos_modificados(self, service: Service, delta: int) -> None:
+        """
+        Mantiene los datos derivados de los repuestos de un servicio:
+        el total cacheado y, si está presupuestado, el resumen mensual.
+        """
+        self.service_repository.ajustar_total_repuestos(service, delta)
+        if service.presupuesto is not None:
+            self.reporte_repository.ajustar_resumen_fechas([(service.fecha, delta, 0)])
+    
+    @invalida_cache(TEMA_REPUESTOS, TEMA_SERVICES)
+    def agregar_repuesto(self, cod_service: int, nombre: str, costo: int = 0) -> Repuesto:
+        """
+        Agrega un repuesto a un servicio.
+        
+        Args:
+            cod_service: Código del servicio
+            nombre: Nombre del repuesto
+            costo: Costo del repuesto
+            
+        Returns:
+            El repuesto creado
+        """
+        service = self.service_repository.get_by_id(cod_service)
+        if not service:
+            raise ValueError(f"No existe servicio con código {cod_service}")
+        if not nombre:
+            raise ValueError("El nombre del repuesto es requerido")
+        
+        repuesto = Repuesto(codService=cod_service, nombre=nombre, costo=int(costo))
+        with self.service_repository.unit_of_work():
+            self.repuesto_repository.create(repuesto)
+            self._repuestos_modificados(service, repuesto.costo)
+        return repuesto
+    
+    @invalida_cache(TEMA_REPUESTOS, TEMA_SERVICES)
+    def agregar_repuestos(self, cod_service: int,
+                          items: List[Dict[str, Any]]) -> Tuple[Dict[int, str], List[int]]:
+        """
+        Agrega varios repuestos a un servicio en una sola transacción.
+        
+        El total cacheado y el resumen mensual se actualizan una sola vez
+        para todo el lote; si algún elemento es inválido no se agrega ninguno.
+        
+        Args:
+            cod_service: Código del servicio
+            items: Lista de diccionarios con nombre y costo de cada repuesto
+            
+        Returns:
+            Tupla (errores por índice de elemento, IDs de los repuestos creados)
+        """
+        service = self.service_repository.get_by_id(cod_service)
+        if not service:
+            raise ValueError(f"No existe servicio con código {cod_service}")
+        
+        errores = {}
+        filas = []
+        for i, data in enumerate(items):
+            if not isinstance(data, dict) or not data.get('nombre'):
+                errores[i] = "El nombre del repuesto es requerido"
+                continue
+            if not isinstance(data['nombre'], str):
+                errores[i] = "El campo nombre debe ser texto"
+                continue
+            costo = entero(data.get('costo') or 0)
+            if costo is None:
+                errores[i] = "El costo del repuesto debe ser un número entero"
+                continue
+            filas.append({'codService': cod_service, 'nombre': data['nombre'], 'costo': costo})
+        
+        if errores:
+            return errores, []
+        
+        with self.service_repository.unit_of_work():
+            ids = self.repuesto_repository.bulk_insert(filas)
+            self._repuestos_modificados(service, sum(f['costo'] for f in filas))
+        return {}, ids
+    
+    @invalida_cache(TEMA_REPUESTOS, TEMA_SERVICES)
+    def actualizar_repuesto(self, repuesto: Repuesto, data: Dict[str, Any]) -> Repuesto:
+        """
+        Actualiza un repuesto existente.
+        
+        Args:
+            repuesto: Repuesto a actualizar
+            data: Diccionario con nombre y/o costo
+            
+        Returns:
+            El repuesto actualizado
+        """
+        with self.service_repository.unit_of_work():
+            if data.get('nombre'):
+                repuesto.nombre = data['nombre']
+            
+            delta = 0
+            if 'costo' in data:
+                costo = int(data['costo'])
+                delta = costo - repuesto.costo
+                repuesto.costo = costo
+            
+            self._repuestos_modificados(repuesto.service, delta)
+        return repuesto
+    
+    @invalida_cache(TEMA_REPUESTOS, TEMA_SERVICES)
+    def eliminar_repuesto(self, repuesto: Repuesto) -> bool:
+        """
+        Elimina un repuesto de su servicio.
+        
+        Args:
+            repuesto: Repuesto a eliminar
+            
+        Returns:
+            True si se eliminó correctamente
+        """
+        service = repuesto.service
+        with self.service_repository.unit_of_work():
+            self.repuesto_repository.delete(repuesto.id)
+            self._repuestos_modificados(service, -repuesto.costo)
+        return True
+    
+    def obtener_repuesto(self, cod_service: int, repuesto_id: int) -> Optional[Repuesto]:
+        """Obtiene un repuesto verificando que pertenezca al servicio"""
+        return self.repuesto_repository.find_de_service(cod_service, repuesto_id)
+    
+    def obtener_repuestos(self, cod_service: int) -> List[Repuesto]:
+        """Obtiene los repuestos de un servicio"""
+        return self.repuesto_repository.find_by_service(cod_service)
+    
+    def verificar_total_repuestos(self) -> List[tuple]:
+        """Obtiene los servicios cuyo total de repuestos cacheado es inconsistente"""
+        return self.service_repository.find_total_repuestos_inconsistentes()
     
-    def obtener_service(self, cod_service: int) -> Optional[Service]:
+    @invalida_cache(TEMA_SERVICES)
+    def reconstruir_total_repuestos(self) -> int:
+        """Recalcula el total de repuestos cacheado de los servicios inconsistentes"""
+        corregidos = self.service_repository.rebuild_total_repuestos()
+        if corregidos:
+            # El resumen mensual se ajusta por deltas: se rehace con los totales corregidos
+            self.reporte_repository.reconstruir_resumenes()
+        return corregidos
+    
+    def obtener_service(self, cod_service: int,
+                        perfil: Perfil = None) -> Optional[Service]:
         """Obtiene un servicio por su código"""
-        return self.service_repository.get_by_id(cod_service)
+        return self.service_repository.get_by_id(cod_service, profile=perfil)
     
-    def obtener_todos(self) -> List[Service]:
+    def obtener_todos(self, perfil: Perfil = None) -> List[Service]:
         """Obtiene todos los servicios"""
-        return self.service_repository.get_all()
+        return self.service_repository.get_all(profile=perfil)
+    
+    def obtener_pagina(self, limite: int, cursor: Optional[str] = None,
+                       cod_cliente: Optional[int] = None,
+                       estado: Optional[str] = None,
+                       perfil: Perfil = None) -> Tuple[List[Service], Optional[str]]:
+        """
+        Obtiene una página de servicios ordenada por fecha.
+        
+        Args:
+            limite: Cantidad máxima de servicios
+            cursor: Cursor de la página anterior (opcional)
+            cod_cliente: Filtrar por cliente (opcional)
+            estado: Filtrar por estado (opcional)
+            perfil: Perfil de carga de relaciones (opcional)
+            
+        Returns:
+            Tupla (servicios, cursor siguiente)
+        """
+        return self.service_repository.paginate_filtered(
+            limite, cursor, cod_cliente=cod_cliente, estado=estado, profile=perfil
+        )
     
-    def obtener_por_cliente(self, cod_cliente: int) -> List[Service]:
+    def buscar(self, texto: str, limite: int, cursor: Optional[str] = None,
+               perfil: Perfil = None) -> Tuple[List[Service], Optional[str]]:
+        """
+        Busca servicios por producto, modelo, descripción o falla.
+        
+        Args:
+            texto: Texto a buscar (ej. "Epson L3150 atasco")
+            limite: Cantidad máxima de servicios
+            cursor: Cursor de la página anterior (opcional)
+            perfil: Perfil de carga de relaciones (opcional)
+            
+        Returns:
+            Tupla (servicios ordenados por relevancia, cursor siguiente)
+        """
+        return self.service_repository.search_page(texto, limite, cursor, profile=perfil)
+    
+    def exportar(self, desde: Optional[date] = None,
+                 hasta: Optional[date] = None) -> Iterator[list]:
+        """
+        Recorre el historial de servicios por lotes para exportarlo.
+        
+        Args:
+            desde: Fecha de ingreso mínima, inclusive (opcional)
+            hasta: Fecha de ingreso máxima, inclusive (opcional)
+            
+        Returns:
+            Iterador de lotes de filas
+            
+        Raises:
+            ValueError: Si desde es posterior a hasta
+        """
+        if desde and hasta and desde > hasta:
+            raise ValueError("La fecha desde no puede ser posterior a hasta")
+        return self.service_repository.iter_export(desde, hasta)
+    
+    def columnas_exportacion(self) -> List[str]:
+        """Obtiene los nombres de las columnas de exportar()"""
+        return self.service_repository.export_columns()
+    
+    def obtener_por_cliente(self, cod_cliente: int,
+                            perfil: Perfil = None) -> List[Service]:
         """Obtiene servicios de un cliente"""
-        return self.service_repository.find_by_cliente(cod_cliente)
+        return self.service_repository.find_by_cliente(cod_cliente, profile=perfil)
     
-    def obtener_pendientes(self) -> List[Service]:
+    def obtener_pendientes(self, perfil: Perfil = None) -> List[Service]:
         """Obtiene servicios pendientes de revisión"""
-        return self.service_repository.find_pendientes()
+        return self.service_repository.find_pendientes(profile=perfil)
+    
+    def obtener_por_estado(self, estado: str,
+                           perfil: Perfil = None) -> List[Service]:
+        """Obtiene servicios en un estado (pendiente, revisado, reparado, entregado)"""
+        return self.service_repository.find_by_estado(estado, profile=perfil)
     
-    def obtener_listos_para_entregar(self) -> List[Service]:
+    def obtener_listos_para_entregar(self, perfil: Perfil = None) -> List[Service]:
         """Obtiene servicios reparados pendientes de entrega"""
-        return self.service_repository.find_reparados_sin_entregar()
+        return self.service_repository.find_reparados_sin_entregar(profile=perfil)
     
     def obtener_estadisticas(self) -> dict:
         """Obtiene estadísticas de servicios"""
@@ -0,0 +1,116 @@
+"""Servicio de ETags para peticiones GET condicionales"""
+from typing import Optional
+from src.repositories.version_repository import VersionRepository
+
+# Tablas de las que depende cada listado (ver to_dict de cada modelo y
+# sus inclusiones: ?include=service en presupuestos)
+DEPENDENCIAS_LISTADOS = {
+    'services': ('services', 'clientes', 'presupuestos', 'repuestos'),
+    'clientes': ('clientes', 'services'),
+    'presupuestos': ('presupuestos', 'services'),
+}
+
+
+class VersionService:
+    """
+    Servicio que arma los ETags de listados y detalles.
+    
+    Los ETags salen solo de contadores de versión, sin cargar entidades ni
+    serializar, así un If-None-Match vigente se responde con 304 leyendo
+    solo esos contadores.
+    
+    Listados: ETag débil con la versión de cada tabla de la que dependen.
+    Detalles: ETag con la versión de la fila y de las filas que el
+    detalle incluye.
+    """
+    
+    def __init__(self):
+        self.version_repository = VersionRepository()
+    
+    def etag_listado(self, recurso: str) -> str:
+        """
+        Arma el ETag de un listado.
+        
+        Args:
+            recurso: 'services', 'clientes' o 'presupuestos'
+        
+        Returns:
+            ETag (sin comillas)
+        """
+        tablas = DEPENDENCIAS_LISTADOS[recurso]
+        versiones = self.version_repository.get_versiones(tablas)
+        return f"{recurso}-" + '.'.join(str(versiones.get(t, 0)) for t in tablas)
+    
+    def etag_service(self, cod_service: int) -> Optional[str]:
+        """
+        Arma el ETag del detalle de un servicio.
+        
+        Incluye las versiones del cliente (cliente_nombre) y del presupuesto
+        (tiene_presupuesto); los cambios de repuestos incrementan la versión
+        del servicio.
+        
+        Args:
+            cod_service: Código del servicio
+        
+        Returns:
+            ETag, o None si el servicio no existe
+        """
+        versiones = self.version_repository.get_version_service(cod_service)
+        if versiones is None:
+            return None
+        service, cliente, presupuesto = versiones
+        return f"service-{cod_service}-{service}.{cliente}.{presupuesto or 0}"
+    
+    def etag_cliente(self, cod_cliente: int) -> Optional[str]:
+        """
+        Arma el ETag del detalle de un cliente.
+        
+        El detalle incluye conteos de services, por eso se combina con la
+        versión de la tabla services.
+        
+        Args:
+            cod_cliente: Código del cliente
+        
+        Returns:
+            ETag, o None si el cliente no existe
+        """
+        version = self.version_repository.get_version_cliente(cod_cliente)
+        if version is None:
+            return None
+        services = self.version_repository.get_versiones(('services',)).get('services', 0)
+        return f"cliente-{cod_cliente}-{version}.{services}"
+    
+    def etag_presupuesto(self, cod_presupuesto: int) -> Optional[str]:
+        """
+        Arma el ETag del detalle de un presupuesto.
+        
+        Incluye la versión del servicio, que se puede expandir con
+        ?include=service.
+        
+        Args:
+            cod_presupuesto: Código del presupuesto
+        
+        Returns:
+            ETag, o None si el presupuesto no existe
+        """
+        versiones = self.version_repository.get_version_presupuesto(cod_presupuesto)
+        if versiones is None:
+            return None
+        presupuesto, service = versiones
+        return f"presupuesto-{cod_presupuesto}-{presupuesto}.{service}"
+    
+    def etag_presupuesto_de_service(self, cod_service: int) -> Optional[str]:
+        """
+        Arma el ETag del presupuesto de un servicio.
+        
+        Args:
+            cod_service: Código del servicio
+        
+        Returns:
+            ETag, o None si el servicio no tiene presupuesto
+        """
+        fila = self.version_repository.get_version_presupuesto_de_service(cod_service)
+        if fila is None:
+            return None
+        cod_presupuesto, presupuesto, service = fila
+        return f"presupuesto-{cod_presupuesto}-{presupuesto}.{service}"
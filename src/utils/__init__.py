@@ -1,2 +1,3 @@
 """Utilidades del sistema ServiceAdmin"""
 from src.utils.numero_a_texto import numero_a_texto
+from src.utils.validacion import campo_no_texto, entero
@@ -0,0 +1,45 @@
+"""Validación de tipos de los datos recibidos en JSON o CSV"""
+from typing import Any, Dict, Iterable, Optional
+
+
+def entero(valor: Any) -> Optional[int]:
+    """
+    Convierte un código o importe recibido (entero o texto numérico).
+    
+    Los decimales y booleanos no se aceptan: int(3.7) o int(True) darían
+    en silencio otro valor.
+    
+    Args:
+        valor: Valor recibido
+    
+    Returns:
+        El entero, o None si el valor no es un entero válido
+    """
+    if isinstance(valor, bool):
+        return None
+    if isinstance(valor, int):
+        return valor
+    if isinstance(valor, str):
+        try:
+            return int(valor)
+        except ValueError:
+            return None
+    return None
+
+
+def campo_no_texto(data: Dict[str, Any], campos: Iterable[str]) -> Optional[str]:
+    """
+    Busca el primer campo presente cuyo valor no es texto.
+    
+    Args:
+        data: Datos de un elemento
+        campos: Campos de texto a verificar (los ausentes o nulos se omiten)
+    
+    Returns:
+        Nombre del primer campo inválido, o None si todos son texto
+    """
+    for campo in campos:
+        valor = data.get(campo)
+        if valor is not None and not isinstance(valor, str):
+            return campo
+    return None
@@ -0,0 +1,48 @@
+"""Fixtures de los tests: la aplicación sobre una base SQLite temporal"""
+import os
+import tempfile
+import pytest
+from sqlalchemy import event
+
+# La configuración se lee al importar src: la base temporal se elige antes
+_DIRECTORIO = tempfile.mkdtemp(prefix='serviceadmin-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_DIRECTORIO, 'tests.db')}"
+os.environ.pop('DATABASE_READ_URL', None)
+os.environ['CACHE_BACKEND'] = 'memory'
+
+from src.main import create_app  # noqa: E402
+from src.config.database import db  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Aplicación con las tablas, índices y tablas de búsqueda creados"""
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    """Cliente HTTP de prueba"""
+    return app.test_client()
+
+
+@pytest.fixture
+def sentencias(app):
+    """
+    Registra las sentencias SQL que se ejecutan durante el test.
+    
+    Yields:
+        Lista de tuplas (sql, parámetros), en orden de ejecución
+    """
+    registro = []
+    
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        registro.append((statement, parameters))
+    
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', registrar)
+    yield registro
+    event.remove(engine, 'before_cursor_execute', registrar)
@@ -0,0 +1,87 @@
+"""Validación de los endpoints masivos: los datos inválidos dan 400 o errores por ítem"""
+import pytest
+
+
+@pytest.fixture
+def service(client):
+    """Un service pendiente (con su cliente)"""
+    cliente = client.post('/api/clientes', json={'nombre': 'Cliente lote'})
+    respuesta = client.post('/api/services', json={
+        'codCliente': cliente.json['data']['codCliente'], 'nomProducto': 'Notebook'
+    })
+    return respuesta.json['data']['codService']
+
+
+@pytest.mark.parametrize('codigo', [[1], {'id': 1}, 3.7, True, None, 'abc', '²', '--5'],
+                         ids=['lista', 'objeto', 'decimal', 'booleano', 'nulo', 'texto',
+                              'superindice', 'doble_signo'])
+def test_marcar_lote_rechaza_codigos_no_enteros(client, service, codigo):
+    respuesta = client.post('/api/services/bulk/revisar', json=[service, codigo])
+    
+    assert respuesta.status_code == 400
+    assert 'posiciones: 1' in respuesta.json['message']
+    detalle = client.get(f'/api/services/{service}')
+    assert detalle.json['data']['revisado'] is False
+
+
+def test_marcar_lote_acepta_enteros_y_texto_numerico(client, service):
+    respuesta = client.post('/api/services/bulk/revisar', json=[service, str(service), 999999])
+    
+    assert respuesta.status_code == 200
+    assert respuesta.json['data']['actualizados'] == [service]
+    assert respuesta.json['data']['fallidos'] == [
+        {'codService': 999999, 'message': 'No existe servicio con código 999999'}
+    ]
+
+
+@pytest.mark.parametrize('item, mensaje', [
+    ({'nombre': 'B', 'email': ['x@test.com']}, 'El campo email debe ser texto'),
+    ({'nombre': ['B']}, 'El campo nombre debe ser texto'),
+    ({'nombre': 'B', 'tel': 1144445555}, 'El campo tel debe ser texto'),
+    ({'nombre': 'B', 'direccion': {'calle': 'X'}}, 'El campo direccion debe ser texto'),
+], ids=['email', 'nombre', 'tel', 'direccion'])
+def test_clientes_bulk_informa_campos_no_texto(client, item, mensaje):
+    respuesta = client.post('/api/clientes/bulk', json=[{'nombre': 'Válido'}, item])
+    
+    assert respuesta.status_code == 400
+    assert respuesta.json['data'][1] == {'index': 1, 'success': False, 'message': mensaje}
+
+
+@pytest.mark.parametrize('cambios, mensaje', [
+    ({'nomProducto': ['TV']}, 'El campo nomProducto debe ser texto'),
+    ({'descripFalla': 42}, 'El campo descripFalla debe ser texto'),
+    ({'codCliente': [1]}, 'Código de cliente inválido: [1]'),
+    ({'codCliente': 1.5}, 'Código de cliente inválido: 1.5'),
+    ({'codCliente': True}, 'Código de cliente inválido: True'),
+    ({'codCliente': '²'}, "Código de cliente inválido: '²'"),
+    ({'codCliente': '--5'}, "Código de cliente inválido: '--5'"),
+], ids=['nomProducto', 'descripFalla', 'cliente_lista', 'cliente_decimal', 'cliente_booleano',
+        'cliente_superindice', 'cliente_doble_signo'])
+def test_services_bulk_informa_campos_invalidos(client, service, cambios, mensaje):
+    cod_cliente = client.get(f'/api/services/{service}').json['data']['codCliente']
+    item = {'codCliente': cod_cliente, 'nomProducto': 'TV', **cambios}
+    respuesta = client.post('/api/services/bulk', json=[item])
+    
+    assert respuesta.status_code == 400
+    assert respuesta.json['data'][0]['message'] == mensaje
+
+
+@pytest.mark.parametrize('item', [
+    {'nombre': ['Correa']}, {'nombre': 'Correa', 'costo': 2.5},
+    {'nombre': 'Correa', 'costo': '²'}, {'nombre': 'Correa', 'costo': '--5'},
+], ids=['nombre', 'costo_decimal', 'costo_superindice', 'costo_doble_signo'])
+def test_repuestos_bulk_informa_campos_invalidos(client, service, item):
+    respuesta = client.post(f'/api/services/{service}/repuestos/bulk', json=[item])
+    
+    assert respuesta.status_code == 400
+    assert respuesta.json['data'][0]['success'] is False
+
+
+def test_clientes_bulk_devuelve_cada_codigo_en_su_posicion(client):
+    nombres = [f'Cliente orden {i}' for i in range(25)]
+    respuesta = client.post('/api/clientes/bulk', json=[{'nombre': n} for n in nombres])
+    
+    assert respuesta.status_code == 201
+    for nombre, resultado in zip(nombres, respuesta.json['data']):
+        detalle = client.get(f"/api/clientes/{resultado['codCliente']}")
+        assert detalle.json['data']['nombre'] == nombre
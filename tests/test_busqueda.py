@@ -0,0 +1,18 @@
+"""Búsqueda de clientes: sin limit se devuelve la primera página y su cursor"""
+
+
+def test_busqueda_sin_limit_devuelve_cursor(client):
+    client.post('/api/clientes/bulk', json=[{'nombre': f'Zapateria Norte {i}'} for i in range(55)])
+    
+    primera = client.get('/api/clientes?q=zapat&fields=nombre')
+    
+    assert primera.status_code == 200
+    assert primera.json['count'] == 50
+    assert primera.json['next_cursor']
+    
+    segunda = client.get(f"/api/clientes?q=zapat&fields=nombre&after={primera.json['next_cursor']}")
+    
+    assert segunda.json['count'] == 5
+    assert segunda.json['next_cursor'] is None
+    nombres = {c['nombre'] for c in primera.json['data'] + segunda.json['data']}
+    assert len(nombres) == 55
@@ -0,0 +1,201 @@
+"""Backends compartidos de la caché: SQLite y un sustituto local de Redis (RESP)"""
+import fnmatch
+import socketserver
+import threading
+import time
+import pytest
+from src.services.cache import Cache
+from src.services.cache_backends import NO_ENCONTRADO, RedisBackend, SQLiteBackend
+
+INTERVALO = 0.2
+
+
+class _ServidorRESP(socketserver.ThreadingTCPServer):
+    """Servidor RESP2 en memoria con los comandos que usa RedisBackend"""
+    
+    daemon_threads = True
+    allow_reuse_address = True
+    
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _ManejadorRESP)
+        self.datos = {}
+        self.lock = threading.Lock()
+    
+    def vigente(self, clave):
+        """Valor de la clave si no venció (las vencidas se borran)"""
+        entrada = self.datos.get(clave)
+        if entrada is not None and entrada[1] is not None and entrada[1] <= time.monotonic():
+            del self.datos[clave]
+            return None
+        return entrada
+
+
+class _ManejadorRESP(socketserver.StreamRequestHandler):
+    """Atiende una conexión: lee comandos RESP y responde en orden"""
+    
+    def handle(self):
+        while True:
+            linea = self.rfile.readline()
+            if not linea:
+                return
+            argumentos = []
+            for _ in range(int(linea[1:])):
+                largo = int(self.rfile.readline()[1:])
+                argumentos.append(self.rfile.read(largo + 2)[:-2])
+            with self.server.lock:
+                respuesta = self._ejecutar(argumentos[0].upper().decode(), argumentos[1:])
+            self.wfile.write(self._codificar(respuesta))
+    
+    def _ejecutar(self, comando, args):
+        servidor = self.server
+        if comando in ('AUTH', 'SELECT'):
+            return 'OK'
+        if comando == 'GET':
+            entrada = servidor.vigente(args[0])
+            return None if entrada is None else entrada[0]
+        if comando == 'SET':
+            vence = None
+            if len(args) > 2 and args[2].upper() == b'PX':
+                vence = time.monotonic() + int(args[3]) / 1000
+            servidor.datos[args[0]] = [args[1], vence]
+            return 'OK'
+        if comando == 'INCR':
+            entrada = servidor.vigente(args[0])
+            valor = int(entrada[0]) + 1 if entrada else 1
+            servidor.datos[args[0]] = [str(valor).encode(), None]
+            return valor
+        if comando == 'SADD':
+            entrada = servidor.vigente(args[0]) or servidor.datos.setdefault(args[0], [set(), None])
+            antes = len(entrada[0])
+            entrada[0].update(args[1:])
+            return len(entrada[0]) - antes
+        if comando == 'SMEMBERS':
+            entrada = servidor.vigente(args[0])
+            return sorted(entrada[0]) if entrada else []
+        if comando == 'PEXPIRE':
+            entrada = servidor.vigente(args[0])
+            if entrada is None:
+                return 0
+            entrada[1] = time.monotonic() + int(args[1]) / 1000
+            return 1
+        if comando == 'DEL':
+            return sum(servidor.datos.pop(c, None) is not None for c in args)
+        if comando == 'SCAN':
+            patron = args[2].decode() if len(args) > 2 else '*'
+            claves = [c for c in list(servidor.datos)
+                      if servidor.vigente(c) and fnmatch.fnmatchcase(c.decode(), patron)]
+            return [b'0', claves]
+        return Exception(f'ERR comando desconocido {comando}')
+    
+    @classmethod
+    def _codificar(cls, valor):
+        if valor is None:
+            return b'$-1\r\n'
+        if isinstance(valor, Exception):
+            return b'-%s\r\n' % str(valor).encode()
+        if isinstance(valor, str):
+            return b'+%s\r\n' % valor.encode()
+        if isinstance(valor, int):
+            return b':%d\r\n' % valor
+        if isinstance(valor, bytes):
+            return b'$%d\r\n%s\r\n' % (len(valor), valor)
+        return b'*%d\r\n' % len(valor) + b''.join(cls._codificar(v) for v in valor)
+
+
+@pytest.fixture(scope='module')
+def servidor_resp():
+    """URL de un sustituto local de Redis que corre en un hilo"""
+    servidor = _ServidorRESP()
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield f'redis://127.0.0.1:{servidor.server_address[1]}/0'
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def nuevo_backend(request, tmp_path, servidor_resp):
+    """
+    Crea backends sobre el mismo almacenamiento, uno por worker simulado.
+    
+    Returns:
+        Función sin argumentos que devuelve un backend nuevo
+    """
+    if request.param == 'sqlite':
+        ruta = str(tmp_path / 'cache.db')
+        return lambda: SQLiteBackend(ruta, max_entradas=100)
+    # Un prefijo por test: el servidor se comparte en el módulo
+    prefijo = f'test:{request.node.name}:'
+    return lambda: RedisBackend(servidor_resp, prefijo)
+
+
+class _Contador:
+    """Función de cálculo que devuelve cuántas veces se la llamó"""
+    
+    def __init__(self, al_calcular=None):
+        self.llamadas = 0
+        self.al_calcular = al_calcular
+    
+    def __call__(self):
+        self.llamadas += 1
+        if self.al_calcular is not None:
+            self.al_calcular()
+        return {'total': self.llamadas}
+
+
+def test_obtener_e_invalidar(nuevo_backend):
+    cache = Cache(nuevo_backend(), ttl=60)
+    calcular = _Contador()
+    
+    assert cache.obtener('totales', calcular, ('services',)) == {'total': 1}
+    assert cache.obtener('totales', calcular, ('services',)) == {'total': 1}
+    cache.invalidar('clientes')
+    assert cache.obtener('totales', calcular, ('services',)) == {'total': 1}
+    cache.invalidar('services')
+    assert cache.obtener('totales', calcular, ('services',)) == {'total': 2}
+    assert cache.errores == 0
+
+
+def test_no_guarda_un_calculo_anterior_a_una_invalidacion(nuevo_backend):
+    backend = nuevo_backend()
+    cache = Cache(backend, ttl=60)
+    # Otro worker invalida mientras este calcula
+    calcular = _Contador(al_calcular=lambda: nuevo_backend().invalidar(['services']))
+    
+    generacion = backend.generacion()
+    cache.obtener('totales', calcular, ('services',))
+    
+    assert backend.generacion() == generacion + 1
+    assert backend.leer('totales') is NO_ENCONTRADO
+    calcular.al_calcular = None
+    assert cache.obtener('totales', calcular, ('services',)) == {'total': 2}
+    assert not backend.escribir('otra', 1, 60, ('services',), generacion)
+
+
+def test_las_entradas_vencen(nuevo_backend):
+    cache = Cache(nuevo_backend(), ttl=0.1)
+    calcular = _Contador()
+    
+    cache.obtener('totales', calcular, ('services',))
+    time.sleep(0.15)
+    
+    assert cache.obtener('totales', calcular, ('services',)) == {'total': 2}
+
+
+def test_otro_worker_ve_la_invalidacion_dentro_del_intervalo(nuevo_backend):
+    worker_a = Cache(nuevo_backend(), ttl=60, intervalo_sincronizacion=INTERVALO)
+    worker_b = Cache(nuevo_backend(), ttl=60, intervalo_sincronizacion=INTERVALO)
+    calcular = _Contador()
+    
+    assert worker_a.obtener('totales', calcular, ('services',)) == {'total': 1}
+    assert worker_b.obtener('totales', calcular, ('services',)) == {'total': 1}
+    assert worker_a.obtener('totales', calcular, ('services',)) == {'total': 1}
+    assert worker_a.hits_locales == 1
+    
+    worker_b.invalidar('services')
+    inicio = time.monotonic()
+    while worker_a.obtener('totales', calcular, ('services',)) == {'total': 1}:
+        assert time.monotonic() - inicio <= INTERVALO + 0.1
+        time.sleep(0.01)
+    assert calcular.llamadas == 2
+    assert worker_a.errores == worker_b.errores == 0
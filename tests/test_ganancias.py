@@ -0,0 +1,44 @@
+"""Reporte de ganancias: resúmenes mensuales y mes/año pedidos"""
+from datetime import date
+import pytest
+from sqlalchemy import text
+from src.config.database import db, run_migrations
+from src.repositories.reporte_repository import ReporteRepository
+from src.services.reporte_service import ReporteService
+
+
+def test_migraciones_calculan_resumenes_de_una_base_existente(app, client):
+    cliente = client.post('/api/clientes', json={'nombre': 'Cliente ganancias'})
+    service = client.post('/api/services', json={
+        'codCliente': cliente.json['data']['codCliente'], 'nomProducto': 'Monitor'
+    }).json['data']['codService']
+    client.post('/api/presupuestos', json={'codService': service, 'manoDeObra': 2500})
+    # Base existente sin resúmenes (anterior a ganancias_mensuales)
+    with app.app_context():
+        db.session.execute(text("DELETE FROM ganancias_mensuales"))
+        db.session.commit()
+    
+    run_migrations(app)
+    client.post(f'/api/services/{service}/repuestos', json={'nombre': 'Cable', 'costo': 1000})
+    
+    hoy = date.today()
+    with app.app_context():
+        repositorio = ReporteRepository()
+        resumen = repositorio.get_resumen_mes(hoy.year, hoy.month).to_dict()
+        totales = repositorio.get_totales_mes(hoy.year, hoy.month)
+    assert resumen['total_general'] == totales['total_general']
+    assert totales['total_mano_obra'] >= 2500
+
+
+@pytest.mark.parametrize('anio', [0, -1, 9999, 10000])
+def test_pagina_de_ganancias_con_anio_fuera_de_rango(client, anio):
+    respuesta = client.get(f'/ganancias?mes=12&anio={anio}')
+    
+    assert respuesta.status_code == 200
+    assert str(date.today().year) in respuesta.get_data(as_text=True)
+
+
+def test_reporte_rechaza_anio_fuera_de_rango(app):
+    with app.app_context():
+        with pytest.raises(ValueError, match='Año inválido: 10000'):
+            ReporteService().obtener_ganancias_mes(1, 10000)
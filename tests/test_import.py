@@ -0,0 +1,43 @@
+"""Importación CSV: las fallas a mitad del stream se informan en la última línea"""
+import json
+
+
+def _lineas(respuesta):
+    return [json.loads(linea) for linea in respuesta.get_data(as_text=True).splitlines()]
+
+
+def _csv_clientes(desde, hasta):
+    filas = ''.join(f'Importado {i},Calle {i},11{i:08d},importado{i}@test.com\n'
+                    for i in range(desde, hasta))
+    return filas.encode('utf-8')
+
+
+def test_importar_informa_falla_a_mitad_de_camino(client):
+    # Más de un bloque de lectura válido antes del byte inválido, para que
+    # la decodificación falle después de confirmar algunos lotes
+    cuerpo = b'nombre,direccion,tel,email\n' + _csv_clientes(0, 400) + b'Roto \xff\n'
+    
+    respuesta = client.post('/api/import?tipo=clientes&lote=50', data=cuerpo,
+                            content_type='text/csv')
+    
+    assert respuesta.status_code == 200
+    lineas = _lineas(respuesta)
+    final = lineas[-1]
+    assert final['completado'] is False
+    assert 'utf-8' in final['error']
+    assert len(lineas) > 1
+    assert final['filas_procesadas'] == lineas[-2]['filas_procesadas']
+    assert final['filas_procesadas'] % 50 == 0
+    assert final['insertadas'] == final['filas_procesadas']
+    
+    # Reanudar desde el punto informado completa la importación sin duplicar
+    reanudacion = client.post(
+        f"/api/import?tipo=clientes&lote=50&desde_fila={final['filas_procesadas']}",
+        data=b'nombre,direccion,tel,email\n' + _csv_clientes(0, 400), content_type='text/csv')
+    
+    final = _lineas(reanudacion)[-1]
+    assert final['completado'] is True
+    assert final['filas_procesadas'] == 400
+    clientes = client.get('/api/clientes?fields=nombre').json['data']
+    importados = [c['nombre'] for c in clientes if c['nombre'].startswith('Importado ')]
+    assert len(importados) == len(set(importados)) == 400
@@ -0,0 +1,29 @@
+"""Paginación por cursor: los cursores mal formados dan 400"""
+import base64
+import json
+import pytest
+
+
+def _cursor(valores):
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('url, valores', [
+    ('/api/clientes', [{'a': 1}]),
+    ('/api/clientes', [[1]]),
+    ('/api/services', [{'fecha': '2024-01-01'}, 1]),
+    ('/api/services', ['2024-01-01', [1]]),
+    ('/api/services', ['2024-13-01', 1]),
+    ('/api/services', ['2024-01-01']),
+], ids=['objeto', 'lista', 'objeto_fecha', 'lista_clave', 'fecha_invalida', 'largo'])
+def test_cursor_con_valores_no_escalares(client, url, valores):
+    respuesta = client.get(f'{url}?limit=5&after={_cursor(valores)}')
+    
+    assert respuesta.status_code == 400
+    assert respuesta.json['message'] == 'Cursor de paginación inválido'
+
+
+def test_cursor_invalido_en_base64(client):
+    respuesta = client.get('/api/clientes?limit=5&after=%%%')
+    
+    assert respuesta.status_code == 400
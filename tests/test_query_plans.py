@@ -0,0 +1,128 @@
+"""
+Regresión de planes: las búsquedas de los repositorios usan sus índices (SQLite).
+
+Cada consulta se ejecuta a través del repositorio, se captura el SQL que
+emite y se pide su EXPLAIN QUERY PLAN con los mismos parámetros. Quedan
+afuera los recorridos completos por diseño (get_all, count,
+find_total_repuestos_inconsistentes), la búsqueda de texto (FTS5) y las
+escrituras.
+"""
+import re
+from datetime import date
+import pytest
+from src.config.database import db
+from src.repositories import (
+    ClienteRepository, PresupuestoRepository, ReporteRepository,
+    RepuestoRepository, ServiceRepository, VersionRepository
+)
+from src.repositories.base_repository import encode_cursor
+
+# Búsqueda por la clave primaria entera (rowid) de la tabla
+CLAVE = 'INTEGER PRIMARY KEY'
+
+CONSULTAS = [
+    # ClienteRepository
+    ('cliente_por_id', lambda: ClienteRepository().get_by_id(1),
+     'clientes', CLAVE),
+    ('cliente_existe', lambda: ClienteRepository().exists(1),
+     'clientes', CLAVE),
+    ('clientes_existentes', lambda: ClienteRepository().find_ids_existentes([1, 2]),
+     'clientes', CLAVE),
+    ('clientes_pagina_siguiente', lambda: ClienteRepository().paginate(20, encode_cursor([1])),
+     'clientes', CLAVE),
+    ('cliente_por_email', lambda: ClienteRepository().find_by_email('cliente@example.com'),
+     'clientes', 'ix_clientes_email'),
+    ('emails_existentes',
+     lambda: ClienteRepository().find_emails_existentes(['a@example.com', 'b@example.com']),
+     'clientes', 'ix_clientes_email'),
+    ('cliente_por_tel', lambda: ClienteRepository().find_by_tel('1144445555'),
+     'clientes', 'ix_clientes_tel'),
+    ('clientes_con_pendientes',
+     lambda: ClienteRepository().get_clientes_con_services_pendientes(),
+     'services', 'ix_services_estado_fecha'),
+    # ServiceRepository
+    ('services_por_cliente', lambda: ServiceRepository().find_by_cliente(1),
+     'services', 'ix_services_cliente_estado'),
+    ('services_por_estado', lambda: ServiceRepository().find_by_estado('Pendiente'),
+     'services', 'ix_services_estado_fecha'),
+    ('services_no_entregados', lambda: ServiceRepository().find_no_entregados(),
+     'services', 'ix_services_estado_fecha'),
+    ('services_pagina_por_estado',
+     lambda: ServiceRepository().paginate_filtered(20, estado='pendiente'),
+     'services', 'ix_services_estado_fecha'),
+    ('services_pagina_por_cliente',
+     lambda: ServiceRepository().paginate_filtered(20, cod_cliente=1),
+     'services', 'ix_services_cliente_estado'),
+    ('services_exportacion',
+     lambda: list(ServiceRepository().iter_export(date(2024, 1, 1), date(2024, 12, 31))),
+     'services', 'ix_services_fecha'),
+    ('services_flags', lambda: ServiceRepository().find_flags([1, 2]),
+     'services', CLAVE),
+    ('services_por_estado_conteo', lambda: ServiceRepository().count_by_estado(),
+     'services', 'ix_services_estado_fecha'),
+    # PresupuestoRepository
+    ('presupuesto_por_service', lambda: PresupuestoRepository().find_by_service(1),
+     'presupuestos', 'sqlite_autoindex_presupuestos_1'),
+    ('presupuestos_pendientes', lambda: PresupuestoRepository().find_pendientes_aceptacion(),
+     'presupuestos', 'ix_presupuestos_aceptado'),
+    ('presupuestos_pendientes_pagina',
+     lambda: PresupuestoRepository().paginate_pendientes_aceptacion(20),
+     'presupuestos', 'ix_presupuestos_aceptado'),
+    ('presupuestos_aceptados', lambda: PresupuestoRepository().find_aceptados(),
+     'presupuestos', 'ix_presupuestos_aceptado'),
+    ('total_ganancias', lambda: PresupuestoRepository().get_total_ganancias(),
+     'presupuestos', 'ix_presupuestos_aceptado'),
+    # RepuestoRepository
+    ('repuestos_por_service', lambda: RepuestoRepository().find_by_service(1),
+     'repuestos', 'ix_repuestos_codService'),
+    ('repuesto_de_service', lambda: RepuestoRepository().find_de_service(1, 1),
+     'repuestos', CLAVE),
+    # ReporteRepository
+    ('services_del_mes', lambda: ReporteRepository().find_services_mes(2024, 5),
+     'services', 'ix_services_fecha'),
+    ('totales_del_mes', lambda: ReporteRepository().get_totales_mes(2024, 5),
+     'services', 'ix_services_fecha'),
+    ('resumen_del_mes', lambda: ReporteRepository().get_resumen_mes(2024, 5),
+     'ganancias_mensuales', 'sqlite_autoindex_ganancias_mensuales_1'),
+    # VersionRepository
+    ('versiones_tablas', lambda: VersionRepository().get_versiones(['clientes', 'services']),
+     'versiones_tablas', 'sqlite_autoindex_versiones_tablas_1'),
+    ('version_service', lambda: VersionRepository().get_version_service(1),
+     'services', CLAVE),
+    ('version_cliente', lambda: VersionRepository().get_version_cliente(1),
+     'clientes', CLAVE),
+    ('version_presupuesto', lambda: VersionRepository().get_version_presupuesto(1),
+     'presupuestos', CLAVE),
+    ('version_presupuesto_de_service',
+     lambda: VersionRepository().get_version_presupuesto_de_service(1),
+     'presupuestos', 'sqlite_autoindex_presupuestos_1'),
+]
+
+
+@pytest.fixture(autouse=True)
+def solo_sqlite(app):
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            pytest.skip('EXPLAIN QUERY PLAN es propio de SQLite')
+
+
+def plan(sql, parametros):
+    """Detalle de cada paso del EXPLAIN QUERY PLAN de una sentencia"""
+    filas = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}', parametros)
+    return [fila[-1] for fila in filas]
+
+
+@pytest.mark.parametrize(
+    'consulta, tabla, indice', [c[1:] for c in CONSULTAS], ids=[c[0] for c in CONSULTAS]
+)
+def test_consulta_usa_indice(app, sentencias, consulta, tabla, indice):
+    with app.app_context():
+        consulta()
+        sql, parametros = next(
+            (s, p) for s, p in sentencias if re.search(rf'\bFROM {tabla}\b', s)
+        )
+        pasos = plan(sql, parametros)
+    
+    sobre_tabla = [p for p in pasos if re.search(rf'\b(SCAN|SEARCH) {tabla}\b', p)]
+    assert sobre_tabla, pasos
+    assert all(re.search(rf'USING ((COVERING )?INDEX )?{indice}\b', p) for p in sobre_tabla), pasos
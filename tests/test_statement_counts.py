@@ -0,0 +1,104 @@
+"""
+Cantidad de sentencias SQL por operación.
+
+Los perfiles de carga deben resolver listados y detalles con una cantidad
+fija de consultas, sin importar cuántas filas haya (sin N+1), y save()
+no debe agregar SELECT de merge() ni refresh() a las escrituras.
+"""
+import itertools
+import re
+import pytest
+from src.config.database import db
+from src.models.cliente import Cliente
+from src.repositories import ClienteRepository
+
+_secuencia = itertools.count(1)
+
+
+def sobre_tabla(sentencias, tabla):
+    """SQL de las sentencias que leen o escriben la tabla"""
+    return [s for s, _ in sentencias if re.search(rf'\b{tabla}\b', s)]
+
+
+def contar(sentencias, peticion):
+    """Ejecuta una petición y devuelve cuántas sentencias emitió"""
+    sentencias.clear()
+    respuesta = peticion()
+    assert respuesta.status_code == 200, respuesta.data
+    return len(sentencias)
+
+
+def crear_services(client, cantidad, repuestos=1):
+    """Crea services (cada uno con su cliente, repuestos y presupuesto)"""
+    ids = []
+    for _ in range(cantidad):
+        n = next(_secuencia)
+        cliente = client.post('/api/clientes', json={'nombre': f'Cliente {n}', 'email': f'c{n}@test.com'})
+        service = client.post('/api/services', json={
+            'codCliente': cliente.json['data']['codCliente'],
+            'nomProducto': f'Producto {n}', 'descripFalla': 'No enciende'
+        })
+        cod = service.json['data']['codService']
+        for i in range(repuestos):
+            client.post(f'/api/services/{cod}/repuestos', json={'nombre': f'Repuesto {i}', 'costo': 10})
+        client.post('/api/presupuestos', json={'codService': cod, 'manoDeObra': 100})
+        ids.append(cod)
+    return ids
+
+
+@pytest.mark.parametrize('url', ['/api/services', '/api/services?limit=500', '/services'],
+                         ids=['listado', 'listado_paginado', 'tablero'])
+def test_listados_con_consultas_constantes(client, sentencias, url):
+    crear_services(client, 3)
+    antes = contar(sentencias, lambda: client.get(url))
+    crear_services(client, 15)
+    assert contar(sentencias, lambda: client.get(url)) == antes
+
+
+def test_detalle_con_consultas_constantes(client, sentencias):
+    pocos, muchos = crear_services(client, 1, repuestos=1) + crear_services(client, 1, repuestos=12)
+    antes = contar(sentencias, lambda: client.get(f'/api/services/{pocos}'))
+    assert contar(sentencias, lambda: client.get(f'/api/services/{muchos}')) == antes
+
+
+def test_save_nueva_solo_inserta(app, sentencias):
+    with app.app_context():
+        sentencias.clear()
+        ClienteRepository().save(Cliente(nombre='Nuevo'))
+        clientes = sobre_tabla(sentencias, 'clientes')
+    
+    assert len(clientes) == 1
+    assert clientes[0].startswith('INSERT INTO clientes')
+
+
+@pytest.mark.parametrize('metodo', ['save', 'update'])
+def test_save_persistente_solo_actualiza(app, sentencias, metodo):
+    with app.app_context():
+        repositorio = ClienteRepository()
+        cod = repositorio.save(Cliente(nombre='Original')).codCliente
+        # Como en una edición: la entidad se carga y después se modifica
+        cliente = repositorio.get_by_id(cod)
+        
+        sentencias.clear()
+        cliente.nombre = 'Editado'
+        getattr(repositorio, metodo)(cliente)
+        clientes = sobre_tabla(sentencias, 'clientes')
+    
+    # Sin SELECT de merge() ni de refresh(): solo el UPDATE de la columna modificada
+    assert len(clientes) == 1
+    assert clientes[0].startswith('UPDATE clientes SET nombre=?')
+
+
+def test_save_separada_usa_merge(app, sentencias):
+    with app.app_context():
+        repositorio = ClienteRepository()
+        cliente = repositorio.save(Cliente(nombre='Separado'))
+        db.session.expunge(cliente)
+        
+        sentencias.clear()
+        cliente.nombre = 'Editado'
+        guardado = repositorio.save(cliente)
+        clientes = sobre_tabla(sentencias, 'clientes')
+    
+    assert guardado is not cliente
+    assert [s.split()[0] for s in clientes] == ['SELECT', 'UPDATE']